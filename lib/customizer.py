@@ -1,5 +1,6 @@
 import codecs
 import encodings
+import io
 import json
 import locale
 import os
@@ -12,8 +13,11 @@ import xbmcaddon
 import xbmcgui
 import xbmcplugin
 
+from collections import OrderedDict
+
 from lib import pysubs2
-from lib.pysubs2.formats import FILE_EXTENSION_TO_FORMAT_IDENTIFIER
+from lib.pysubs2.common import EncodingWriter, replace_file
+from lib.pysubs2.formats import FILE_EXTENSION_TO_FORMAT_IDENTIFIER, get_format_class
 
 try:
     from urllib.parse import parse_qsl, unquote, urlencode
@@ -61,10 +65,7 @@ def get_setting(name):
     raise ValueError("Unable to get setting " + name)
 
 
-def get_current_subtitle():
-    if get_subtitle_details() is None:
-        return None, None
-
+def find_subtitle(subtitle_lang):
     if get_setting("subtitles.storagemode") == 1:
         subtitle_path = get_setting("subtitles.custompath")
     else:
@@ -73,7 +74,6 @@ def get_current_subtitle():
     if not os.path.exists(subtitle_path):
         subtitle_path = xbmc.translatePath("special://temp")
 
-    subtitle_lang = xbmc.getInfoLabel("VideoPlayer.SubtitlesLanguage")
     file_name = unquote(xbmc.getInfoLabel("Player.Filename"))
     file_name_base, _ = os.path.splitext(file_name)
     lang_index = len(file_name_base)
@@ -99,8 +99,16 @@ def get_current_subtitle():
                 m_time = _m_time
                 index = i
 
-        return subtitles[index], subtitle_lang
-    return None, subtitle_lang
+        return subtitles[index]
+    return None
+
+
+def get_current_subtitle():
+    if get_subtitle_details() is None:
+        return None, None
+
+    subtitle_lang = xbmc.getInfoLabel("VideoPlayer.SubtitlesLanguage")
+    return find_subtitle(subtitle_lang), subtitle_lang
 
 
 def find_encoding_by_country(country):
@@ -137,12 +145,12 @@ class Customizer(object):
             string = string.encode("utf-8")
         return string
 
-    def _add_subtitle(self, action, path, label, language):
+    def _add_subtitle(self, action, path, label, language, **params):
         list_item = xbmcgui.ListItem(label=xbmc.convertLanguage(language, xbmc.ENGLISH_NAME), label2=label)
         list_item.setArt({"icon": "0", "thumb": xbmc.convertLanguage(language, xbmc.ISO_639_1)})
         # list_item.setProperty("sync", "false")
         # list_item.setProperty("hearing_imp", "false")
-        url = "plugin://{}/?{}".format(self._id, urlencode(dict(action=action, path=path, language=language)))
+        url = "plugin://{}/?{}".format(self._id, urlencode(dict(params, action=action, path=path, language=language)))
         xbmcplugin.addDirectoryItem(self._handle, url, list_item)
 
     def _list_subtitles(self):
@@ -154,6 +162,9 @@ class Customizer(object):
         if current_path.endswith(".ass"):
             with codecs.open(current_path, errors="ignore") as f:
                 for line in f:
+                    if line.startswith("[") and not line.startswith("[Script Info]"):
+                        # the header is in [Script Info], no need to read the rest of the file
+                        break
                     match = self._header_re.search(line)
                     if match:
                         current_path = match.group(1)
@@ -168,6 +179,17 @@ class Customizer(object):
         self._add_subtitle("download", subtitle_path, "{} - {}".format(title, self._translate(32002)), lang)
         self._add_subtitle("convert", subtitle_path, "{} - {}".format(title, self._translate(32003)), lang)
 
+        second_lang = self._merge_language
+        if second_lang and second_lang != lang:
+            second_path = find_subtitle(second_lang)
+            if second_path is not None:
+                xbmc.log("Second subtitle path is: " + second_path)
+                second_subtitle_path = os.path.join(self._subtitles_dir, os.path.basename(second_path))
+                if second_path != second_subtitle_path:
+                    shutil.copy(second_path, second_subtitle_path)
+                self._add_subtitle("merge", subtitle_path, "{} - {}".format(title, self._translate(32005)), lang,
+                                   second_path=second_subtitle_path, second_language=second_lang)
+
     def _download_subtitle(self, path):
         list_item = xbmcgui.ListItem(label=path)
         xbmcplugin.addDirectoryItem(self._handle, path, list_item)
@@ -185,34 +207,105 @@ class Customizer(object):
         encoding = find_encoding_by_country(xbmc.convertLanguage(lang, xbmc.ISO_639_1))
 
         subs = pysubs2.load(path, encoding, fps=fps)
+        events = len(subs)
 
-        subs.styles["Default"].fontname = self._font_name
-        subs.styles["Default"].fontsize = self._font_size
-        subs.styles["Default"].primarycolor = self._primary_color
-        subs.styles["Default"].secondarycolor = self._secondary_color
-        subs.styles["Default"].tertiarycolor = self._tertiary_color
-        subs.styles["Default"].outlinecolor = self._outline_color
-        subs.styles["Default"].backcolor = self._back_color
-        subs.styles["Default"].bold = False
-        subs.styles["Default"].italic = False
-        subs.styles["Default"].underline = False
-        subs.styles["Default"].strikeout = False
-        subs.styles["Default"].scalex = 100.0
-        subs.styles["Default"].scaley = 100.0
-        subs.styles["Default"].spacing = 0.0
-        subs.styles["Default"].angle = 0.0
-        subs.styles["Default"].borderstyle = self._border_style
-        subs.styles["Default"].outline = self._outline_px
-        subs.styles["Default"].shadow = self._shadow_px
-        subs.styles["Default"].alignment = self._alignment
-        subs.styles["Default"].marginl = self._margin_l
-        subs.styles["Default"].marginr = self._margin_r
-        subs.styles["Default"].marginv = self._margin_v
-        subs.styles["Default"].encoding = 1
+        if self._normalize:
+            xbmc.log("Normalized subtitle: {}".format(subs.normalize(overlaps=self._overlaps)))
+
+        self._apply_style(subs.styles["Default"])
+
+        if self._minimize:
+            xbmc.log("Minimized subtitle: {}".format(subs.minimize()))
 
         subs.save(converted, encoding, fps=fps, header_notice=self._header.format(path))
+        xbmc.log("Converted subtitle: {} -> {} events, {} -> {} bytes".format(
+            events, len(subs), os.path.getsize(path), os.path.getsize(converted)))
         self._download_subtitle(converted)
 
+    def _merge_subtitles(self, path, second_path, second_lang):
+        dialog = xbmcgui.Dialog()
+        if dialog.yesno(self._translate(32005), self._translate(32004)):
+            self._addon.openSettings()
+
+        name, _ = os.path.splitext(os.path.basename(path))
+        merged = os.path.join(self._subtitles_dir, "{}_merged_{}.ass".format(self._name, name))
+
+        lang = xbmc.getInfoLabel("VideoPlayer.SubtitlesLanguage")
+        fps = float(xbmc.getInfoLabel("Player.Process(VideoFPS)"))
+
+        # each language gets its own style, the second one at the other edge of the screen
+        first_style = pysubs2.SSAStyle()
+        self._apply_style(first_style)
+        second_style = first_style.copy()
+        second_style.fontsize = self._merge_font_size
+        second_style.primarycolor = self._get_color(self._addon.getSetting("merge_primary_color"))
+        top = 7 + int(self._addon.getSetting("horizontal_alignment"))
+        bottom = 1 + int(self._addon.getSetting("horizontal_alignment"))
+        if self._addon.getSetting("merge_position") == "0":
+            first_style.alignment, second_style.alignment = bottom, top
+        else:
+            first_style.alignment, second_style.alignment = top, bottom
+        styles = OrderedDict([("First", first_style), ("Second", second_style)])
+
+        streams = []
+        for p, l, style in ((path, lang, "First"), (second_path, second_lang, "Second")):
+            encoding = find_encoding_by_country(xbmc.convertLanguage(l, xbmc.ISO_639_1))
+            # columnar storage keeps the two files small in memory, the merged file is never built
+            subs = pysubs2.load(p, encoding, fps=fps, columnar=True)
+            if self._normalize:
+                xbmc.log("Normalized subtitle: {}".format(subs.normalize(overlaps=self._overlaps)))
+            else:
+                subs.sort()
+            for ev in subs:
+                ev.style = style
+            streams.append(subs)
+
+        first, second = streams
+        events = pysubs2.merge_events((ev for ev in first if not ev.is_comment),
+                                      (ev for ev in second if not ev.is_comment), snap=self._merge_snap)
+        # written like SSAFile.save(): encoded in chunks into a temporary file, which then replaces the old one
+        tmp = merged + ".tmp"
+        writer = EncodingWriter(None, "utf-8")
+        try:
+            with io.open(tmp, "wb") as fp:
+                writer.fp = fp
+                get_format_class("ass").write_events(writer, events, "ass", info=first.info, styles=styles,
+                                                     header_notice=self._header.format(path))
+                writer.close()
+            replace_file(tmp, merged)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        xbmc.log("Merged subtitles: {} + {} events, {} bytes".format(
+            len(first), len(second), os.path.getsize(merged)))
+        self._download_subtitle(merged)
+
+    def _apply_style(self, style):
+        style.fontname = self._font_name
+        style.fontsize = self._font_size
+        style.primarycolor = self._primary_color
+        style.secondarycolor = self._secondary_color
+        style.tertiarycolor = self._tertiary_color
+        style.outlinecolor = self._outline_color
+        style.backcolor = self._back_color
+        style.bold = False
+        style.italic = False
+        style.underline = False
+        style.strikeout = False
+        style.scalex = 100.0
+        style.scaley = 100.0
+        style.spacing = 0.0
+        style.angle = 0.0
+        style.borderstyle = self._border_style
+        style.outline = self._outline_px
+        style.shadow = self._shadow_px
+        style.alignment = self._alignment
+        style.marginl = self._margin_l
+        style.marginr = self._margin_r
+        style.marginv = self._margin_v
+        style.encoding = 1
+
     @property
     def _font_name(self):
         opt = self._addon.getSetting("font_name")
@@ -283,6 +376,38 @@ class Customizer(object):
     def _shadow_px(self):
         return float(self._addon.getSetting("shadow_px"))
 
+    @property
+    def _normalize(self):
+        return self._addon.getSetting("normalize") == "true"
+
+    @property
+    def _minimize(self):
+        return self._addon.getSetting("minimize") == "true"
+
+    @property
+    def _merge_language(self):
+        opt = self._addon.getSetting("merge_language")
+        if opt:
+            return xbmc.convertLanguage(opt, xbmc.ISO_639_2)
+        return ""
+
+    @property
+    def _merge_font_size(self):
+        return float(self._addon.getSetting("merge_font_size"))
+
+    @property
+    def _merge_snap(self):
+        return int(self._addon.getSetting("merge_snap"))
+
+    @property
+    def _overlaps(self):
+        opt = self._addon.getSetting("overlaps")
+        if opt == "1":
+            return "clip"
+        elif opt == "2":
+            return "stack"
+        return "keep"
+
     @property
     def _alignment(self):
         return 3 * int(self._addon.getSetting("vertical_alignment")) + \
@@ -307,5 +432,8 @@ class Customizer(object):
                 self._download_subtitle(self._params["path"])
             elif self._params["action"] == "convert" and "path" in self._params:
                 self._convert_subtitle(self._params["path"])
+            elif self._params["action"] == "merge" and "path" in self._params and "second_path" in self._params:
+                self._merge_subtitles(self._params["path"], self._params["second_path"],
+                                      self._params.get("second_language", ""))
 
         xbmcplugin.endOfDirectory(self._handle)
@@ -1,6 +1,9 @@
-from .ssafile import SSAFile
+from .ssafile import SSAFile, SSAFileView
 from .ssaevent import SSAEvent
 from .ssastyle import SSAStyle
+from .eventtable import EventTable, EventView
+from .cache import ParseCache
+from .merge import merge_events
 from . import time, formats, cli
 from .exceptions import *
 from .common import Color, VERSION
@@ -8,5 +11,8 @@ from .common import Color, VERSION
 #: Alias for :meth:`SSAFile.load()`.
 load = SSAFile.load
 
+#: Alias for :meth:`SSAFile.probe()`.
+probe = SSAFile.probe
+
 #: Alias for :meth:`pysubs2.time.make_time()`.
 make_time = time.make_time
@@ -0,0 +1,152 @@
+from __future__ import unicode_literals, print_function, division
+
+import hashlib
+import io
+import json
+import logging
+import os
+import os.path
+from .common import VERSION, text_type, replace_file
+from .jsoncolumnar import JSONColumnarFormat, JSON_COLUMNAR_VERSION
+
+#: Version of parsing results, part of the cache key. Bump when parsers start to produce different results.
+PARSER_VERSION = "%s/%d" % (VERSION, JSON_COLUMNAR_VERSION)
+
+#: Suffix of cache entries.
+CACHE_SUFFIX = ".pysubs2-cache"
+
+
+def _mtime_ns(st):
+    try:
+        return st.st_mtime_ns
+    except AttributeError:
+        return int(st.st_mtime * 1e9)
+
+
+class ParseCache(object):
+    """
+    On-disk cache of parsed subtitle files, see :meth:`SSAFile.load()`.
+
+    Parsed files are stored in ``json-columnar`` format (see :class:`JSONColumnarFormat`),
+    one file per entry, keyed by path, size and modification time of the subtitle file,
+    encoding, format, fps, other parser options and :data:`PARSER_VERSION`. Any change of
+    these makes the entry miss; an unreadable entry is deleted and the file parsed again.
+
+    When the entries take more than ``max_size`` bytes, the least recently used ones are removed.
+
+    Example:
+        >>> cache = ParseCache("/tmp/subtitle-cache")
+        >>> subs = SSAFile.load("movie.ass", cache=cache) # parsed and stored
+        >>> subs = SSAFile.load("movie.ass", cache=cache) # loaded from cache
+
+    """
+
+    def __init__(self, directory, max_size=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+
+    def key(self, path, encoding, format_, fps, options):
+        """
+        Return cache key for given file and parser arguments, or None when the file cannot be stat'ed.
+
+        Returns:
+            list ``[path, size, mtime_ns, encoding, format, fps, options, PARSER_VERSION]``,
+            with JSON-friendly values
+        """
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return [path, st.st_size, _mtime_ns(st), encoding, format_, fps,
+                sorted([k, repr(v)] for k, v in options.items()), PARSER_VERSION]
+
+    def entry_path(self, key):
+        """Path of cache entry for given key."""
+        digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + CACHE_SUFFIX)
+
+    def get(self, key, subs):
+        """
+        Fill empty ``subs`` from the cache entry for ``key``.
+
+        Returns:
+            True on hit; False when there is no valid entry (``subs`` may then be partially filled).
+        """
+        entry = self.entry_path(key)
+        try:
+            with io.open(entry, encoding="utf-8") as fp:
+                header = json.loads(fp.readline())
+                if header.get("key") != key:
+                    return False
+                JSONColumnarFormat.from_file(subs, fp, "json-columnar")
+        except IOError:
+            return False
+        except (ValueError, KeyError, TypeError, IndexError, AttributeError) as e:
+            logging.getLogger("pysubs2").warning("Removing broken cache entry %r: %s", entry, e)
+            self._remove(entry)
+            return False
+
+        subs.format = header["format"]
+        subs.fps = header["fps"]
+        try:
+            os.utime(entry, None) # for eviction
+        except OSError:
+            pass
+        return True
+
+    def put(self, key, subs):
+        """Store parsed ``subs`` under ``key``, then evict old entries if needed."""
+        entry = self.entry_path(key)
+        tmp = "%s.%d.tmp" % (entry, os.getpid())
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            with io.open(tmp, "w", encoding="utf-8") as fp:
+                fp.write(text_type(json.dumps({"key": key, "format": subs.format, "fps": subs.fps})))
+                fp.write("\n")
+                JSONColumnarFormat.write_events(fp, subs.events, "json-columnar", info=subs.info, styles=subs.styles,
+                                                aegisub_project=subs.aegisub_project, attachments=subs.attachments,
+                                                fps=subs.fps)
+            replace_file(tmp, entry)
+        except (IOError, OSError) as e:
+            logging.getLogger("pysubs2").warning("Cannot write cache entry: %s", e)
+            self._remove(tmp)
+            return
+
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in ``max_size``."""
+        entries = []
+        try:
+            for name in os.listdir(self.directory):
+                if name.endswith(CACHE_SUFFIX):
+                    path = os.path.join(self.directory, name)
+                    st = os.stat(path)
+                    entries.append((st.st_mtime, st.st_size, path))
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        """Remove all entries."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(CACHE_SUFFIX):
+                self._remove(os.path.join(self.directory, name))
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -1,4 +1,9 @@
 from collections import namedtuple
+import codecs
+import hashlib
+import json
+import os
+import struct
 import sys
 
 _Color = namedtuple("Color", "r g b a")
@@ -9,6 +14,8 @@ class Color(_Color):
 
     All values are ints from 0 to 255.
     """
+    __slots__ = ()
+
     def __new__(cls, r, g, b, a=0):
         for value in r, g, b, a:
             if value not in range(256):
@@ -16,6 +23,103 @@ class Color(_Color):
 
         return _Color.__new__(cls, r, g, b, a)
 
+_INTERNED = {}
+
+def intern_value(value):
+    """
+    Return a canonical instance of a hashable value (eg. style name or :class:`Color`).
+
+    Parsers use this so that values repeated across many lines share one object.
+    The cache is bounded, when it fills up it starts over.
+    """
+    try:
+        return _INTERNED[value]
+    except KeyError:
+        if len(_INTERNED) >= 4096:
+            _INTERNED.clear()
+        _INTERNED[value] = value
+        return value
+
+def is_ascii_compatible(encoding):
+    """
+    Return True if text in given encoding can be split into lines and sections on the bytes.
+
+    That is, ASCII characters are encoded as themselves and bytes of other characters
+    never look like ``\\n`` or ``[``. True for UTF-8, Latin-1, Windows code pages and the
+    usual East Asian multibyte encodings; False for UTF-16/32, UTF-7 and stateful
+    encodings like ISO-2022-JP.
+    """
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return False
+    if name.startswith(("utf-16", "utf-32", "utf-7", "iso2022", "hz")):
+        return False
+    return "\n[]:,".encode(encoding) == b"\n[]:,"
+
+#: Number of characters :class:`EncodingWriter` collects before encoding them.
+ENCODE_CHUNK_SIZE = 1 << 18
+
+class EncodingWriter(object):
+    """
+    Text file-like object which encodes what is written into a binary file.
+
+    Text is collected and encoded in chunks of :data:`ENCODE_CHUNK_SIZE` characters
+    (small files at once), so writers may call ``write()`` as often as they like
+    without going through :class:`io.TextIOWrapper` each time. Newlines are translated
+    to ``newline``, like in text mode.
+    """
+    def __init__(self, fp, encoding, newline=os.linesep):
+        self.fp = fp
+        self.encoder = codecs.getincrementalencoder(encoding)()
+        self.newline = newline
+        self.pieces = []
+        self.size = 0
+
+    def write(self, s):
+        self.pieces.append(s)
+        self.size += len(s)
+        if self.size >= ENCODE_CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        text = "".join(self.pieces)
+        del self.pieces[:]
+        self.size = 0
+        if self.newline != "\n":
+            text = text.replace("\n", self.newline)
+        self.fp.write(self.encoder.encode(text))
+
+    def close(self):
+        """Encode remaining text. The binary file is not closed."""
+        self.flush()
+        self.fp.write(self.encoder.encode("", True))
+
+def replace_file(src, dst):
+    """Rename file ``src`` to ``dst``, replacing ``dst`` (atomically, except on Python 2 on Windows)."""
+    if hasattr(os, "replace"):
+        os.replace(src, dst)
+    else:
+        try:
+            os.rename(src, dst)
+        except OSError:
+            if not os.path.exists(dst):
+                raise
+            os.remove(dst)
+            os.rename(src, dst)
+
+_fingerprint_encode = json.JSONEncoder(ensure_ascii=True, separators=(",", ":")).encode
+
+def fingerprint(values):
+    """
+    Return stable 64-bit hash (an int) of a tuple of strings, numbers, bools, None and nested tuples.
+
+    Unlike :func:`hash()`, the result does not change between processes, platforms
+    or Python versions, so it can be stored and compared later.
+    """
+    digest = hashlib.sha1(_fingerprint_encode(values).encode("ascii")).digest()
+    return struct.unpack(">Q", digest[:8])[0]
+
 #: Version of the pysubs2 library.
 VERSION = "0.2.4"
 
@@ -0,0 +1,144 @@
+from __future__ import unicode_literals
+from bisect import bisect_left
+from collections import namedtuple
+from difflib import SequenceMatcher
+
+#: Largest gap (product of lengths) without unique anchors which is aligned with :mod:`difflib`;
+#: bigger gaps are reported as replaced outright.
+DIFFLIB_GAP_LIMIT = 1 << 16
+
+#: Result of :meth:`SSAFile.diff()`.
+EventDiff = namedtuple("EventDiff", ["deleted", "inserted", "modified"])
+
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi):
+    # pairs (i, j) of items occurring exactly once in both ranges, ordered by i
+    counts = {}
+    for i in range(alo, ahi):
+        x = a[i]
+        counts[x] = None if x in counts else i
+    positions = {}
+    for j in range(blo, bhi):
+        x = b[j]
+        if counts.get(x) is not None:
+            positions[x] = None if x in positions else j
+    return sorted((counts[x], j) for x, j in positions.items() if j is not None)
+
+
+def _longest_increasing(pairs):
+    # longest subsequence of pairs increasing in j (patience sorting), O(k log k)
+    tails, tail_index, back = [], [], []
+    for k, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        back.append(tail_index[pos-1] if pos else -1)
+        if pos == len(tails):
+            tails.append(j)
+            tail_index.append(k)
+        else:
+            tails[pos] = j
+            tail_index[pos] = k
+
+    out = []
+    k = tail_index[-1] if tail_index else -1
+    while k != -1:
+        out.append(pairs[k])
+        k = back[k]
+    out.reverse()
+    return out
+
+
+def matching_blocks(a, b):
+    """
+    Return list of ``(i, j, n)`` triples such that ``a[i:i+n] == b[j:j+n]``, increasing in ``i`` and ``j``.
+
+    Works like patience diff: common prefix and suffix are matched directly, then items
+    which are unique on both sides serve as anchors (their longest common ordering is found
+    in O(k log k)) and the gaps between them are aligned the same way. Gaps without
+    unique items fall back to :class:`difflib.SequenceMatcher` when small. For sequences
+    of distinct hashable items, like event fingerprints, this is about O(n) plus
+    O(k log k) for k changed-but-unique items.
+    """
+    blocks = []
+    todo = [(0, len(a), 0, len(b))]
+    while todo:
+        alo, ahi, blo, bhi = todo.pop()
+
+        n = 0
+        while alo + n < ahi and blo + n < bhi and a[alo+n] == b[blo+n]:
+            n += 1
+        if n:
+            blocks.append((alo, blo, n))
+            alo += n
+            blo += n
+
+        n = 0
+        while alo < ahi - n and blo < bhi - n and a[ahi-n-1] == b[bhi-n-1]:
+            n += 1
+        if n:
+            blocks.append((ahi - n, bhi - n, n))
+            ahi -= n
+            bhi -= n
+
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _longest_increasing(_unique_anchors(a, alo, ahi, b, blo, bhi))
+        if anchors:
+            for i, j in anchors:
+                todo.append((alo, i, blo, j))
+                blocks.append((i, j, 1))
+                alo, blo = i + 1, j + 1
+            todo.append((alo, ahi, blo, bhi))
+        elif (ahi - alo) * (bhi - blo) <= DIFFLIB_GAP_LIMIT:
+            matcher = SequenceMatcher(None, a[alo:ahi], b[blo:bhi], autojunk=False)
+            blocks.extend((alo + i, blo + j, n) for i, j, n in matcher.get_matching_blocks() if n)
+
+    blocks.sort()
+    merged = []
+    for i, j, n in blocks:
+        if merged and merged[-1][0] + merged[-1][2] == i and merged[-1][1] + merged[-1][2] == j:
+            merged[-1] = (merged[-1][0], merged[-1][1], merged[-1][2] + n)
+        else:
+            merged.append((i, j, n))
+    return merged
+
+
+def get_opcodes(a, b):
+    """
+    Return :meth:`difflib.SequenceMatcher.get_opcodes()`-like list of ``(tag, i1, i2, j1, j2)``
+    turning ``a`` into ``b``, computed with :func:`matching_blocks()`.
+    """
+    opcodes = []
+    i = j = 0
+    for ai, bj, n in matching_blocks(a, b) + [(len(a), len(b), 0)]:
+        if i < ai and j < bj:
+            opcodes.append(("replace", i, ai, j, bj))
+        elif i < ai:
+            opcodes.append(("delete", i, ai, j, bj))
+        elif j < bj:
+            opcodes.append(("insert", i, ai, j, bj))
+        if n:
+            opcodes.append(("equal", ai, ai + n, bj, bj + n))
+        i, j = ai + n, bj + n
+    return opcodes
+
+
+def diff_events(events, other):
+    """
+    Compare two sequences of events by :attr:`SSAEvent.fingerprint`, see :meth:`SSAFile.diff()`.
+    """
+    deleted, inserted, modified = [], [], []
+    a = [ev.fingerprint for ev in events]
+    b = [ev.fingerprint for ev in other]
+    for tag, i1, i2, j1, j2 in get_opcodes(a, b):
+        if tag == "delete":
+            deleted.extend(range(i1, i2))
+        elif tag == "insert":
+            inserted.extend(range(j1, j2))
+        elif tag == "replace":
+            # changed events in place of each other pair up, the rest is deleted or inserted
+            n = min(i2 - i1, j2 - j1)
+            modified.extend(zip(range(i1, i1 + n), range(j1, j1 + n)))
+            deleted.extend(range(i1 + n, i2))
+            inserted.extend(range(j1 + n, j2))
+    return EventDiff(deleted, inserted, modified)
@@ -0,0 +1,303 @@
+from __future__ import division, unicode_literals
+from array import array
+from collections import MutableSequence
+from numbers import Integral
+from .ssaevent import SSAEvent
+from .common import fingerprint
+
+
+def _typecode(*candidates):
+    # array() wants a native str typecode on Python 2, which also lacks "q"
+    for code in candidates:
+        try:
+            array(str(code))
+            return str(code)
+        except ValueError:
+            pass
+
+#: Typecode for columns with timestamps (64-bit where available).
+TIME_TYPECODE = _typecode("q", "l")
+#: Typecode for columns with small integers and string ids.
+INT_TYPECODE = _typecode("l")
+BOOL_TYPECODE = _typecode("b")
+
+
+def _as_int(v):
+    return v if isinstance(v, Integral) else int(round(v))
+
+
+class StringTable(object):
+    """
+    Interned strings, each stored once and referred to by an integer id.
+
+    Ids are never reused, so an id stays valid for the lifetime of the table.
+    """
+    def __init__(self):
+        self.strings = []
+        self.ids = {}
+
+    def intern(self, s):
+        """Return id of string s, adding it to the table if needed."""
+        try:
+            return self.ids[s]
+        except KeyError:
+            i = self.ids[s] = len(self.strings)
+            self.strings.append(s)
+            return i
+
+    def __getitem__(self, i):
+        return self.strings[i]
+
+    def __len__(self):
+        return len(self.strings)
+
+
+def _int_field(column):
+    def fget(self):
+        return getattr(self._table, column)[self._row]
+
+    def fset(self, value):
+        getattr(self._table, column)[self._row] = _as_int(value)
+
+    return property(fget, fset)
+
+def _bool_field(column):
+    def fget(self):
+        return bool(getattr(self._table, column)[self._row])
+
+    def fset(self, value):
+        getattr(self._table, column)[self._row] = bool(value)
+
+    return property(fget, fset)
+
+def _string_field(column):
+    def fget(self):
+        table = self._table
+        return table.strings[getattr(table, column)[self._row]]
+
+    def fset(self, value):
+        table = self._table
+        getattr(table, column)[self._row] = table.strings.intern(value)
+
+    return property(fget, fset)
+
+def _text_field():
+    def fget(self):
+        return self._table.text[self._row]
+
+    def fset(self, value):
+        self._table.text[self._row] = value
+
+    return property(fget, fset)
+
+def _extra_field():
+    def fget(self):
+        return self._table.extra.get(self._row)
+
+    def fset(self, value):
+        if value is None:
+            self._table.extra.pop(self._row, None)
+        else:
+            self._table.extra[self._row] = value
+
+    return property(fget, fset)
+
+
+class EventView(SSAEvent):
+    """
+    An :class:`SSAEvent` whose fields live in a row of an :class:`EventTable`.
+
+    Views are created on access (``subs[0]`` returns a new view each time) and are cheap.
+    Reading and writing attributes works like with a regular :class:`SSAEvent`;
+    writes go straight to the table. Use :meth:`SSAEvent.copy()` to get a standalone event.
+
+    """
+    __slots__ = ("_table", "_row")
+
+    start = _int_field("start")
+    end = _int_field("end")
+    layer = _int_field("layer")
+    marginl = _int_field("marginl")
+    marginr = _int_field("marginr")
+    marginv = _int_field("marginv")
+    marked = _bool_field("marked")
+    style = _string_field("style")
+    name = _string_field("name")
+    effect = _string_field("effect")
+    type = _string_field("type")
+    text = _text_field()
+    extra = _extra_field()
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    @property
+    def fingerprint(self):
+        # views are short-lived, the cache lives in the table
+        key = self._fingerprint_key()
+        cached = self._table.fingerprints.get(self._row)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = fingerprint(key)
+        self._table.fingerprints[self._row] = key, value
+        return value
+
+
+class EventTable(MutableSequence):
+    """
+    Columnar storage of subtitles, an optional backend for :attr:`SSAFile.events`.
+
+    Instead of one Python object per subtitle, fields are kept in parallel columns:
+    times and numbers in :class:`array.array`, style/name/effect/type as ids into
+    a shared :class:`StringTable` and text in a plain list. This takes several times
+    less memory than a list of :class:`SSAEvent` and allows bulk retiming
+    (see :mod:`pysubs2.retime`) without touching individual events.
+
+    The table has the same list-like interface as :attr:`SSAFile.events`, items are
+    :class:`EventView` instances. Events added to the table are copied into it
+    (unless they are views of the same table), so later changes to the original
+    :class:`SSAEvent` objects are not reflected.
+
+    Example::
+
+        subs = SSAFile.load("subtitles.srt", columnar=True)
+        subs.events[0].text = "New text" # writes into the table
+
+    """
+
+    def __init__(self, events=()):
+        self.start = array(TIME_TYPECODE)
+        self.end = array(TIME_TYPECODE)
+        self.layer = array(INT_TYPECODE)
+        self.marginl = array(INT_TYPECODE)
+        self.marginr = array(INT_TYPECODE)
+        self.marginv = array(INT_TYPECODE)
+        self.marked = array(BOOL_TYPECODE)
+        self.style = array(INT_TYPECODE)
+        self.name = array(INT_TYPECODE)
+        self.effect = array(INT_TYPECODE)
+        self.type = array(INT_TYPECODE)
+        self.text = []
+        self.extra = {} #: Maps rows to :attr:`SSAEvent.extra`, for the few events which have it.
+        self.strings = StringTable() #: Shared string table for style, name, effect and type columns.
+        self.fingerprints = {} #: Cache of :attr:`SSAEvent.fingerprint` by row.
+
+        # Rows are never moved, so that views stay valid; order maps positions to rows.
+        self.order = array(INT_TYPECODE)
+        self.extend(events)
+
+    @property
+    def rows(self):
+        """Number of allocated rows, including ones no longer referenced (see :meth:`EventTable.compact()`)."""
+        return len(self.text)
+
+    def _add_row(self, ev):
+        if isinstance(ev, EventView) and ev._table is self:
+            return ev._row
+
+        intern = self.strings.intern
+        self.start.append(_as_int(ev.start))
+        self.end.append(_as_int(ev.end))
+        self.layer.append(_as_int(ev.layer))
+        self.marginl.append(_as_int(ev.marginl))
+        self.marginr.append(_as_int(ev.marginr))
+        self.marginv.append(_as_int(ev.marginv))
+        self.marked.append(bool(ev.marked))
+        self.style.append(intern(ev.style))
+        self.name.append(intern(ev.name))
+        self.effect.append(intern(ev.effect))
+        self.type.append(intern(ev.type))
+        self.text.append(ev.text)
+        row = len(self.text) - 1
+        if ev.extra is not None:
+            self.extra[row] = dict(ev.extra)
+        return row
+
+    # ------------------------------------------------------------------------
+    # Bulk operations
+    # ------------------------------------------------------------------------
+
+    def extend_columns(self, columns, strings):
+        """
+        Append events given as columns, without creating per-event objects.
+
+        Arguments:
+            columns (dict): Maps field names (all of :attr:`SSAEvent.FIELDS`) to sequences
+                of equal length. Style, name, effect and type are given as indices into ``strings``.
+            strings (list): Strings referred to by ``columns``.
+
+        """
+        intern = self.strings.intern
+        ids = [intern(s) for s in strings]
+        first = self.rows
+        for f in ("start", "end", "layer", "marginl", "marginr", "marginv", "marked"):
+            getattr(self, f).extend(array(getattr(self, f).typecode, columns[f]))
+        for f in ("style", "name", "effect", "type"):
+            getattr(self, f).extend(array(INT_TYPECODE, [ids[i] for i in columns[f]]))
+        self.text.extend(columns["text"])
+        self.order.extend(array(INT_TYPECODE, range(first, self.rows)))
+
+    def sort(self):
+        """Sort events by (start, end), in-place. The sort is stable."""
+        start, end = self.start, self.end
+        self.order[:] = array(INT_TYPECODE, sorted(self.order, key=lambda row: (start[row], end[row])))
+
+    def compact(self):
+        """
+        Drop rows which are no longer referenced (after deletion or replacement of events).
+
+        Warning:
+            This renumbers rows, previously obtained :class:`EventView` instances
+            must not be used afterwards.
+        """
+        rows = self.order
+        for column in ("start", "end", "layer", "marginl", "marginr", "marginv",
+                       "marked", "style", "name", "effect", "type"):
+            old = getattr(self, column)
+            old[:] = array(old.typecode, [old[row] for row in rows])
+        self.text[:] = [self.text[row] for row in rows]
+        extra = self.extra
+        self.extra = {i: dict(extra[row]) for i, row in enumerate(rows) if row in extra}
+        self.fingerprints = {}
+        self.order[:] = array(INT_TYPECODE, range(len(rows)))
+
+    # ------------------------------------------------------------------------
+    # MutableSequence implementation
+    # ------------------------------------------------------------------------
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [EventView(self, row) for row in self.order[item]]
+        return EventView(self, self.order[item])
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            self.order[key] = array(INT_TYPECODE, [self._add_row(ev) for ev in value])
+        else:
+            self.order[key] = self._add_row(value)
+
+    def __delitem__(self, key):
+        del self.order[key]
+
+    def __len__(self):
+        return len(self.order)
+
+    def __iter__(self):
+        for row in self.order:
+            yield EventView(self, row)
+
+    def insert(self, index, value):
+        self.order.insert(index, self._add_row(value))
+
+    def append(self, value):
+        self.order.append(self._add_row(value))
+
+    def extend(self, values):
+        if values is self:
+            values = list(values)
+        for ev in values:
+            self.order.append(self._add_row(ev))
+
+    def __repr__(self):
+        return "<EventTable with %d events>" % len(self)
@@ -4,7 +4,8 @@ class FormatBase(object):
 
     How to implement a new subtitle format:
 
-    1. Create a subclass of FormatBase and override the methods you want to support.
+    1. Create a subclass of FormatBase and override the methods you want to support
+       (for writing, it is enough to implement :meth:`FormatBase.write_events()`).
     2. Decide on a format identifier, like the ``"srt"`` or ``"microdvd"`` already used in the library.
     3. Add your identifier and class to :data:`pysubs2.formats.FORMAT_IDENTIFIER_TO_FORMAT_CLASS`.
     4. (optional) Add your file extension and class to :data:`pysubs2.formats.FILE_EXTENSION_TO_FORMAT_IDENTIFIER`.
@@ -41,8 +42,9 @@ class FormatBase(object):
         """
         Write SSAFile into a file.
 
-        If you need framerate and it is not passed in keyword arguments,
-        use ``subs.fps``.
+        The default implementation passes header data, styles and events
+        of ``subs`` to :meth:`FormatBase.write_events()`. When framerate
+        is not passed in keyword arguments, ``subs.fps`` is used.
 
         Arguments:
             subs (SSAFile): Subtitle file to write.
@@ -59,6 +61,38 @@ class FormatBase(object):
             pysubs2.exceptions.UnknownFPSError: Framerate was not provided and
                 ``subs.fps is None``.
         """
+        if kwargs.get("fps") is None:
+            kwargs["fps"] = subs.fps
+        cls.write_events(fp, subs.events, format_, info=subs.info, styles=subs.styles,
+                         aegisub_project=subs.aegisub_project, attachments=subs.attachments, **kwargs)
+
+    @classmethod
+    def write_events(cls, fp, events, format_, info=None, styles=None, aegisub_project=None, **kwargs):
+        """
+        Write subtitles from an iterable of events into a file.
+
+        Unlike :meth:`FormatBase.to_file()`, this does not need an :class:`SSAFile`.
+        Events are written as they are consumed from the iterable and nothing
+        but the current line is kept in memory, so ``events`` may be a generator.
+
+        Arguments:
+            fp (file object): Text file object used as output.
+            events (iterable): :class:`SSAEvent` instances, in output order.
+            format_ (str): Format identifier of desired output format.
+            info (dict): Script metadata, ie. ``[Script Info]`` (SubStation only).
+            styles (dict): Mapping of style names to :class:`SSAStyle` instances.
+                Formats which cannot store styles still use them to resolve
+                italics etc. When omitted, only the default style is known.
+            aegisub_project (dict): Aegisub project data (SubStation only).
+            attachments (list): Embedded files, see :attr:`SSAFile.attachments` (SubStation only).
+            kwargs: Extra options, eg. `fps`.
+
+        Returns:
+            None
+
+        Raises:
+            pysubs2.exceptions.UnknownFPSError: Framerate was not provided.
+        """
         raise NotImplementedError("Writing is not supported for this format")
 
     @classmethod
@@ -74,3 +108,24 @@ class FormatBase(object):
             format identifier (eg. ``"srt"``) or None (unknown format)
         """
         return None
+
+    @classmethod
+    def match_signature(cls, line, lineno):
+        """
+        Look for signs of the format in a single line, for autodetection.
+
+        :func:`pysubs2.formats.autodetect_format()` feeds lines from the beginning
+        of the file to all formats at once, which is faster than calling
+        :meth:`FormatBase.guess_format()` of each. Formats which do not override
+        this method are detected with :meth:`FormatBase.guess_format()`.
+        The two should agree.
+
+        Arguments:
+            line (str): Line of the file, without line terminator.
+            lineno (int): Index of the line, starting from 0.
+
+        Returns:
+            format identifier (eg. ``"srt"``) if the line looks like this format,
+            False if the line rules the format out, or None (nothing found).
+        """
+        return None
@@ -2,6 +2,7 @@ from .formatbase import FormatBase
 from .microdvd import MicroDVDFormat
 from .subrip import SubripFormat
 from .jsonformat import JSONFormat
+from .jsoncolumnar import JSONColumnarFormat
 from .substation import SubstationFormat
 from .mpl2 import MPL2Format
 from .tmp import TmpFormat
@@ -24,6 +25,7 @@ FORMAT_IDENTIFIER_TO_FORMAT_CLASS = {
     "ssa": SubstationFormat,
     "microdvd": MicroDVDFormat,
     "json": JSONFormat,
+    "json-columnar": JSONColumnarFormat,
     "mpl2": MPL2Format,
     "tmp": TmpFormat,
 }
@@ -35,6 +37,14 @@ def get_format_class(format_):
     except KeyError:
         raise UnknownFormatIdentifierError(format_)
 
+def write_events(fp, events, format_, **kwargs):
+    """
+    Write an iterable of events in given format, without building an SSAFile.
+
+    See :meth:`FormatBase.write_events()` for accepted arguments (eg. `info`, `styles`, `fps`).
+    """
+    get_format_class(format_).write_events(fp, events, format_, **kwargs)
+
 def get_format_identifier(ext):
     """File extension -> format identifier"""
     try:
@@ -53,10 +63,67 @@ def get_file_extension(format_):
 
     raise RuntimeError("No file extension for format %r" % format_)
 
-def autodetect_format(content):
-    """Return format identifier for given fragment or raise FormatAutodetectionError."""
-    formats = set()
-    for impl in FORMAT_IDENTIFIER_TO_FORMAT_CLASS.values():
+#: Number of characters from the beginning of a file used for autodetection.
+PEEK_SIZE = 10000
+
+#: Number of matching lines after which a format is taken as detected,
+#: provided that no other format matched (one line is enough for the format
+#: suggested by file extension).
+SIGNATURE_HITS = 3
+
+def autodetect_format(content, ext=None):
+    """
+    Return format identifier for given fragment or raise FormatAutodetectionError.
+
+    The fragment is scanned once, line by line, with
+    :meth:`FormatBase.match_signature()` of all formats. Scanning stops as soon
+    as the result is clear.
+
+    Arguments:
+        content (str): Beginning of a subtitle file (see :data:`PEEK_SIZE`).
+        ext (str): Optional file extension (eg. ``".srt"``), used as a hint:
+            when several formats match, the one belonging to the extension wins.
+
+    """
+    prior = FILE_EXTENSION_TO_FORMAT_IDENTIFIER.get(ext.lower()) if ext else None
+
+    matchers, others = [], []
+    for impl in set(FORMAT_IDENTIFIER_TO_FORMAT_CLASS.values()):
+        if impl.match_signature.__func__ is not FormatBase.match_signature.__func__:
+            matchers.append(impl)
+        else:
+            others.append(impl)
+
+    hits = {} # (impl, identifier) -> number of matching lines
+    excluded = set()
+
+    def candidates():
+        return {identifier for impl, identifier in hits if impl not in excluded}
+
+    for lineno, line in enumerate(content.splitlines()):
+        found = False
+        for impl in matchers:
+            if impl in excluded:
+                continue
+            result = impl.match_signature(line, lineno)
+            if result is False:
+                excluded.add(impl)
+            elif result is not None:
+                key = impl, result
+                hits[key] = hits.get(key, 0) + 1
+                found = True
+
+        if found and not others:
+            formats = candidates()
+            if len(formats) == 1:
+                format_, = formats
+                count = sum(n for (impl, identifier), n in hits.items()
+                            if identifier == format_ and impl not in excluded)
+                if format_ == prior or count >= SIGNATURE_HITS:
+                    return format_
+
+    formats = candidates()
+    for impl in others:
         guess = impl.guess_format(content)
         if guess is not None:
             formats.add(guess)
@@ -65,5 +132,7 @@ def autodetect_format(content):
         return formats.pop()
     elif not formats:
         raise FormatAutodetectionError("No suitable formats")
+    elif prior in formats:
+        return prior
     else:
         raise FormatAutodetectionError("Multiple suitable formats (%r)" % formats)
@@ -0,0 +1,158 @@
+from __future__ import unicode_literals, print_function
+
+import json
+from .common import Color, text_type
+from .eventtable import EventTable, StringTable
+from .ssaevent import SSAEvent
+from .ssastyle import SSAStyle
+from .formatbase import FormatBase
+
+#: Version of the ``json-columnar`` document written by :class:`JSONColumnarFormat`.
+JSON_COLUMNAR_VERSION = 2
+
+#: Beginning of every ``json-columnar`` document, used for autodetection.
+JSON_COLUMNAR_SIGNATURE = '{"format": "json-columnar"'
+
+#: Event fields stored as numbers, in document order.
+NUMERIC_EVENT_FIELDS = ("start", "end", "layer", "marginl", "marginr", "marginv", "marked")
+#: Event fields stored as ids into the string table, in document order.
+STRING_EVENT_FIELDS = ("style", "name", "effect", "type")
+
+
+def pack_color(c):
+    """Pack :class:`Color` into int ``0xRRGGBBAA``."""
+    return c.r << 24 | c.g << 16 | c.b << 8 | c.a
+
+def unpack_color(v):
+    """Inverse of :func:`pack_color()`."""
+    return Color(v >> 24 & 0xff, v >> 16 & 0xff, v >> 8 & 0xff, v & 0xff)
+
+
+class JSONColumnarFormat(FormatBase):
+    """
+    Compact JSON representation of :class:`SSAFile`, meant for caching parsed subtitles.
+
+    Instead of one object per event, the document has one array per field::
+
+        {"format": "json-columnar", "version": 2, "fps": null,
+         "info": [[key, value], ...], "aegisub_project": [[key, value], ...],
+         "attachments": [[heading, text], ...],
+         "strings": ["Default", "", "Dialogue", ...],
+         "styles": {"name": [0, ...], "fontname": [...], "primarycolor": [4294967040, ...], ...,
+                    "extra": [null, ...]},
+         "events": {"start": [...], "end": [...], ..., "style": [0, ...], "text": [...],
+                    "extra": [[index, {column: value}], ...]}}
+
+    Style and event names, effects and types are ids into ``strings``,
+    colors are packed into ints (see :func:`pack_color()`).
+    Readers reject documents with a newer ``version``; version 1 had no ``attachments``.
+
+    """
+    @classmethod
+    def guess_format(cls, text):
+        if text.startswith(JSON_COLUMNAR_SIGNATURE):
+            return "json-columnar"
+
+    @classmethod
+    def match_signature(cls, line, lineno):
+        return "json-columnar" if lineno == 0 and line.startswith(JSON_COLUMNAR_SIGNATURE) else False
+
+    @classmethod
+    def from_file(cls, subs, fp, format_, **kwargs):
+        data = json.load(fp)
+        if data.get("format") != "json-columnar" or data.get("version") not in (1, JSON_COLUMNAR_VERSION):
+            raise ValueError("Unsupported json-columnar document (format %r, version %r)"
+                             % (data.get("format"), data.get("version")))
+
+        strings = data["strings"]
+        if data.get("fps") is not None and kwargs.get("fps") is None:
+            subs.fps = data["fps"]
+
+        subs.info.clear()
+        subs.info.update((k, v) for k, v in data["info"])
+        subs.aegisub_project.clear()
+        subs.aegisub_project.update((k, v) for k, v in data["aegisub_project"])
+        subs.attachments[:] = [(heading, text) for heading, text in data.get("attachments", [])]
+
+        styles = data["styles"]
+        columns = []
+        for f in SSAStyle._FIELD_ORDER:
+            if "color" in f:
+                columns.append(map(unpack_color, styles[f]))
+            else:
+                columns.append(styles[f])
+
+        subs.styles.clear()
+        for i, values in enumerate(zip(*columns)):
+            extra = styles["extra"][i]
+            subs.styles[strings[styles["name"][i]]] = SSAStyle._make(*values, extra=extra)
+
+        events = data["events"]
+        offset = len(subs.events)
+        if isinstance(subs.events, EventTable):
+            subs.events.extend_columns(events, strings)
+        else:
+            style, name, effect, type_ = ([strings[i] for i in events[f]] for f in STRING_EVENT_FIELDS)
+            subs.events.extend(map(SSAEvent._make, events["start"], events["end"], events["text"], events["layer"],
+                                   style, name, events["marginl"], events["marginr"], events["marginv"],
+                                   effect, type_, map(bool, events["marked"])))
+
+        for i, extra in events["extra"]:
+            subs.events[offset + i].extra = extra
+
+    @classmethod
+    def write_events(cls, fp, events, format_, info=None, styles=None, aegisub_project=None, fps=None,
+                     attachments=(), **kwargs):
+        if info is None: info = {}
+        if styles is None: styles = {"Default": SSAStyle.DEFAULT_STYLE}
+        if aegisub_project is None: aegisub_project = {}
+
+        strings = StringTable()
+        intern = strings.intern
+
+        style_columns = {"name": [intern(name) for name in styles]}
+        style_rows = [sty._values() for sty in styles.values()]
+        for i, f in enumerate(SSAStyle._FIELD_ORDER):
+            values = [row[i] for row in style_rows]
+            style_columns[f] = list(map(pack_color, values)) if "color" in f else values
+        style_columns["extra"] = [sty.extra for sty in styles.values()]
+
+        event_columns = {}
+        if isinstance(events, EventTable):
+            # straight from the table columns
+            order = events.order
+            table_strings = events.strings.strings
+            for f in NUMERIC_EVENT_FIELDS:
+                column = getattr(events, f)
+                event_columns[f] = [column[row] for row in order]
+            for f in STRING_EVENT_FIELDS:
+                # interned in order of use, so that the document does not depend on the backend
+                column = getattr(events, f)
+                event_columns[f] = [intern(table_strings[column[row]]) for row in order]
+            text = events.text
+            event_columns["text"] = [text[row] for row in order]
+            extra = events.extra
+            event_columns["extra"] = [[i, extra[row]] for i, row in enumerate(order) if row in extra]
+        else:
+            if not isinstance(events, list):
+                events = list(events)
+            for f in NUMERIC_EVENT_FIELDS:
+                event_columns[f] = [getattr(ev, f) for ev in events]
+            event_columns["marked"] = [int(v) for v in event_columns["marked"]]
+            for f in STRING_EVENT_FIELDS:
+                event_columns[f] = [intern(getattr(ev, f)) for ev in events]
+            event_columns["text"] = [ev.text for ev in events]
+            event_columns["extra"] = [[i, ev.extra] for i, ev in enumerate(events) if ev.extra is not None]
+
+        # Written piece by piece to keep the key order (and JSON_COLUMNAR_SIGNATURE) fixed.
+        fp.write('%s, "version": %d' % (JSON_COLUMNAR_SIGNATURE, JSON_COLUMNAR_VERSION))
+        for key, value in (("fps", fps),
+                           ("info", list(info.items())),
+                           ("aegisub_project", list(aegisub_project.items())),
+                           ("attachments", [list(a) for a in attachments]),
+                           ("strings", strings.strings),
+                           ("styles", style_columns),
+                           ("events", event_columns)):
+            fp.write(', "%s": ' % key)
+            fp.write(text_type(json.dumps(value, separators=(",", ":"))))
+        fp.write("}\n")
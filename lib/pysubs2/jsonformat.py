@@ -1,18 +1,26 @@
 from __future__ import unicode_literals, print_function
 
 import json
-from .common import Color, PY3
+from .common import Color, text_type
 from .ssaevent import SSAEvent
 from .ssastyle import SSAStyle
 from .formatbase import FormatBase
+from .jsoncolumnar import JSON_COLUMNAR_SIGNATURE
 
 
 class JSONFormat(FormatBase):
     @classmethod
     def guess_format(cls, text):
-        if text.startswith("{\""):
+        if text.startswith("{\"") and not text.startswith(JSON_COLUMNAR_SIGNATURE):
             return "json"
 
+    @classmethod
+    def match_signature(cls, line, lineno):
+        # JSON is recognized by its first line only
+        if lineno == 0 and line.startswith("{\"") and not line.startswith(JSON_COLUMNAR_SIGNATURE):
+            return "json"
+        return False
+
     @classmethod
     def from_file(cls, subs, fp, format_, **kwargs):
         data = json.load(fp)
@@ -29,18 +37,21 @@ class JSONFormat(FormatBase):
                 else:
                     setattr(sty, k, v)
 
-        subs.events = [SSAEvent(**fields) for fields in data["events"]]
+        subs.events.extend(SSAEvent(**fields) for fields in data["events"])
 
     @classmethod
-    def to_file(cls, subs, fp, format_, **kwargs):
-        data = {
-            "info": dict(**subs.info),
-            "styles": {name: sty.as_dict() for name, sty in subs.styles.items()},
-            "events": [ev.as_dict() for ev in subs.events]
-        }
-
-        if PY3:
-            json.dump(data, fp)
-        else:
-            text = json.dumps(data)
-            fp.write(unicode(text))
+    def write_events(cls, fp, events, format_, info=None, styles=None, **kwargs):
+        if info is None: info = {}
+        if styles is None: styles = {"Default": SSAStyle.DEFAULT_STYLE}
+
+        # Same document as json.dump({"info": ..., "styles": ..., "events": [...]}),
+        # but the events are serialized one at a time.
+        fp.write('{"info": ')
+        fp.write(text_type(json.dumps(dict(**info))))
+        fp.write(', "styles": ')
+        fp.write(text_type(json.dumps({name: sty.as_dict() for name, sty in styles.items()})))
+        fp.write(', "events": [')
+        for i, ev in enumerate(events):
+            if i: fp.write(", ")
+            fp.write(text_type(json.dumps(ev.as_dict())))
+        fp.write("]}")
@@ -0,0 +1,65 @@
+from __future__ import unicode_literals
+
+
+def _snap(ev, candidates, snap, min_start, max_start):
+    # move start/end of ev to the nearest start/end of candidates, if closer than snap;
+    # the start stays within [min_start, max_start] so that the output stays sorted
+    best = None
+    for other in candidates:
+        if (other is not None and abs(other.start - ev.start) <= snap and other.start < ev.end and
+                (max_start is None or other.start <= max_start)):
+            if best is None or abs(other.start - ev.start) < abs(best.start - ev.start):
+                best = other
+    if best is not None:
+        # never before an event already yielded
+        ev.start = best.start if min_start is None else max(best.start, min_start)
+
+    best = None
+    for other in candidates:
+        if other is not None and abs(other.end - ev.end) <= snap and other.end > ev.start:
+            if best is None or abs(other.end - ev.end) < abs(best.end - ev.end):
+                best = other
+    if best is not None:
+        ev.end = best.end
+
+
+def merge_events(first, second, snap=0):
+    """
+    Merge two streams of events sorted by start time into one, in a single pass.
+
+    This is a generator; events are taken from the inputs as needed and yielded
+    as they are (not copied), so that eg. two files can be written as one with
+    :meth:`FormatBase.write_events()` without building a merged list.
+    On equal start times, events from ``first`` come first.
+
+    Arguments:
+        first, second: Iterables of :class:`SSAEvent`, each sorted by start
+            (see :meth:`SSAFile.sort()`).
+        snap (int): When nonzero, start and end times of events from ``second``
+            which are at most this many milliseconds from those of a neighbouring
+            event from ``first`` are changed to match them (in-place), so that lines
+            of a translation appear and disappear together.
+
+    Example:
+        >>> top, bottom = SSAFile.load("movie.en.srt"), SSAFile.load("movie.cs.srt")
+        >>> for ev in top: ev.style = "Top"
+        >>> events = merge_events(bottom, top, snap=200)
+
+    """
+    a, b = iter(first), iter(second)
+    x, y = next(a, None), next(b, None)
+    last = None # last event yielded from first
+    last_start = None
+
+    while x is not None or y is not None:
+        if y is None or (x is not None and x.start <= y.start):
+            ev, last = x, x
+            x = next(a, None)
+        else:
+            ev = y
+            y = next(b, None)
+            if snap:
+                # never after the next event of second, which is yielded later
+                _snap(ev, (last, x), snap, last_start, y.start if y is not None else None)
+        last_start = ev.start
+        yield ev
@@ -1,17 +1,50 @@
-from __future__ import unicode_literals, print_function
+from __future__ import division, unicode_literals, print_function
 
-from functools import partial
+from itertools import chain
 import re
 from .common import text_type
 from .exceptions import UnknownFPSError
 from .ssaevent import SSAEvent
 from .ssastyle import SSAStyle
 from .formatbase import FormatBase
-from .substation import parse_tags
-from .time import ms_to_frames, frames_to_ms
+from .substation import parse_tags, write_chunked
 
 #: Matches a MicroDVD line.
 MICRODVD_LINE = re.compile(r" *\{ *(\d+) *\} *\{ *(\d+) *\}(.+)")
+#: Matches MicroDVD style tag, eg. ``{y:i}``.
+MICRODVD_STYLE = re.compile(r"\{[Yy]:[^}]+\}")
+#: Matches MicroDVD font tag, eg. ``{f:Arial}``.
+MICRODVD_FONT = re.compile(r"\{[Ff]:([^}]+)\}")
+#: Matches MicroDVD font size tag, eg. ``{s:20}``.
+MICRODVD_SIZE = re.compile(r"\{[Ss]:([^}]+)\}")
+#: Matches MicroDVD position tag, eg. ``{P:100,200}``.
+MICRODVD_POSITION = re.compile(r"\{P:(\d+),(\d+)\}")
+
+
+def _check_fps(fps):
+    if fps <= 0:
+        raise ValueError("Framerate must be positive number (%f)." % fps)
+
+def _style_replacer(match):
+    tags = [c for c in "biu" if c in match.group(0)]
+    return "{%s}" % "".join(r"\%s1" % c for c in tags)
+
+def _prepare_text(text):
+    text = text.replace("|", r"\N")
+
+    if "{" in text:
+        text = MICRODVD_STYLE.sub(_style_replacer, text)
+        text = MICRODVD_FONT.sub(r"{\\fn\1}", text)
+        text = MICRODVD_SIZE.sub(r"{\\fs\1}", text)
+        text = MICRODVD_POSITION.sub(r"{\\pos(\1,\2)}", text)
+
+    return text.strip()
+
+def _is_blank(fragment):
+    fragment = fragment.replace(r"\h", " ")
+    fragment = fragment.replace(r"\n", "\n")
+    fragment = fragment.replace(r"\N", "\n")
+    return not fragment or fragment.isspace()
 
 
 class MicroDVDFormat(FormatBase):
@@ -20,15 +53,23 @@ class MicroDVDFormat(FormatBase):
         if any(map(MICRODVD_LINE.match, text.splitlines())):
             return "microdvd"
 
+    @classmethod
+    def match_signature(cls, line, lineno):
+        if MICRODVD_LINE.match(line):
+            return "microdvd"
+
     @classmethod
     def from_file(cls, subs, fp, format_, fps=None, **kwargs):
+        ms_per_frame = None
+        make = SSAEvent._make
+        append = subs.events.append
+
         for line in fp:
             match = MICRODVD_LINE.match(line)
             if not match:
                 continue
 
             fstart, fend, text = match.groups()
-            fstart, fend = map(int, (fstart, fend))
 
             if fps is None:
                 # We don't know the framerate, but it is customary to include
@@ -43,61 +84,47 @@ class MicroDVDFormat(FormatBase):
                                           "cannot be read from "
                                           "the MicroDVD file.")
 
-            start, end = map(partial(frames_to_ms, fps=fps), (fstart, fend))
-
-            def prepare_text(text):
-                text = text.replace("|", r"\N")
-
-                def style_replacer(match):
-                    tags = [c for c in "biu" if c in match.group(0)]
-                    return "{%s}" % "".join(r"\%s1" % c for c in tags)
-
-                text = re.sub(r"\{[Yy]:[^}]+\}", style_replacer, text)
-                text = re.sub(r"\{[Ff]:([^}]+)\}", r"{\\fn\1}", text)
-                text = re.sub(r"\{[Ss]:([^}]+)\}", r"{\\fs\1}", text)
-                text = re.sub(r"\{P:(\d+),(\d+)\}", r"{\\pos(\1,\2)}", text)
-
-                return text.strip()
+            if ms_per_frame is None:
+                _check_fps(fps)
+                ms_per_frame = 1000 / fps # same rounding as frames_to_ms()
 
-            ev = SSAEvent(start=start, end=end, text=prepare_text(text))
-            subs.append(ev)
+            append(make(int(round(int(fstart) * ms_per_frame)), int(round(int(fend) * ms_per_frame)),
+                        _prepare_text(text)))
 
     @classmethod
-    def to_file(cls, subs, fp, format_, fps=None, write_fps_declaration=True, **kwargs):
-        if fps is None:
-            fps = subs.fps
+    def write_events(cls, fp, events, format_, styles=None, fps=None, write_fps_declaration=True, **kwargs):
+        if styles is None: styles = {}
 
         if fps is None:
             raise UnknownFPSError("Framerate must be specified when writing MicroDVD.")
-        to_frames = partial(ms_to_frames, fps=fps)
+        _check_fps(fps)
+
+        def to_frames(ms):
+            # same as ms_to_frames()
+            frames = int(round((ms / 1000) * fps))
+            return frames if frames > 0 else 0 # XXX warn on underflow?
 
         def is_entirely_italic(line):
-            style = subs.styles.get(line.style, SSAStyle.DEFAULT_STYLE)
-            for fragment, sty in parse_tags(line.text, style, subs.styles):
-                fragment = fragment.replace(r"\h", " ")
-                fragment = fragment.replace(r"\n", "\n")
-                fragment = fragment.replace(r"\N", "\n")
-                if not sty.italic and fragment and not fragment.isspace():
-                    return False
-            return True
-
-        # insert an artificial first line telling the framerate
+            text = line.text
+            style = styles.get(line.style, SSAStyle.DEFAULT_STYLE)
+            if r"\i" not in text and r"\r" not in text:
+                # italics cannot change within the line
+                return style.italic or all(map(_is_blank, SSAEvent.OVERRIDE_SEQUENCE.split(text)))
+            return all(sty.italic or _is_blank(fragment) for fragment, sty in parse_tags(text, style, styles))
+
+        # prepend an artificial first line telling the framerate
         if write_fps_declaration:
-            subs.insert(0, SSAEvent(start=0, end=0, text=text_type(fps)))
-
-        for line in (ev for ev in subs if not ev.is_comment):
-            text = "|".join(line.plaintext.splitlines())
-            if is_entirely_italic(line):
-                text = "{Y:i}" + text
+            events = chain([SSAEvent(start=0, end=0, text=text_type(fps))], events)
 
-            start, end = map(to_frames, (line.start, line.end))
+        def format_lines():
+            for line in events:
+                if line.is_comment:
+                    continue
 
-            # XXX warn on underflow?
-            if start < 0: start = 0
-            if end < 0: end = 0
+                text = "|".join(line.plaintext.splitlines())
+                if is_entirely_italic(line):
+                    text = "{Y:i}" + text
 
-            print("{%d}{%d}%s" % (start, end, text), file=fp)
+                yield "{%d}{%d}%s\n" % (to_frames(line.start), to_frames(line.end), text)
 
-        # remove the artificial framerate-telling line
-        if write_fps_declaration:
-            subs.pop(0)
+        write_chunked(fp, format_lines())
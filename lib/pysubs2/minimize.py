@@ -0,0 +1,110 @@
+from __future__ import unicode_literals
+from collections import namedtuple
+import re
+
+#: Result of :meth:`SSAFile.minimize()`, numbers of removed events, styles and override tags,
+#: and characters removed from event texts.
+MinimizeStats = namedtuple("MinimizeStats", ["events", "styles", "tags", "chars"])
+
+#: Pattern that splits text into text and override blocks (captured, with braces).
+OVERRIDE_BLOCK = re.compile(r"({[^}]*})")
+#: Pattern that matches one override tag, including parenthesized arguments (eg. ``\t(...)``).
+OVERRIDE_TAG = re.compile(r"\\[^\\(]*(?:\([^)]*\)?[^\\(]*)*")
+#: Pattern that splits override tag into name and value, for tags which set a value until changed
+#: (longer names first, so that eg. ``\fscx`` is not read as ``\fs``).
+STATE_TAG = re.compile(r"\\(?!i?clip)(xbord|ybord|xshad|yshad|bord|shad|blur|be|fscx|fscy|fsp|fs|fn|frx|fry|frz|fr|fax|fay|fe|"
+                       r"alpha|[1-4]c|[1-4]a|c|i|b|u|s)(.*)$", re.DOTALL)
+
+_ALIASES = {"c": "1c", "fr": "frz"}
+# tags which set (part of) the same value, setting one makes the other unknown
+_SHARED = {"alpha": ("1a", "2a", "3a", "4a"), "1a": ("alpha",), "2a": ("alpha",), "3a": ("alpha",), "4a": ("alpha",),
+           "bord": ("xbord", "ybord"), "xbord": ("bord",), "ybord": ("bord",),
+           "shad": ("xshad", "yshad"), "xshad": ("shad",), "yshad": ("shad",)}
+_STYLE_FLAGS = (("i", "italic"), ("b", "bold"), ("u", "underline"), ("s", "strikeout"))
+
+
+def _style_state(style):
+    # values of \i, \b, \u, \s which do nothing given the style
+    if style is None:
+        return {}
+    return {tag: "1" if getattr(style, field) else "0" for tag, field in _STYLE_FLAGS}
+
+
+def minimize_text(text, style=None, styles={}):
+    """
+    Remove override tags which have no effect from text of an event.
+
+    Removed are comments in braces, tags setting a value which is already in effect
+    (eg. ``{\\i0}`` at the start of a non-italic line, or ``\\fs20`` repeated), tags
+    with nothing after them and empty override blocks; adjacent blocks are joined.
+    Tags applying to the whole line (eg. ``\\pos``), karaoke and animations (with everything
+    after them on the line) are kept.
+
+    Arguments:
+        text (str): Event text.
+        style (SSAStyle): Style of the event, if known (for ``\\i``, ``\\b``, ``\\u``, ``\\s``).
+        styles (dict): Styles by name, for ``\\r`` tags.
+
+    Returns:
+        Tuple ``(text, removed)`` of the new text and the number of removed tags.
+
+    """
+    if "{" not in text:
+        return text, 0
+
+    parts = OVERRIDE_BLOCK.split(text)
+    state = _style_state(style)
+    removed = 0
+    out = [parts[0]]
+    pending = [] # tags since the last text, written out in one block before it
+
+    for i in range(1, len(parts), 2):
+        block = parts[i][1:-1]
+        tags = OVERRIDE_TAG.findall(block)
+        start = block.find("\\")
+        if start == -1:
+            removed += 1 # comment
+        elif "".join(tags) != block[start:]:
+            # cannot make sense of it, keep as it is
+            if pending:
+                out.append("{%s}" % "".join(pending))
+                pending = []
+            out.append(parts[i])
+            state = None
+        else:
+            if start > 0:
+                removed += 1 # comment before the tags
+            for tag in tags:
+                m = STATE_TAG.match(tag) if state is not None else None
+                if m:
+                    name, value = m.groups()
+                    name = _ALIASES.get(name, name)
+                    value = value.strip()
+                    for other in _SHARED.get(name, ()):
+                        state.pop(other, None)
+                    if not value or (name == "fs" and value[0] in "+-"):
+                        state.pop(name, None) # resets or relative changes
+                    elif state.get(name) == value:
+                        removed += 1
+                        continue
+                    else:
+                        state[name] = value
+                elif tag.startswith("\\r") and state is not None:
+                    name = tag[2:].strip()
+                    state = _style_state(styles.get(name) if name else style)
+                elif tag.startswith("\\t"):
+                    state = None # values are not known for the rest of the line
+                pending.append(tag)
+
+        text_after = parts[i+1]
+        if text_after and pending:
+            out.append("{%s}" % "".join(pending))
+            pending = []
+        out.append(text_after)
+
+    # tags at the end only matter if they apply to the whole line
+    removed += sum(1 for tag in pending if STATE_TAG.match(tag))
+    pending = [tag for tag in pending if not STATE_TAG.match(tag)]
+    if pending:
+        out.append("{%s}" % "".join(pending))
+    return "".join(out), removed
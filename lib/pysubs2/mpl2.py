@@ -3,13 +3,26 @@
 from __future__ import print_function, division, unicode_literals
 import re
 
-from .time import times_to_ms
 from .formatbase import FormatBase
 from .ssaevent import SSAEvent
+from .substation import write_chunked
 
 
 # thanks to http://otsaloma.io/gaupol/doc/api/aeidon.files.mpl2_source.html
-MPL2_FORMAT = re.compile(r"^(?um)\[(-?\d+)\]\[(-?\d+)\](.*)")
+MPL2_FORMAT = re.compile(r"(?um)^\[(-?\d+)\]\[(-?\d+)\](.*)")
+
+
+def _prepare_text(lines):
+    out = []
+    for s in lines.split("|"):
+        s = s.strip()
+
+        if s.startswith("/"):
+            # line beginning with '/' is in italics
+            s = r"{\i1}%s{\i0}" % s[1:].strip()
+
+        out.append(s)
+    return "\\N".join(out)
 
 
 class MPL2Format(FormatBase):
@@ -19,31 +32,28 @@ class MPL2Format(FormatBase):
             return "mpl2"
 
     @classmethod
-    def from_file(cls, subs, fp, format_, **kwargs):
-        def prepare_text(lines):
-            out = []
-            for s in lines.split("|"):
-                s = s.strip()
-
-                if s.startswith("/"):
-                    # line beginning with '/' is in italics
-                    s = r"{\i1}%s{\i0}" % s[1:].strip()
+    def match_signature(cls, line, lineno):
+        if MPL2_FORMAT.match(line):
+            return "mpl2"
 
-                out.append(s)
-            return "\\N".join(out)
+    @classmethod
+    def from_file(cls, subs, fp, format_, **kwargs):
+        match = MPL2_FORMAT.match
+        make = SSAEvent._make
+        append = subs.events.append
 
-        subs.events = [SSAEvent(start=times_to_ms(s=float(start) / 10), end=times_to_ms(s=float(end) / 10),
-                       text=prepare_text(text)) for start, end, text in MPL2_FORMAT.findall(fp.getvalue())]
+        for line in fp:
+            m = match(line)
+            if m:
+                start, end, text = m.groups()
+                # times are in deciseconds
+                append(make(int(start) * 100, int(end) * 100, _prepare_text(text)))
 
     @classmethod
-    def to_file(cls, subs, fp, format_, **kwargs):
+    def write_events(cls, fp, events, format_, **kwargs):
 
         # TODO handle italics
-        for line in subs:
-            if line.is_comment:
-                continue
-
-            print("[{start}][{end}] {text}".format(start=int(line.start // 100),
-                                                   end=int(line.end // 100),
-                                                   text=line.plaintext.replace("\n", "|")),
-                  file=fp)
+        write_chunked(fp, ("[{start}][{end}] {text}\n".format(start=int(line.start // 100),
+                                                             end=int(line.end // 100),
+                                                             text=line.plaintext.replace("\n", "|"))
+                           for line in events if not line.is_comment))
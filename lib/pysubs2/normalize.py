@@ -0,0 +1,102 @@
+from __future__ import unicode_literals
+from collections import namedtuple
+from operator import attrgetter
+
+#: Policies for overlapping events, see :meth:`SSAFile.normalize()`.
+OVERLAP_POLICIES = ("keep", "clip", "stack")
+
+#: Result of :meth:`SSAFile.normalize()`, counts of events affected by each step.
+NormalizeStats = namedtuple("NormalizeStats", ["dropped", "merged", "clipped", "stacked"])
+
+_by_time = attrgetter("start", "end")
+_merge_key = attrgetter("text", "name", "effect", "marginl", "marginr", "marginv")
+
+
+def _stack(cluster, out):
+    """Add events of a cluster to out, splitting them at all boundaries if they overlap. Returns number of split events."""
+    if len(cluster) == 1:
+        out.append(cluster[0])
+        return 0
+
+    # each piece shows texts of all events active in it, on separate lines
+    times = sorted(set(t for ev in cluster for t in (ev.start, ev.end)))
+    last = None
+    for t0, t1 in zip(times, times[1:]):
+        active = [ev for ev in cluster if ev.start <= t0 and ev.end >= t1]
+        if not active:
+            last = None
+            continue
+        text = "\\N".join(ev.text for ev in active)
+        if last is not None and last.text == text:
+            last.end = t1
+            continue
+        last = active[0].copy()
+        last.start, last.end, last.text = t0, t1, text
+        out.append(last)
+    return len(cluster)
+
+
+def normalize_events(events, overlaps="keep", merge_gap=0):
+    """
+    Clean up a sequence of events, see :meth:`SSAFile.normalize()`.
+
+    Returns:
+        Tuple ``(events, stats)`` with new list of events (mostly the same objects,
+        changed in place) and :class:`NormalizeStats`.
+    """
+    if overlaps not in OVERLAP_POLICIES:
+        raise ValueError("Unknown overlap policy %r, expected one of %r" % (overlaps, OVERLAP_POLICIES))
+
+    dropped = merged = clipped = stacked = 0
+    out = []
+    last = {} # group -> last event kept in the group
+    clusters = {} # group -> [events overlapping each other, end of the cluster] (for "stack")
+
+    for ev in sorted(events, key=_by_time):
+        if ev.is_comment:
+            out.append(ev)
+            continue
+        if ev.end <= ev.start:
+            dropped += 1
+            continue
+
+        # overlaps only matter between lines rendered together, ie. in the same layer and style
+        group = ev.layer, ev.style
+        prev = last.get(group)
+        if prev is not None and ev.start <= prev.end + merge_gap and _merge_key(ev) == _merge_key(prev):
+            if ev.end > prev.end:
+                prev.end = ev.end
+                if group in clusters and prev.end > clusters[group][1]:
+                    clusters[group][1] = prev.end
+            merged += 1
+            continue
+        last[group] = ev
+
+        if overlaps == "keep":
+            out.append(ev)
+        elif overlaps == "clip":
+            if prev is not None and ev.start < prev.end:
+                clipped += 1
+                if ev.start == prev.start:
+                    # nothing would be left of prev, show both instead
+                    prev.text = prev.text + "\\N" + ev.text
+                    prev.end = max(prev.end, ev.end)
+                    last[group] = prev
+                    continue
+                prev.end = ev.start
+            out.append(ev)
+        else:
+            cluster = clusters.get(group)
+            if cluster is not None and ev.start < cluster[1]:
+                cluster[0].append(ev)
+                cluster[1] = max(cluster[1], ev.end)
+                continue
+            if cluster is not None:
+                stacked += _stack(cluster[0], out)
+            clusters[group] = [[ev], ev.end]
+
+    for cluster, _ in clusters.values():
+        stacked += _stack(cluster, out)
+
+    out.sort(key=_by_time)
+    return out, NormalizeStats(dropped, merged, clipped, stacked)
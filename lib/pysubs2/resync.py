@@ -0,0 +1,212 @@
+from __future__ import division, unicode_literals
+from bisect import bisect_left
+from operator import attrgetter
+from .retime import AffineTimeMap, PiecewiseLinearTimeMap
+
+#: Framerate ratios tried by :func:`resync_map()` besides 1, ie. conversions between 23.976, 24 and 25 fps.
+FRAMERATE_RATIOS = (25 / 23.976, 23.976 / 25, 25 / 24, 24 / 25, 24 / 23.976, 23.976 / 24)
+
+_NEG_INF = float("-inf")
+_MATCH, _SKIP_EVENT, _SKIP_REFERENCE = 0, 1, 2
+
+
+def _times(events):
+    events = sorted((ev for ev in events if not ev.is_comment), key=attrgetter("start"))
+    return [ev.start for ev in events], [ev.end for ev in events]
+
+
+def _vote(starts, ref_starts, scale, max_shift, bin_ms):
+    # histogram of offsets between (scaled) starts and reference starts less than max_shift apart
+    votes = {}
+    m = len(ref_starts)
+    lo = 0
+    for s in starts:
+        t = s * scale
+        while lo < m and ref_starts[lo] < t - max_shift:
+            lo += 1
+        j = lo
+        while j < m and ref_starts[j] <= t + max_shift:
+            b = int((ref_starts[j] - t) // bin_ms)
+            votes[b] = votes.get(b, 0) + 1
+            j += 1
+
+    best, best_bin = 0, None
+    for b in votes:
+        score = votes[b] + votes.get(b - 1, 0) + votes.get(b + 1, 0)
+        if score > best:
+            best, best_bin = score, b
+    if best_bin is None:
+        return 0, 0
+    return best, (best_bin + 0.5) * bin_ms
+
+
+def _align(starts, ends, ref_starts, ref_ends, scale, offset, band, max_shift):
+    """Banded global alignment of events to reference events, return list of matched index pairs."""
+    n, m = len(starts), len(ref_starts)
+    tau = 1500.0 # ms of difference which makes a pair as bad as a skip is good
+    gap_penalty = 0.2
+    # a match is compared with the offset of the previous match on its path, not with the global one,
+    # and the difference costs no more than this, so that the path can follow a cut of any length
+    drift_cap = 5000
+
+    def features(starts, ends, scale):
+        durations = [(e - s) * scale for s, e in zip(starts, ends)]
+        gaps = [0.0] + [(b - a) * scale for a, b in zip(starts, starts[1:])]
+        return durations, gaps
+
+    dur, gap = features(starts, ends, scale)
+    ref_dur, ref_gap = features(ref_starts, ref_ends, 1)
+
+    # the band follows the reference index nearest to where the event is expected,
+    # going by the offset of the best path so far; it widens while that path is not matching
+    # (eg. after a cut), until the path finds the new offset
+    los, rows, moves = [], [], []
+    prev_lo, prev_row, prev_offsets = 0, None, None
+    guide, width, prev_best = offset, band, None
+    for i in range(n):
+        t = starts[i] * scale
+        g = bisect_left(ref_starts, t + guide)
+        lo, hi = max(g - width, 0), min(g + width + 1, m)
+        row = [_NEG_INF] * (hi - lo)
+        move = [_SKIP_EVENT] * (hi - lo)
+        offsets = [offset] * (hi - lo) # offset of the last match on the best path to each cell
+
+        for k in range(hi - lo):
+            j = lo + k
+            r = ref_starts[j]
+            if abs(r - t - offset) > max_shift:
+                continue
+            dur_gap = abs(dur[i] - ref_dur[j]) + abs(gap[i] - ref_gap[j])
+
+            # match: diagonal predecessor, or the start of the alignment
+            pk = j - 1 - prev_lo
+            if prev_row is not None and 0 <= pk < len(prev_row) and prev_row[pk] != _NEG_INF:
+                base = prev_row[pk]
+                drift = abs(r - t - prev_offsets[pk])
+            else:
+                base = -gap_penalty * i
+                drift = abs(r - t - offset)
+            sim = 1.0 - (dur_gap + 0.1 * min(drift, drift_cap)) / tau
+            best, how, best_offset = base + max(sim, -1.0), _MATCH, r - t
+
+            # skip this event
+            pk = j - prev_lo
+            if prev_row is not None and 0 <= pk < len(prev_row) and prev_row[pk] - gap_penalty > best:
+                best, how, best_offset = prev_row[pk] - gap_penalty, _SKIP_EVENT, prev_offsets[pk]
+
+            # skip reference event
+            if k > 0 and row[k-1] - gap_penalty > best:
+                best, how, best_offset = row[k-1] - gap_penalty, _SKIP_REFERENCE, offsets[k-1]
+
+            row[k] = best
+            move[k] = how
+            offsets[k] = best_offset
+
+        los.append(lo)
+        rows.append(row)
+        moves.append(move)
+        if any(v != _NEG_INF for v in row):
+            k = max(range(len(row)), key=row.__getitem__)
+            guide = offsets[k]
+            width = band if prev_best is None or row[k] - prev_best > 0.5 else min(2 * width, 8 * band)
+            prev_best = row[k]
+        prev_lo, prev_row, prev_offsets = lo, row, offsets
+
+    # backtrack from the best cell of the last row which has any
+    pairs = []
+    i = n - 1
+    while i >= 0 and not any(v != _NEG_INF for v in rows[i]):
+        i -= 1
+    if i < 0:
+        return pairs
+    row = rows[i]
+    k = max(range(len(row)), key=row.__getitem__)
+    j = los[i] + k
+    while i >= 0:
+        k = j - los[i]
+        if not 0 <= k < len(rows[i]) or rows[i][k] == _NEG_INF:
+            break
+        how = moves[i][k]
+        if how == _MATCH:
+            pairs.append((i, j))
+            i, j = i - 1, j - 1
+        elif how == _SKIP_EVENT:
+            i -= 1
+        else:
+            j -= 1
+    pairs.reverse()
+    return pairs
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def _compress(points, tolerance):
+    # drop points within tolerance of a line through their neighbours, in one pass
+    # (keeps a cone of slopes from the segment start which stay within tolerance of all points)
+    out = [points[0]]
+    x0, y0 = points[0]
+    low, high = _NEG_INF, float("inf")
+    last = points[0]
+    for x, y in points[1:]:
+        dx = x - x0
+        slope_low, slope_high = (y - tolerance - y0) / dx, (y + tolerance - y0) / dx
+        new_low, new_high = max(low, slope_low), min(high, slope_high)
+        if new_low > new_high:
+            out.append(last)
+            x0, y0 = last
+            dx = x - x0
+            low, high = (y - tolerance - y0) / dx, (y + tolerance - y0) / dx
+        else:
+            low, high = new_low, new_high
+        last = x, y
+    if out[-1] != last:
+        out.append(last)
+    return out
+
+
+def resync_map(events, reference, max_shift=60000, band=10, tolerance=50):
+    """
+    Find time map which aligns events to reference events, see :meth:`SSAFile.resync()`.
+
+    Returns:
+        :class:`PiecewiseLinearTimeMap`, or :class:`AffineTimeMap` when too few events match.
+
+    Raises:
+        ValueError: No events, or no reference event is within ``max_shift`` of any event.
+    """
+    starts, ends = _times(events)
+    ref_starts, ref_ends = _times(reference)
+    if not starts or not ref_starts:
+        raise ValueError("Cannot resync without events and reference events")
+
+    # 1) framerate ratio and global offset: the one which makes most starts coincide
+    bin_ms = 100
+    votes, offset, scale = max(_vote(starts, ref_starts, s, max_shift, bin_ms) + (s,)
+                               for s in (1,) + FRAMERATE_RATIOS)
+    if not votes:
+        raise ValueError("No reference event within %d ms of an event" % max_shift)
+
+    # 2) banded alignment of the event sequences around that guide
+    pairs = _align(starts, ends, ref_starts, ref_ends, scale, offset, band, max_shift)
+
+    # 3) anchors from matched starts and ends: offsets are smoothed by a running median, which removes
+    #    timing noise and wrong matches but keeps jumps (cuts), then points on a line are merged
+    points = []
+    for i, j in pairs:
+        points.append((starts[i], ref_starts[j]))
+        points.append((ends[i], ref_ends[j]))
+    points.sort()
+    offsets = [r - s * scale for s, r in points]
+    window = 7
+    anchors = []
+    for k, (s, r) in enumerate(points):
+        r = s * scale + _median(offsets[max(k - window, 0):k + window + 1])
+        if not anchors or (s > anchors[-1][0] and r > anchors[-1][1]):
+            anchors.append((s, r))
+
+    if len(anchors) < 2:
+        return AffineTimeMap(scale=scale, offset=int(round(offset)))
+    return PiecewiseLinearTimeMap(_compress(anchors, tolerance))
@@ -0,0 +1,204 @@
+from __future__ import division, unicode_literals
+from array import array
+from bisect import bisect_right
+from numbers import Integral
+from .common import PY3
+from .eventtable import EventTable
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _round(x):
+    return int(round(x))
+
+def _round_array(x):
+    # match int(round(x)) of the running Python: half to even on 3, half away from zero on 2
+    if PY3:
+        return numpy.rint(x)
+    else:
+        return numpy.sign(x) * numpy.floor(numpy.abs(x) + 0.5)
+
+
+class TimeMap(object):
+    """
+    Base class for mappings of subtitle time to true time, see :meth:`SSAFile.retime()`.
+
+    Subclasses implement :meth:`TimeMap.segments()`; the mapping is then applied
+    with or without NumPy, both giving identical results.
+    """
+
+    def segments(self):
+        """
+        Return the map as linear segments.
+
+        Returns:
+            tuple ``(breaks, origins, bases, slopes)``, lists of equal length.
+            Time ``t`` with ``breaks[i] <= t < breaks[i+1]`` maps to
+            ``bases[i] + (t - origins[i]) * slopes[i]``. The first segment
+            also covers times before ``breaks[0]`` and the last one times after.
+        """
+        raise NotImplementedError
+
+    def __call__(self, ms):
+        """Map a single time (in milliseconds), rounding to whole milliseconds."""
+        breaks, origins, bases, slopes = self.segments()
+        i = max(bisect_right(breaks, ms) - 1, 0)
+        return _round(bases[i] + (ms - origins[i]) * slopes[i])
+
+    def map_times(self, times):
+        """Map a sequence of times (in milliseconds), return list of ints."""
+        breaks, origins, bases, slopes = self.segments()
+        if len(breaks) == 1:
+            origin, base, slope = origins[0], bases[0], slopes[0]
+            return [_round(base + (t - origin) * slope) for t in times]
+        else:
+            out = []
+            for t in times:
+                i = bisect_right(breaks, t) - 1
+                if i < 0: i = 0
+                out.append(_round(bases[i] + (t - origins[i]) * slopes[i]))
+            return out
+
+    def map_array(self, times):
+        """Map a NumPy array of times, return array of int64."""
+        breaks, origins, bases, slopes = self.segments()
+        times = numpy.asarray(times)
+        if len(breaks) == 1:
+            mapped = bases[0] + (times - origins[0]) * slopes[0]
+        else:
+            i = numpy.searchsorted(numpy.asarray(breaks, dtype=numpy.float64), times, side="right") - 1
+            numpy.clip(i, 0, len(breaks) - 1, out=i)
+            mapped = (numpy.asarray(bases, dtype=numpy.float64)[i]
+                      + (times - numpy.asarray(origins, dtype=numpy.float64)[i])
+                      * numpy.asarray(slopes, dtype=numpy.float64)[i])
+        return _round_array(mapped).astype(numpy.int64)
+
+
+class AffineTimeMap(TimeMap):
+    """
+    Map ``t`` to ``t * scale + offset``.
+
+    :meth:`SSAFile.shift()` is ``AffineTimeMap(offset=delta)`` and
+    :meth:`SSAFile.transform_framerate()` is ``AffineTimeMap(scale=in_fps/out_fps)``.
+    """
+
+    def __init__(self, scale=1, offset=0):
+        self.scale = scale
+        self.offset = offset
+
+    @property
+    def is_shift(self):
+        """True when the map only adds a whole number of milliseconds (no rounding needed)."""
+        return self.scale == 1 and isinstance(self.offset, Integral)
+
+    def segments(self):
+        return [0], [0], [self.offset], [self.scale]
+
+    def __call__(self, ms):
+        if self.is_shift:
+            return ms + self.offset
+        return _round(ms * self.scale + self.offset)
+
+    def map_times(self, times):
+        offset, scale = self.offset, self.scale
+        if self.is_shift:
+            return [t + offset for t in times]
+        return [_round(t * scale + offset) for t in times]
+
+    def map_array(self, times):
+        times = numpy.asarray(times)
+        if self.is_shift:
+            return times.astype(numpy.int64) + self.offset
+        return _round_array(times * self.scale + self.offset).astype(numpy.int64)
+
+    def __repr__(self):
+        return "<AffineTimeMap scale=%r offset=%r>" % (self.scale, self.offset)
+
+
+class PiecewiseLinearTimeMap(TimeMap):
+    """
+    Map built from anchor pairs ``(subtitle_time, true_time)``, in milliseconds.
+
+    Times between two anchors are interpolated linearly; times before the first
+    or after the last anchor follow the nearest segment. A single anchor is a
+    constant shift.
+
+    Example:
+        Subtitles drift: line at 0:01:00 should be at 0:01:02,
+        line at 1:30:00 should be at 1:30:40.
+
+        >>> m = PiecewiseLinearTimeMap([(make_time(m=1), make_time(m=1, s=2)),
+        ...                             (make_time(h=1, m=30), make_time(h=1, m=30, s=40))])
+        >>> subs.retime(m)
+
+    Raises:
+        ValueError: No anchors given, or subtitle times of anchors are not unique.
+
+    """
+
+    def __init__(self, anchors):
+        anchors = sorted(anchors)
+        if not anchors:
+            raise ValueError("At least one anchor is needed")
+        for (s1, _), (s2, _) in zip(anchors, anchors[1:]):
+            if s1 == s2:
+                raise ValueError("Anchors with duplicate subtitle time %r" % s1)
+
+        self.anchors = anchors
+
+        if len(anchors) == 1:
+            (src, dst), = anchors
+            self._segments = [src], [src], [dst], [1]
+        else:
+            breaks, origins, bases, slopes = [], [], [], []
+            for (s1, d1), (s2, d2) in zip(anchors, anchors[1:]):
+                breaks.append(s1)
+                origins.append(s1)
+                bases.append(d1)
+                slopes.append((d2 - d1) / (s2 - s1))
+            self._segments = breaks, origins, bases, slopes
+
+    def segments(self):
+        return self._segments
+
+    def __repr__(self):
+        return "<PiecewiseLinearTimeMap with %d anchors>" % len(self.anchors)
+
+
+def retime_events(events, time_map):
+    """
+    Apply :class:`TimeMap` to start and end times of events, in-place.
+
+    Arguments:
+        events: list of :class:`SSAEvent` or :class:`EventTable`.
+        time_map (TimeMap): The mapping.
+
+    With :class:`EventTable`, the time columns are mapped as a whole
+    (using NumPy when available) without touching individual events.
+    """
+    if isinstance(events, EventTable):
+        for column in (events.start, events.end):
+            if numpy is not None and column:
+                src = numpy.frombuffer(column, dtype="i%d" % column.itemsize)
+                out = time_map.map_array(src).astype(src.dtype)
+                del src
+                column[:] = array(column.typecode, out.tobytes())
+            else:
+                column[:] = array(column.typecode, time_map.map_times(column))
+        return
+
+    # for plain events, NumPy only pays off when there is some arithmetic to do
+    is_shift = isinstance(time_map, AffineTimeMap) and time_map.is_shift
+    if numpy is not None and events and not is_shift:
+        starts = time_map.map_array(numpy.fromiter((ev.start for ev in events), numpy.float64, len(events))).tolist()
+        ends = time_map.map_array(numpy.fromiter((ev.end for ev in events), numpy.float64, len(events))).tolist()
+    else:
+        starts = time_map.map_times([ev.start for ev in events])
+        ends = time_map.map_times([ev.end for ev in events])
+
+    for ev, start, end in zip(events, starts, ends):
+        ev.start = start
+        ev.end = end
@@ -1,7 +1,8 @@
 from __future__ import unicode_literals
 import re
+from operator import attrgetter
 from .time import ms_to_str, make_time
-from .common import PY3
+from .common import PY3, fingerprint
 
 
 class SSAEvent(object):
@@ -14,6 +15,9 @@ class SSAEvent(object):
 
     This class defines an ordering with respect to (start, end) timestamps.
 
+    Instances use ``__slots__``, so only the fields listed in :attr:`SSAEvent.FIELDS`
+    (and :attr:`SSAEvent.extra`) can be set.
+
     .. tip :: Use :func:`pysubs2.make_time()` to get times in milliseconds.
 
     Example::
@@ -29,6 +33,12 @@ class SSAEvent(object):
         "name", "marginl", "marginr", "marginv", "effect", "type"
     ])
 
+    __slots__ = ("start", "end", "text", "marked", "layer", "style",
+                 "name", "marginl", "marginr", "marginv", "effect", "type", "extra", "_fingerprint")
+
+    _fields = attrgetter("start", "end", "text", "layer", "style", "name",
+                         "marginl", "marginr", "marginv", "effect", "type")
+
     def __init__(self, **fields):
         self.start = 0 #: Subtitle start time (in milliseconds)
         self.end = 10000 #: Subtitle end time (in milliseconds)
@@ -42,6 +52,7 @@ class SSAEvent(object):
         self.marginv = 0 #: Vertical margin
         self.effect = "" #: Line effect
         self.type = "Dialogue" #: Line type (Dialogue/Comment)
+        self.extra = None #: Dict of columns unknown to pysubs2 (name -> raw string) read from the file, or None
 
         for k, v in fields.items():
             if k in self.FIELDS:
@@ -49,6 +60,30 @@ class SSAEvent(object):
             else:
                 raise ValueError("SSAEvent has no field named %r" % k)
 
+    @classmethod
+    def _make(cls, start=0, end=10000, text="", layer=0, style="Default", name="",
+              marginl=0, marginr=0, marginv=0, effect="", type="Dialogue", marked=False, extra=None):
+        """
+        Trusted constructor for parsers, arguments are not validated.
+
+        Arguments can be given positionally, in the order of the signature.
+        """
+        ev = object.__new__(cls)
+        ev.start = start
+        ev.end = end
+        ev.text = text
+        ev.layer = layer
+        ev.style = style
+        ev.name = name
+        ev.marginl = marginl
+        ev.marginr = marginr
+        ev.marginv = marginv
+        ev.effect = effect
+        ev.type = type
+        ev.marked = marked
+        ev.extra = extra
+        return ev
+
     @property
     def duration(self):
         """
@@ -113,9 +148,31 @@ class SSAEvent(object):
         self.start += delta
         self.end += delta
 
+    def _fingerprint_key(self):
+        extra = self.extra
+        return self._fields(self) + (bool(self.marked), tuple(sorted(extra.items())) if extra else None)
+
+    @property
+    def fingerprint(self):
+        """
+        Stable 64-bit hash of all fields, including :attr:`SSAEvent.extra` (read-only property).
+
+        Events with equal fields have equal fingerprints, in any process or Python version;
+        see :meth:`SSAFile.diff()`. The value is cached and recomputed after any field changes.
+        """
+        key = self._fingerprint_key()
+        cached = getattr(self, "_fingerprint", None)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = fingerprint(key)
+        self._fingerprint = key, value
+        return value
+
     def copy(self):
         """Return a copy of the SSAEvent."""
-        return SSAEvent(**self.as_dict())
+        return SSAEvent._make(self.start, self.end, self.text, self.layer, self.style, self.name,
+                              self.marginl, self.marginr, self.marginv, self.effect, self.type, self.marked,
+                              self.extra and dict(self.extra))
 
     def as_dict(self):
         return {field: getattr(self, field) for field in self.FIELDS}
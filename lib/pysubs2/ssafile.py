@@ -1,16 +1,85 @@
 from __future__ import print_function, unicode_literals, division
-from collections import MutableSequence, OrderedDict
+from collections import MutableSequence, OrderedDict, namedtuple
+import binascii
+import codecs
 import io
 from io import open
 from itertools import starmap, chain
+from operator import attrgetter
 import os.path
 import logging
-from .formats import autodetect_format, get_format_class, get_format_identifier
-from .substation import is_valid_field_content
+import mmap
+import shutil
+from .formats import autodetect_format, get_format_class, get_format_identifier, PEEK_SIZE
+from .substation import is_valid_field_content, scan_events, SubstationFormat, SECTIONS
 from .ssaevent import SSAEvent
+from .eventtable import EventTable
+from .timeindex import TimeIndex
+from .view import EventRange, start_range
+from .styleindex import StyleIndex, rename_references
+from .cache import ParseCache
+from .diff import diff_events
+from .normalize import normalize_events
+from .minimize import MinimizeStats, minimize_text
+from .resync import resync_map
+from .retime import AffineTimeMap, PiecewiseLinearTimeMap, TimeMap, retime_events
 from .ssastyle import SSAStyle
 from .time import make_time, ms_to_str
-from .common import PY3
+from .common import PY3, text_type, is_ascii_compatible, EncodingWriter, replace_file, fingerprint
+
+
+#: Result of :meth:`SSAFile.probe()`.
+ProbeResult = namedtuple("ProbeResult", ["format", "encoding", "events", "start", "end"])
+
+
+def _detect_mapped(buf, path, encoding):
+    # Autodetect format of memory-mapped file from its beginning; the incremental decoder
+    # holds back a character cut in half at the end instead of failing on it
+    fragment = codecs.getincrementaldecoder(encoding)().decode(buf[:PEEK_SIZE], final=len(buf) <= PEEK_SIZE)
+    return autodetect_format(fragment, os.path.splitext(path)[1])
+
+
+def _check_sections(sections):
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        raise ValueError("Unknown sections %r, choose from %r" % (sorted(unknown), SECTIONS))
+
+
+def _peek(fp, size):
+    # Return (first size characters, stream positioned at the beginning)
+    try:
+        if fp.seekable():
+            position = fp.tell()
+            fragment = fp.read(size)
+            fp.seek(position)
+            return fragment, fp
+    except (AttributeError, IOError, OSError, ValueError):
+        pass
+    fragment = fp.read(size)
+    return fragment, _PeekedStream(fragment, fp)
+
+
+class _PeekedStream(object):
+    # Non-seekable text stream with its beginning already read
+    def __init__(self, head, fp):
+        self.head = head
+        self.fp = fp
+
+    def __iter__(self):
+        rest = iter(self.fp)
+        for line in io.StringIO(self.head):
+            if not line.endswith("\n"):
+                # the peeked part ended mid-line
+                line += next(rest, "")
+            yield line
+        for line in rest:
+            yield line
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            return self.head + self.fp.read()
+        head, self.head = self.head[:size], self.head[size:]
+        return head + self.fp.read(size - len(head)) if len(head) < size else head
 
 
 class SSAFile(MutableSequence):
@@ -36,20 +105,41 @@ class SSAFile(MutableSequence):
         ("ScaledBorderAndShadow", "yes"),
         ("Collisions", "Normal")])
 
-    def __init__(self):
-        self.events = [] #: List of :class:`SSAEvent` instances, ie. individual subtitles.
+    def __init__(self, columnar=False):
+        self.events = EventTable() if columnar else []
         self.styles = OrderedDict([("Default", SSAStyle.DEFAULT_STYLE.copy())]) #: Dict of :class:`SSAStyle` instances.
         self.info = self.DEFAULT_INFO.copy() #: Dict with script metadata, ie. ``[Script Info]``.
         self.aegisub_project = OrderedDict() #: Dict with Aegisub project, ie. ``[Aegisub Project Garbage]``.
+        #: List of ``(heading, text)`` pairs with raw contents of ``[Fonts]`` and ``[Graphics]`` sections
+        #: (embedded files, uuencoded), written back unchanged to SubStation files.
+        self.attachments = []
         self.fps = None #: Framerate used when reading the file, if applicable.
         self.format = None #: Format of source subtitle file, if applicable, eg. ``"srt"``.
+        self._time_index = None # built on demand, see events_at()
+        self._style_index = None # built on demand, see events_using_style()
+
+    @property
+    def events(self):
+        """
+        List of :class:`SSAEvent` instances, ie. individual subtitles
+        (an :class:`EventTable` when created with ``columnar=True``).
+
+        Assigning a new list discards the time and style indices.
+        """
+        return self._events
+
+    @events.setter
+    def events(self, events):
+        self._events = events
+        self._time_index = None
+        self._style_index = None
 
     # ------------------------------------------------------------------------
     # I/O methods
     # ------------------------------------------------------------------------
 
     @classmethod
-    def load(cls, path, encoding="utf-8", format_=None, fps=None, **kwargs):
+    def load(cls, path, encoding="utf-8", format_=None, fps=None, columnar=False, cache=None, processes=1, **kwargs):
         """
         Load subtitle file from given path.
 
@@ -66,6 +156,21 @@ class SSAFile(MutableSequence):
                 be detected from the file, in which case you don't need
                 to specify it here (when given, this argument overrides
                 autodetection).
+            columnar (bool): Store events in an :class:`EventTable` instead
+                of a list. This takes much less memory for large files and
+                makes retiming faster; events are then accessed through
+                lightweight :class:`EventView` objects.
+            cache (ParseCache): Optional, a :class:`pysubs2.cache.ParseCache` (or path
+                to its directory). The parsed file is stored there and later
+                loads of the unchanged file with the same arguments skip parsing.
+            processes (int): Number of processes parsing the ``[Events]`` section of large
+                SubStation files (None for the number of CPUs), see
+                :meth:`SubstationFormat.from_buffer()`. Defaults to 1, ie. no worker processes.
+            sections (tuple): Optional, parts of the file to load, from
+                ``("info", "aegisub_project", "styles", "attachments", "events")``; the others are
+                left empty. SubStation files are read only as far as needed, eg.
+                ``sections=("info", "styles")`` stops at the ``[Events]`` section.
+                See also :meth:`SSAFile.probe()`.
             keep_unknown_html_tags (bool): This affects SubRip only (SRT),
                 for other formats this argument is ignored.
                 By default, HTML tags are converted to equivalent SubStation tags
@@ -94,13 +199,115 @@ class SSAFile(MutableSequence):
             >>> subs1 = pysubs2.load("subrip-subtitles.srt")
             >>> subs2 = pysubs2.load("microdvd-subtitles.sub", fps=23.976)
             >>> subs3 = pysubs2.load("subrip-subtitles-with-fancy-tags.srt", keep_unknown_html_tags=True)
+            >>> styles = pysubs2.load("typeset.ass", sections=("styles",)).styles
 
         """
-        with open(path, encoding=encoding) as fp:
-            return cls.from_file(fp, format_, fps=fps, **kwargs)
+        _check_sections(kwargs.get("sections", SECTIONS))
+
+        key = None
+        if cache is not None:
+            if not isinstance(cache, ParseCache):
+                cache = ParseCache(cache)
+            key = cache.key(path, encoding, format_, fps, kwargs)
+            if key is not None:
+                subs = cls(columnar=columnar)
+                if cache.get(key, subs):
+                    return subs
+
+        subs, detected = None, format_
+        if format_ in (None, "ass", "ssa") and is_ascii_compatible(encoding):
+            subs, detected = cls._load_substation_mmap(path, encoding, format_, fps, columnar, processes, **kwargs)
+        if subs is None:
+            with open(path, encoding=encoding) as fp:
+                subs = cls.from_file(fp, detected, fps=fps, columnar=columnar, **kwargs)
+
+        # don't store what might be a mix of old and new file
+        if key is not None and key == cache.key(path, encoding, format_, fps, kwargs):
+            cache.put(key, subs)
+        return subs
 
     @classmethod
-    def from_string(cls, string, format_=None, fps=None, **kwargs):
+    def _load_substation_mmap(cls, path, encoding, format_, fps, columnar, processes, **kwargs):
+        # Memory-map SubStation file and parse it from the bytes, see SubstationFormat.from_buffer().
+        # Return (subs, format_), with subs None when the file is something else (then format_
+        # is the detected format, so that it is not detected again) or cannot be mapped (eg. when empty).
+        with open(path, "rb") as fp:
+            try:
+                buf = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, EnvironmentError):
+                return None, format_
+
+            try:
+                if format_ is None:
+                    format_ = _detect_mapped(buf, path, encoding)
+                    if format_ not in ("ass", "ssa"):
+                        return None, format_
+
+                subs = cls(columnar=columnar)
+                subs.format = format_
+                subs.fps = fps
+                SubstationFormat.from_buffer(subs, buf, format_, encoding, processes=processes, fps=fps, **kwargs)
+                return subs, format_
+            finally:
+                buf.close()
+
+    @classmethod
+    def probe(cls, path, encoding="utf-8", format_=None, fps=None, count_events=True):
+        """
+        Get format, number of events and their time span without loading the file.
+
+        For SubStation files in ASCII-compatible encodings, the file is memory-mapped;
+        the format is detected from its beginning and events are counted
+        without being parsed (see :func:`pysubs2.substation.scan_events()`), or not
+        at all with ``count_events=False``. Other files are loaded.
+
+        Arguments:
+            path (str): Path to subtitle file.
+            encoding, format_, fps: See :meth:`SSAFile.load()`.
+            count_events (bool): When False, number of events and time span
+                are None for SubStation files (the file is read no further
+                than format detection needs).
+
+        Returns:
+            ProbeResult: ``(format, encoding, events, start, end)``, where ``events``
+            is the number of events (including comments) and ``start``, ``end``
+            is their time span in milliseconds (None when there are no events).
+
+        Raises:
+            See :meth:`SSAFile.load()`.
+
+        Example:
+            >>> pysubs2.SSAFile.probe("movie.ass")
+            ProbeResult(format='ass', encoding='utf-8', events=1302, start=1200, end=7014550)
+
+        """
+        if format_ in (None, "ass", "ssa") and is_ascii_compatible(encoding):
+            with open(path, "rb") as fp:
+                try:
+                    buf = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+                except (ValueError, EnvironmentError):
+                    buf = None
+
+                if buf is not None:
+                    try:
+                        mapped_format = format_ or _detect_mapped(buf, path, encoding)
+                        if mapped_format in ("ass", "ssa"):
+                            if not count_events:
+                                return ProbeResult(mapped_format, encoding, None, None, None)
+                            scan = scan_events(buf, encoding, mapped_format)
+                            if scan is not None:
+                                return ProbeResult(mapped_format, encoding, *scan)
+                        format_ = mapped_format
+                    finally:
+                        buf.close()
+
+        subs = cls.load(path, encoding, format_, fps)
+        start = min(ev.start for ev in subs) if subs else None
+        end = max(ev.end for ev in subs) if subs else None
+        return ProbeResult(subs.format, encoding, len(subs), start, end)
+
+    @classmethod
+    def from_string(cls, string, format_=None, fps=None, columnar=False, **kwargs):
         """
         Load subtitle file from string.
 
@@ -123,10 +330,10 @@ class SSAFile(MutableSequence):
 
         """
         fp = io.StringIO(string)
-        return cls.from_file(fp, format_, fps=fps, **kwargs)
+        return cls.from_file(fp, format_, fps=fps, columnar=columnar, **kwargs)
 
     @classmethod
-    def from_file(cls, fp, format_=None, fps=None, **kwargs):
+    def from_file(cls, fp, format_=None, fps=None, columnar=False, sections=SECTIONS, **kwargs):
         """
         Read subtitle file from file object.
 
@@ -145,19 +352,29 @@ class SSAFile(MutableSequence):
 
         """
         if format_ is None:
-            # Autodetect subtitle format, then read again using correct parser.
-            # The file might be a pipe and we need to read it twice,
-            # so just buffer everything.
-            text = fp.read()
-            fragment = text[:10000]
-            format_ = autodetect_format(fragment)
-            fp = io.StringIO(text)
-
+            # Autodetect subtitle format from the beginning of the file, then give
+            # the parser the same stream, rewound (or with the beginning put back
+            # in front, when the file is a pipe).
+            name = getattr(fp, "name", None)
+            ext = os.path.splitext(name)[1] if isinstance(name, (str, text_type)) else None
+            fragment, fp = _peek(fp, PEEK_SIZE)
+            format_ = autodetect_format(fragment, ext)
+
+        _check_sections(sections)
         impl = get_format_class(format_)
-        subs = cls() # an empty subtitle file
+        subs = cls(columnar=columnar) # an empty subtitle file
         subs.format = format_
         subs.fps = fps
-        impl.from_file(subs, fp, format_, fps=fps, **kwargs)
+        if impl is SubstationFormat:
+            impl.from_file(subs, fp, format_, fps=fps, sections=sections, **kwargs)
+        else:
+            impl.from_file(subs, fp, format_, fps=fps, **kwargs)
+            # other formats are read whole, sections not asked for are emptied afterwards
+            for section in set(SECTIONS) - set(sections):
+                if section in ("events", "attachments"):
+                    del getattr(subs, section)[:]
+                else:
+                    getattr(subs, section).clear()
         return subs
 
     def save(self, path, encoding="utf-8", format_=None, fps=None, **kwargs):
@@ -182,9 +399,15 @@ class SSAFile(MutableSequence):
                 frame-based to time-based conversions.
             kwargs: Extra options for the writer.
 
+        The output is encoded in large chunks and written to a temporary file,
+        which then replaces the target file. When writing fails (eg. with
+        UnicodeEncodeError, because the text cannot be represented in given
+        encoding), the target file is left as it was.
+
         Raises:
             IOError
             UnicodeEncodeError
+            LookupError: Unknown encoding.
             pysubs2.exceptions.UnknownFPSError
             pysubs2.exceptions.UnknownFormatIdentifierError
             pysubs2.exceptions.UnknownFileExtensionError
@@ -194,8 +417,26 @@ class SSAFile(MutableSequence):
             ext = os.path.splitext(path)[1].lower()
             format_ = get_format_identifier(ext)
 
-        with open(path, "w", encoding=encoding) as fp:
-            self.to_file(fp, format_, fps=fps, **kwargs)
+        # Write into a temporary file next to the target and rename it over the target when done,
+        # so that an error (like UnicodeEncodeError) never leaves a half-written file behind.
+        path = os.path.realpath(path)
+        tmp = "%s.%d.%s.tmp" % (path, os.getpid(), binascii.hexlify(os.urandom(4)).decode("ascii"))
+        writer = EncodingWriter(None, encoding)
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+        try:
+            with io.open(fd, "wb") as fp:
+                writer.fp = fp
+                self.to_file(writer, format_, fps=fps, **kwargs)
+                writer.close()
+            if os.path.exists(path):
+                shutil.copymode(path, tmp)
+            replace_file(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
 
     def to_string(self, format_, fps=None, **kwargs):
         """
@@ -251,9 +492,7 @@ class SSAFile(MutableSequence):
 
         """
         delta = make_time(h=h, m=m, s=s, ms=ms, frames=frames, fps=fps)
-        for line in self:
-            line.start += delta
-            line.end += delta
+        self.retime(AffineTimeMap(offset=delta))
 
     def transform_framerate(self, in_fps, out_fps):
         """
@@ -274,9 +513,252 @@ class SSAFile(MutableSequence):
             raise ValueError("Framerates must be positive, cannot transform %f -> %f" % (in_fps, out_fps))
 
         ratio = in_fps / out_fps
-        for line in self:
-            line.start = int(round(line.start * ratio))
-            line.end = int(round(line.end * ratio))
+        self.retime(AffineTimeMap(scale=ratio))
+
+    def retime(self, time_map):
+        """
+        Map all timestamps through a time map.
+
+        This generalizes :meth:`SSAFile.shift()` and :meth:`SSAFile.transform_framerate()`,
+        eg. to fix subtitles made for a different cut of the video, which drift
+        or jump at some points. Results are rounded to whole milliseconds.
+        NumPy is used when available, but is not required.
+
+        Arguments:
+            time_map: A :class:`pysubs2.retime.TimeMap` instance, or a list of
+                anchor pairs ``(subtitle_time, true_time)`` in milliseconds for
+                :class:`pysubs2.retime.PiecewiseLinearTimeMap`.
+
+        Raises:
+            ValueError: Invalid anchors.
+
+        Example:
+            >>> subs.retime([(make_time(m=1), make_time(m=1, s=2)),
+            ...              (make_time(h=1, m=30), make_time(h=1, m=30, s=40))])
+
+        """
+        if not isinstance(time_map, TimeMap):
+            time_map = PiecewiseLinearTimeMap(time_map)
+
+        self._time_index = None
+        retime_events(self.events, time_map)
+
+    def resync(self, reference, max_shift=60000, band=10, tolerance=50):
+        """
+        Retime subtitles to match a reference which is known to be in sync, eg. another language.
+
+        Useful for subtitles made for a different cut or framerate of the video. First, the framerate
+        ratio (between 23.976, 24 and 25 fps) and offset which make most start times coincide are found.
+        Then, the events are aligned with the reference events like two sequences, comparing durations
+        and gaps between lines, in a band which starts at that guess and follows the offset of matched
+        lines, so that inserted or removed scenes are handled. Matched start and end times, with offsets
+        smoothed by a running median, become anchors of a :class:`pysubs2.retime.PiecewiseLinearTimeMap`,
+        which is applied with :meth:`SSAFile.retime()`. This takes about linear time, a film
+        is done in a fraction of a second.
+
+        Arguments:
+            reference (SSAFile): Subtitles in sync (or a list of :class:`SSAEvent`). Comments are ignored.
+            max_shift (int): Largest offset to look for, in milliseconds.
+            band (int): How many reference events before and after the expected one are considered
+                for each event. Bigger values allow more lines missing in one of the files.
+            tolerance (int): Anchors closer than this many milliseconds to a straight line
+                through their neighbours are merged into one segment.
+
+        Returns:
+            The :class:`pysubs2.retime.TimeMap` which was applied.
+
+        Raises:
+            ValueError: Nothing to align, eg. no reference event within ``max_shift``
+                of any event.
+
+        Example:
+            >>> subs = SSAFile.load("movie.cs.srt")
+            >>> subs.resync(SSAFile.load("movie.en.srt"))
+            <PiecewiseLinearTimeMap with 4 anchors>
+
+        """
+        if isinstance(reference, SSAFile):
+            reference = reference.events
+        time_map = resync_map(self.events, reference, max_shift, band, tolerance)
+        self.retime(time_map)
+        return time_map
+
+    # ------------------------------------------------------------------------
+    # Cleaning up subtitles
+    # ------------------------------------------------------------------------
+
+    def normalize(self, overlaps="keep", merge_gap=0):
+        """
+        Clean up events, eg. from OCR or bad rips, in-place.
+
+        Events are sorted by time, then in one pass:
+
+        - events with zero or negative duration are dropped,
+        - consecutive events with the same text (and other fields but times) are merged
+          when they touch, overlap or are at most ``merge_gap`` milliseconds apart,
+        - overlapping events are handled according to ``overlaps``.
+
+        Only events in the same layer and style are considered to overlap or be consecutive,
+        other overlaps are usually intended. Comments are kept as they are.
+        This takes O(n log n) time.
+
+        Arguments:
+            overlaps (str): ``"keep"`` leaves overlapping events alone, ``"clip"`` ends each
+                event when the next one starts (events starting at the same time are joined into one),
+                ``"stack"`` splits overlapping events into pieces which show all active texts
+                on separate lines, so that no two events overlap.
+            merge_gap (int): Largest gap in milliseconds between events to be merged.
+
+        Returns:
+            NormalizeStats: Numbers of events ``(dropped, merged, clipped, stacked)``.
+
+        Raises:
+            ValueError: Unknown overlap policy.
+
+        Example:
+            >>> subs = SSAFile.load("ocr.srt")
+            >>> subs.normalize(overlaps="clip")
+            NormalizeStats(dropped=3, merged=120, clipped=8, stacked=0)
+
+        """
+        events, stats = normalize_events(self.events, overlaps, merge_gap)
+        self.events[:] = events
+        self._time_index = None
+        self._style_index = None
+        return stats
+
+    def minimize(self):
+        """
+        Remove everything which does not change how subtitles are rendered, in-place.
+
+        That is comment events, :attr:`SSAFile.aegisub_project`, styles not used by any event
+        and override tags without effect (see :func:`pysubs2.minimize.minimize_text()`),
+        making the file smaller and faster to load by players.
+
+        Returns:
+            MinimizeStats: Numbers of removed ``(events, styles, tags, chars)``, where ``chars``
+            is the number of characters removed from event texts.
+
+        Example:
+            >>> subs.minimize()
+            MinimizeStats(events=12, styles=3, tags=2048, chars=11520)
+            >>> subs.save("small.ass")
+
+        """
+        n = len(self.events)
+        if any(ev.is_comment for ev in self.events):
+            self.events[:] = [ev for ev in self.events if not ev.is_comment]
+            self._time_index = None
+        removed_events = n - len(self.events)
+        self.aegisub_project.clear()
+
+        tags = chars = 0
+        styles = self.styles
+        for ev in self.events:
+            text = ev.text
+            if "{" in text:
+                new_text, removed = minimize_text(text, styles.get(ev.style), styles)
+                if removed:
+                    ev.text = new_text
+                    tags += removed
+                    chars += len(text) - len(new_text)
+
+        self.rebuild_style_index()
+        unused = [name for name in styles if not self._style_index.count(name)]
+        for name in unused:
+            del styles[name]
+
+        return MinimizeStats(removed_events, len(unused), tags, chars)
+
+    # ------------------------------------------------------------------------
+    # Time queries
+    # ------------------------------------------------------------------------
+
+    def events_at(self, ms):
+        """
+        Get subtitles active at given time, ie. ``start <= ms < end``.
+
+        The first query builds a time index (see :class:`pysubs2.timeindex.TimeIndex`),
+        which is then kept up to date when events are added or removed through
+        the :class:`SSAFile` list interface, and when retiming with :class:`SSAFile`
+        methods (eg. :meth:`SSAFile.shift()`). Queries take O(log n + k) time.
+
+        Note:
+            The index does not notice :attr:`SSAEvent.start` or :attr:`SSAEvent.end`
+            of an event being changed in place; queries then return results for the old times
+            until :meth:`SSAFile.rebuild_time_index()` is called.
+
+        Arguments:
+            ms (int): Time in milliseconds.
+
+        Returns:
+            List of :class:`SSAEvent`, sorted by start time.
+
+        """
+        return self._get_time_index().events_at(ms)
+
+    def events_between(self, start, end):
+        """
+        Get subtitles overlapping time window ``[start, end)``.
+
+        See :meth:`SSAFile.events_at()`.
+
+        Returns:
+            List of :class:`SSAEvent`, sorted by start time.
+
+        """
+        return self._get_time_index().events_between(start, end)
+
+    def view(self, start=None, stop=None):
+        """
+        Get subtitles ``start:stop`` (indices, like a slice) as :class:`SSAFileView`, without copying them.
+
+        Example:
+            >>> for i in range(0, len(subs), 500): # split into parts of 500 subtitles
+            ...     subs.view(i, i + 500).save("part%d.srt" % (i // 500))
+
+        """
+        return SSAFileView(self, EventRange(self.events, start, stop))
+
+    def window(self, start, end, overlapping=True):
+        """
+        Get subtitles in time window ``[start, end)`` as :class:`SSAFileView`, without copying them.
+
+        Arguments:
+            start, end (int): Window in milliseconds.
+            overlapping (bool): When true, the view has all subtitles overlapping the window,
+                found by the time index (see :meth:`SSAFile.events_at()`) in O(log n + k)
+                once the index is built. When false, it has subtitles which start in the window,
+                found by bisection in O(log n) with no index; events must be sorted
+                (see :meth:`SSAFile.sort()`). This puts each subtitle in exactly one of
+                adjacent windows.
+
+        Example:
+            >>> clip = subs.window(make_time(m=10), make_time(m=20))
+            >>> clip.shift(m=-10) # note that this retimes the events in subs as well
+            >>> clip.save("clip.srt")
+
+        """
+        if overlapping:
+            return SSAFileView(self, EventRange(self.events_between(start, end)))
+        lo, hi = start_range(self.events, start, end)
+        return SSAFileView(self, EventRange(self.events, lo, hi))
+
+    def rebuild_time_index(self):
+        """
+        Rebuild time index used by :meth:`SSAFile.events_at()` and :meth:`SSAFile.events_between()`.
+
+        Call this after retiming individual events in place or after modifying
+        :attr:`SSAFile.events` directly. Retiming via :class:`SSAFile` methods
+        takes care of the index automatically.
+
+        """
+        self._time_index = TimeIndex(self.events)
+
+    def _get_time_index(self):
+        if self._time_index is None or len(self._time_index) != len(self.events):
+            self.rebuild_time_index()
+        return self._time_index
 
     # ------------------------------------------------------------------------
     # Working with styles
@@ -284,7 +766,10 @@ class SSAFile(MutableSequence):
 
     def rename_style(self, old_name, new_name):
         """
-        Rename a style, including references to it.
+        Rename a style, including references to it (:attr:`SSAEvent.style` and ``\\r`` override tags).
+
+        All events are checked (with a cheap test before any text is parsed), so that
+        events whose style or text was changed in place are renamed as well.
 
         Arguments:
             old_name (str): Style to be renamed.
@@ -306,12 +791,14 @@ class SSAFile(MutableSequence):
         self.styles[new_name] = self.styles[old_name]
         del self.styles[old_name]
 
-        for line in self:
-            # XXX also handle \r override tag
-            if line.style == old_name:
-                line.style = new_name
+        # not using the style index, which does not notice events changed in place
+        tag = "\\r" + old_name
+        for ev in self.events:
+            if ev.style == old_name or tag in ev.text:
+                rename_references(ev, old_name, new_name)
+                self._style_index = None
 
-    def import_styles(self, subs, overwrite=True):
+    def import_styles(self, subs, overwrite=True, rename_conflicts=False):
         """
         Merge in styles from other SSAFile.
 
@@ -319,14 +806,72 @@ class SSAFile(MutableSequence):
             subs (SSAFile): Subtitle file imported from.
             overwrite (bool): On name conflict, use style from the other file
                 (default: True).
+            rename_conflicts (bool): On name conflict with a different style, rename the style
+                in the other file (eg. ``"Default"`` to ``"Default_2"``, including references
+                in its events, see :meth:`SSAFile.rename_style()`) and import it under the new name.
+                Takes precedence over ``overwrite``. Useful before appending events of the other
+                file, which then refer to the right styles.
+
+        Returns:
+            Dict mapping old to new names of renamed styles (empty unless ``rename_conflicts`` is set).
+
+        Example:
+            >>> # no need to parse events of the other file
+            >>> subs.import_styles(SSAFile.load("typeset.ass", sections=("styles",)))
+
+            >>> renamed = subs.import_styles(other, rename_conflicts=True)
+            >>> subs.events.extend(other.events)
 
         """
         if not isinstance(subs, SSAFile):
             raise TypeError("Must supply an SSAFile.")
 
-        for name, style in subs.styles.items():
-            if name not in self.styles or overwrite:
+        renamed = {}
+        for name, style in list(subs.styles.items()):
+            if name in self.styles and rename_conflicts:
+                if self.styles[name] == style:
+                    continue
+                n = 2
+                while "%s_%d" % (name, n) in self.styles or "%s_%d" % (name, n) in subs.styles:
+                    n += 1
+                new_name = renamed[name] = "%s_%d" % (name, n)
+                subs.rename_style(name, new_name)
+                self.styles[new_name] = style
+            elif name not in self.styles or overwrite:
                 self.styles[name] = style
+        return renamed
+
+    def events_using_style(self, name):
+        """
+        Get subtitles which use given style, as :attr:`SSAEvent.style` or in a ``\\r`` override tag.
+
+        The first query builds a style index (see :class:`pysubs2.styleindex.StyleIndex`),
+        which is then kept up to date when events are added or removed through
+        the :class:`SSAFile` list interface. Queries take time proportional to the result.
+
+        Arguments:
+            name (str): Style name.
+
+        Returns:
+            List of :class:`SSAEvent`, sorted by start time.
+
+        """
+        return self._get_style_index().events_using(name)
+
+    def rebuild_style_index(self):
+        """
+        Rebuild style index used by :meth:`SSAFile.events_using_style()`.
+
+        Call this after changing style or text of individual events in place, or after
+        modifying :attr:`SSAFile.events` directly.
+
+        """
+        self._style_index = StyleIndex(self.events)
+
+    def _get_style_index(self):
+        if self._style_index is None or len(self._style_index) != len(self.events):
+            self.rebuild_style_index()
+        return self._style_index
 
     # ------------------------------------------------------------------------
     # Helper methods
@@ -386,6 +931,50 @@ class SSAFile(MutableSequence):
         else:
             raise TypeError("Cannot compare to non-SSAFile object")
 
+    def diff(self, other):
+        """
+        Compare events with another SSAFile.
+
+        Events are matched by :attr:`SSAEvent.fingerprint` (ie. all fields must be equal)
+        and aligned like lines in a text diff, which takes about linear time even for large files.
+        Changed events which take the place of each other are reported as modified.
+
+        Arguments:
+            other (SSAFile): The new version of the file.
+
+        Returns:
+            EventDiff: ``(deleted, inserted, modified)``, where ``deleted`` are indices into
+            ``self.events``, ``inserted`` are indices into ``other.events`` and ``modified``
+            are ``(self index, other index)`` pairs. All empty when events are the same.
+
+        Example:
+            >>> old, new = SSAFile.load("v1.ass"), SSAFile.load("v2.ass")
+            >>> deleted, inserted, modified = old.diff(new)
+            >>> for i, j in modified:
+            ...     print(old[i].text, "->", new[j].text)
+
+        """
+        if not isinstance(other, SSAFile):
+            raise TypeError("Cannot compare to non-SSAFile object")
+        return diff_events(self.events, other.events)
+
+    def fingerprint(self):
+        """
+        Stable 64-bit hash of the whole file (info, styles, events and other sections).
+
+        Built from :attr:`SSAEvent.fingerprint` and :attr:`SSAStyle.fingerprint`, which are cached,
+        so it is cheap to recompute. Compare it before and after an edit to skip saving
+        a file which did not change.
+
+        """
+        return fingerprint((
+            tuple(self.info.items()),
+            tuple(self.aegisub_project.items()),
+            tuple((name, sty.fingerprint) for name, sty in self.styles.items()),
+            tuple(self.attachments),
+            tuple(ev.fingerprint for ev in self.events),
+        ))
+
     def __repr__(self):
         if self.events:
             max_time = max(ev.end for ev in self)
@@ -403,18 +992,34 @@ class SSAFile(MutableSequence):
 
     def sort(self):
         """Sort subtitles time-wise, in-place."""
-        self.events.sort()
+        if isinstance(self.events, EventTable):
+            self.events.sort()
+        else:
+            self.events.sort(key=attrgetter("start", "end"))
 
     def __getitem__(self, item):
         return self.events[item]
 
     def __setitem__(self, key, value):
         if isinstance(value, SSAEvent):
+            if self._time_index is not None:
+                self._time_index.remove(self.events[key])
+            if self._style_index is not None:
+                self._style_index.remove(self.events[key])
             self.events[key] = value
+            if self._time_index is not None:
+                self._time_index.add(self.events[key]) # EventTable stores a copy of value
+            if self._style_index is not None:
+                self._style_index.add(self.events[key])
         else:
             raise TypeError("SSAFile.events must contain only SSAEvent objects")
 
     def __delitem__(self, key):
+        for index in (self._time_index, self._style_index):
+            if index is not None:
+                removed = self.events[key]
+                for ev in (removed if isinstance(key, slice) else [removed]):
+                    index.remove(ev)
         del self.events[key]
 
     def __len__(self):
@@ -422,6 +1027,45 @@ class SSAFile(MutableSequence):
 
     def insert(self, index, value):
         if isinstance(value, SSAEvent):
+            n = len(self.events)
             self.events.insert(index, value)
+            # look up what was inserted (EventTable stores a copy of value), like list.insert() does
+            i = min(index if index >= 0 else max(n + index, 0), n)
+            if self._time_index is not None:
+                self._time_index.add(self.events[i])
+            if self._style_index is not None:
+                self._style_index.add(self.events[i])
         else:
             raise TypeError("SSAFile.events must contain only SSAEvent objects")
+
+
+class SSAFileView(SSAFile):
+    """
+    Part of an :class:`SSAFile`, see :meth:`SSAFile.view()` and :meth:`SSAFile.window()`.
+
+    Events of the view are those of the parent file (not copies), in an :class:`pysubs2.view.EventRange`,
+    and info, styles and other data are shared with the parent too. The view can be iterated,
+    retimed and saved like an :class:`SSAFile`, in time proportional to its size; retiming
+    changes the events in the parent. Events cannot be added to or removed from a view,
+    and it is only valid until that happens to the parent.
+
+    """
+
+    def __init__(self, parent, events):
+        self.parent = parent #: The :class:`SSAFile` viewed.
+        self.events = events
+        self.styles = parent.styles
+        self.info = parent.info
+        self.aegisub_project = parent.aegisub_project
+        self.attachments = parent.attachments
+        self.fps = parent.fps
+        self.format = parent.format
+        self._time_index = None
+        self._style_index = None
+
+    def retime(self, time_map):
+        SSAFile.retime(self, time_map)
+        self.parent._time_index = None
+
+    def __repr__(self):
+        return "<SSAFileView with %d events of %r>" % (len(self), self.parent)
@@ -1,5 +1,5 @@
 from __future__ import unicode_literals
-from .common import Color, PY3
+from .common import Color, PY3, fingerprint
 
 
 class SSAStyle(object):
@@ -16,7 +16,16 @@ class SSAStyle(object):
 
     This class defines equality (equality of all fields).
 
+    Instances use ``__slots__``, so only the fields listed in :attr:`SSAStyle.FIELDS`
+    (and :attr:`SSAStyle.extra`) can be set.
+
     """
+    _FIELD_ORDER = ("fontname", "fontsize", "primarycolor", "secondarycolor", "tertiarycolor",
+                    "outlinecolor", "backcolor", "bold", "italic", "underline", "strikeout",
+                    "scalex", "scaley", "spacing", "angle", "borderstyle", "outline", "shadow",
+                    "alignment", "marginl", "marginr", "marginv", "alphalevel", "encoding")
+    __slots__ = _FIELD_ORDER + ("extra", "_fingerprint")
+
     DEFAULT_STYLE = None
 
     #: All fields in SSAStyle.
@@ -54,6 +63,7 @@ class SSAStyle(object):
         self.marginv = 10 #: Vertical margin (in pixels)
         self.alphalevel = 0 #: Old, unused SSA-only field
         self.encoding = 1 #: Charset
+        self.extra = None #: Dict of columns unknown to pysubs2 (name -> raw string) read from the file, or None
 
         for k, v in fields.items():
             if k in self.FIELDS:
@@ -61,8 +71,66 @@ class SSAStyle(object):
             else:
                 raise ValueError("SSAStyle has no field named %r" % k)
 
+    @classmethod
+    def _make(cls, fontname, fontsize, primarycolor, secondarycolor, tertiarycolor, outlinecolor, backcolor,
+              bold, italic, underline, strikeout, scalex, scaley, spacing, angle, borderstyle,
+              outline, shadow, alignment, marginl, marginr, marginv, alphalevel, encoding, extra=None):
+        """
+        Trusted constructor for parsers, arguments are not validated.
+
+        Takes all fields positionally, in the order of ``_FIELD_ORDER``
+        (:meth:`SSAStyle._values()` returns them in this order).
+        """
+        sty = object.__new__(cls)
+        sty.fontname = fontname
+        sty.fontsize = fontsize
+        sty.primarycolor = primarycolor
+        sty.secondarycolor = secondarycolor
+        sty.tertiarycolor = tertiarycolor
+        sty.outlinecolor = outlinecolor
+        sty.backcolor = backcolor
+        sty.bold = bold
+        sty.italic = italic
+        sty.underline = underline
+        sty.strikeout = strikeout
+        sty.scalex = scalex
+        sty.scaley = scaley
+        sty.spacing = spacing
+        sty.angle = angle
+        sty.borderstyle = borderstyle
+        sty.outline = outline
+        sty.shadow = shadow
+        sty.alignment = alignment
+        sty.marginl = marginl
+        sty.marginr = marginr
+        sty.marginv = marginv
+        sty.alphalevel = alphalevel
+        sty.encoding = encoding
+        sty.extra = extra
+        return sty
+
+    def _values(self):
+        """List of all field values, in the order of ``_FIELD_ORDER``."""
+        return [getattr(self, field) for field in SSAStyle._FIELD_ORDER]
+
+    @property
+    def fingerprint(self):
+        """
+        Stable 64-bit hash of all fields, including :attr:`SSAStyle.extra` (read-only property).
+
+        Like :attr:`SSAEvent.fingerprint`, it is cached until a field changes.
+        """
+        extra = self.extra
+        key = tuple(self._values()) + (tuple(sorted(extra.items())) if extra else None,)
+        cached = getattr(self, "_fingerprint", None)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = fingerprint(key)
+        self._fingerprint = key, value
+        return value
+
     def copy(self):
-        return SSAStyle(**self.as_dict())
+        return SSAStyle._make(*self._values(), extra=self.extra and dict(self.extra))
 
     def as_dict(self):
         return {field: getattr(self, field) for field in self.FIELDS}
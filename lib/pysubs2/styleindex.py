@@ -0,0 +1,105 @@
+from __future__ import unicode_literals
+import re
+from operator import attrgetter
+from .eventtable import EventView
+
+#: Pattern that matches an override block.
+OVERRIDE_BLOCK = re.compile(r"{[^}]*}")
+#: Pattern that matches ``\r`` override tag inside an override block, capturing the style name (may be empty).
+RESET_TAG = re.compile(r"\\r([^\\}]*)")
+
+
+def _identity(ev):
+    # EventTable hands out a new view on each access, those are identified by their row
+    if isinstance(ev, EventView):
+        return id(ev._table), ev._row
+    return id(ev)
+
+
+def style_references(ev):
+    """Set of style names used by an event: :attr:`SSAEvent.style` and names in ``\\r`` override tags."""
+    names = {ev.style}
+    text = ev.text
+    if "\\r" in text:
+        for block in OVERRIDE_BLOCK.findall(text):
+            for name in RESET_TAG.findall(block):
+                if name:
+                    names.add(name)
+    return names
+
+
+def rename_references(ev, old_name, new_name):
+    """Replace style ``old_name`` with ``new_name`` in :attr:`SSAEvent.style` and ``\\r`` override tags."""
+    if ev.style == old_name:
+        ev.style = new_name
+    if "\\r" in ev.text:
+        def rename_tag(m):
+            return "\\r" + new_name if m.group(1) == old_name else m.group(0)
+
+        def rename_block(m):
+            return RESET_TAG.sub(rename_tag, m.group(0))
+
+        ev.text = OVERRIDE_BLOCK.sub(rename_block, ev.text)
+
+
+class StyleIndex(object):
+    """
+    Index of events by the styles they use, for :meth:`SSAFile.events_using_style()`.
+
+    An event uses its :attr:`SSAEvent.style` and any style named in a ``\\r`` override tag.
+    For each style name, the index keeps the events using it (events rather than positions,
+    which would shift with every insertion), so that queries take time
+    proportional to the number of references instead of the number of events.
+
+    Like :class:`pysubs2.timeindex.TimeIndex`, it is built on demand and updated by
+    :class:`SSAFile` methods which add or remove events. It does not notice style or text
+    of an event being changed in place; see :meth:`SSAFile.rebuild_style_index()`.
+
+    """
+
+    def __init__(self, events=()):
+        self.refs = {} #: Maps style name to dict of events using it (by identity).
+        self.names = {} #: Maps event identity to the style names it was indexed under.
+        for ev in events:
+            self.add(ev)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, ev):
+        """Add event to the index."""
+        key = _identity(ev)
+        names = style_references(ev)
+        self.names[key] = names
+        refs = self.refs
+        for name in names:
+            try:
+                refs[name][key] = ev
+            except KeyError:
+                refs[name] = {key: ev}
+
+    def remove(self, ev):
+        """
+        Remove event from the index.
+
+        Raises:
+            ValueError: The event is not in the index.
+        """
+        try:
+            names = self.names.pop(_identity(ev))
+        except KeyError:
+            raise ValueError("Event is not in the index")
+        key = _identity(ev)
+        for name in names:
+            events = self.refs[name]
+            del events[key]
+            if not events:
+                del self.refs[name]
+
+    def events_using(self, name):
+        """List of events using given style, sorted by start."""
+        return sorted(self.refs.get(name, {}).values(), key=attrgetter("start", "end"))
+
+    def count(self, name):
+        """Number of events using given style."""
+        return len(self.refs.get(name, ()))
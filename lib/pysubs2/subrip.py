@@ -4,7 +4,7 @@ import re
 from .formatbase import FormatBase
 from .ssaevent import SSAEvent
 from .ssastyle import SSAStyle
-from .substation import parse_tags
+from .substation import parse_tags, write_chunked
 from .time import ms_to_times, make_time, TIMESTAMP, timestamp_to_ms
 
 #: Largest timestamp allowed in SubRip, ie. 99:59:59,999.
@@ -30,6 +30,13 @@ class SubripFormat(FormatBase):
             if len(TIMESTAMP.findall(line)) == 2:
                 return "srt"
 
+    @classmethod
+    def match_signature(cls, line, lineno):
+        if "[Script Info]" in line or "[V4+ Styles]" in line:
+            return False
+        elif len(TIMESTAMP.findall(line)) == 2:
+            return "srt"
+
     @classmethod
     def from_file(cls, subs, fp, format_, keep_unknown_html_tags=False, **kwargs):
         timestamps = [] # (start, end)
@@ -67,14 +74,16 @@ class SubripFormat(FormatBase):
             s = re.sub(r"\n", r"\\N", s) # convert newlines
             return s
 
-        subs.events = [SSAEvent(start=start, end=end, text=prepare_text(lines))
-                       for (start, end), lines in zip(timestamps, following_lines)]
+        subs.events.extend(SSAEvent._make(start, end, prepare_text(lines))
+                           for (start, end), lines in zip(timestamps, following_lines))
 
     @classmethod
-    def to_file(cls, subs, fp, format_, **kwargs):
+    def write_events(cls, fp, events, format_, styles=None, **kwargs):
+        if styles is None: styles = {}
+
         def prepare_text(text, style):
             body = []
-            for fragment, sty in parse_tags(text, style, subs.styles):
+            for fragment, sty in parse_tags(text, style, styles):
                 fragment = fragment.replace(r"\h", " ")
                 fragment = fragment.replace(r"\n", "\n")
                 fragment = fragment.replace(r"\N", "\n")
@@ -85,13 +94,14 @@ class SubripFormat(FormatBase):
 
             return re.sub("\n+", "\n", "".join(body).strip())
 
-        visible_lines = (line for line in subs if not line.is_comment)
+        def format_lines():
+            visible_lines = (line for line in events if not line.is_comment)
+
+            for i, line in enumerate(visible_lines, 1):
+                start = ms_to_timestamp(line.start)
+                end = ms_to_timestamp(line.end)
+                text = prepare_text(line.text, styles.get(line.style, SSAStyle.DEFAULT_STYLE))
 
-        for i, line in enumerate(visible_lines, 1):
-            start = ms_to_timestamp(line.start)
-            end = ms_to_timestamp(line.end)
-            text = prepare_text(line.text, subs.styles.get(line.style, SSAStyle.DEFAULT_STYLE))
+                yield "%d\n%s --> %s\n%s\n\n" % (i, start, end, text)
 
-            print("%d" % i, file=fp) # Python 2.7 compat
-            print(start, "-->", end, file=fp)
-            print(text, end="\n\n", file=fp)
+        write_chunked(fp, format_lines())
@@ -1,10 +1,14 @@
 from __future__ import print_function, division, unicode_literals
+from itertools import chain, starmap
 import re
 from numbers import Number
+from operator import attrgetter
 from .formatbase import FormatBase
 from .ssaevent import SSAEvent
 from .ssastyle import SSAStyle
-from .common import text_type, Color, PY3, binary_string_type
+from .eventtable import EventTable
+from .view import EventRange
+from .common import text_type, Color, PY3, binary_string_type, intern_value
 from .time import make_time, ms_to_times, timestamp_to_ms, TIMESTAMP
 
 SSA_ALIGNMENT = (1, 2, 3, 9, 10, 11, 5, 6, 7)
@@ -86,6 +90,289 @@ def is_valid_field_content(s):
     return "\n" not in s and "," not in s
 
 
+def field_to_string(f, v, line, format_):
+    """Convert value v of SubStation field f (of style or event line) to string."""
+    if f in {"start", "end"}:
+        return ms_to_timestamp(v)
+    elif f == "marked":
+        return "Marked=%d" % v
+    elif f == "alignment" and format_ == "ssa":
+        return text_type(ass_to_ssa_alignment(v))
+    elif isinstance(v, bool):
+        return "-1" if v else "0"
+    elif isinstance(v, (text_type, Number)):
+        return text_type(v)
+    elif not PY3 and isinstance(v, binary_string_type):
+        # A convenience feature, see issue #12 - accept non-unicode strings
+        # when they are ASCII; this is useful in Python 2, especially for non-text
+        # fields like style names, where requiring Unicode type seems too stringent
+        if all(ord(c) < 128 for c in v):
+            return text_type(v)
+        else:
+            raise TypeError("Encountered binary string with non-ASCII codepoint in SubStation field {!r} for line {!r} - please use unicode string instead of str".format(f, line))
+    elif isinstance(v, Color):
+        if format_ == "ass":
+            return color_to_ass_rgba(v)
+        else:
+            return color_to_ssa_rgb(v)
+    else:
+        raise TypeError("Unexpected type when writing a SubStation field {!r} for line {!r}".format(f, line))
+
+def _timestamp_converter(f, format_):
+    def convert(v, line):
+        if type(v) is int:
+            if v < 0: v = 0
+            elif v > MAX_REPRESENTABLE_TIME: v = MAX_REPRESENTABLE_TIME
+            return "%d:%02d:%02d.%02d" % (v // 3600000, v // 60000 % 60, v // 1000 % 60, v // 10 % 100)
+        return field_to_string(f, v, line, format_)
+    return convert
+
+def _text_converter(f, format_):
+    def convert(v, line):
+        if type(v) is text_type:
+            return v
+        return field_to_string(f, v, line, format_)
+    return convert
+
+def _int_converter(f, format_):
+    def convert(v, line):
+        if type(v) is int:
+            return "%d" % v
+        return field_to_string(f, v, line, format_)
+    return convert
+
+def _generic_converter(f, format_):
+    def convert(v, line):
+        return field_to_string(f, v, line, format_)
+    return convert
+
+_FIELD_CONVERTERS = {
+    "start": _timestamp_converter,
+    "end": _timestamp_converter,
+    "style": _text_converter,
+    "name": _text_converter,
+    "effect": _text_converter,
+    "text": _text_converter,
+    "layer": _int_converter,
+    "marginl": _int_converter,
+    "marginr": _int_converter,
+    "marginv": _int_converter,
+}
+
+def compile_row_formatter(fields, format_, extra_columns=(), last_fields=()):
+    """
+    Return function which formats given fields of a style or event as comma-separated string.
+
+    Each field gets a converter specialized for its usual type, falling back to
+    :func:`field_to_string()` for anything else, so the output is the same.
+    Values of ``extra_columns`` are taken from the ``extra`` dict of the line
+    and written after ``fields``, followed by ``last_fields``.
+    """
+    fields = list(fields) + list(last_fields)
+    getter = attrgetter(*fields) if len(fields) > 1 else lambda line: (getattr(line, fields[0]),)
+    converters = [_FIELD_CONVERTERS.get(f, _generic_converter)(f, format_) for f in fields]
+
+    if not extra_columns:
+        def format_row(line):
+            return ",".join([convert(v, line) for convert, v in zip(converters, getter(line))])
+    else:
+        split = len(fields) - len(last_fields)
+
+        def format_row(line):
+            values = [convert(v, line) for convert, v in zip(converters, getter(line))]
+            extra = line.extra or {}
+            values[split:split] = [extra.get(c, "") for c in extra_columns]
+            return ",".join(values)
+
+    return format_row
+
+def extra_columns(extras):
+    """List of column names in given :attr:`SSAEvent.extra` dicts (or an event list or range), in order of appearance."""
+    if isinstance(extras, EventTable):
+        extras = extras.extra.values()
+    elif isinstance(extras, (list, EventRange)):
+        extras = (ev.extra for ev in extras)
+
+    columns = []
+    for extra in extras:
+        if extra:
+            for c in extra:
+                if c not in columns:
+                    columns.append(c)
+    return columns
+
+#: Number of lines written at once by :meth:`SubstationFormat.write_events()`.
+WRITE_CHUNK_LINES = 1000
+
+def write_chunked(fp, lines):
+    """Write strings from an iterable, joining :data:`WRITE_CHUNK_LINES` of them per ``fp.write()``."""
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= WRITE_CHUNK_LINES:
+            fp.write("".join(chunk))
+            del chunk[:]
+    if chunk:
+        fp.write("".join(chunk))
+
+
+#: Column names which differ from field names (after lowercasing and "colour" -> "color").
+COLUMN_ALIASES = {"actor": "name", "margint": "marginv"}
+
+#: Event fields in order of :meth:`SSAEvent._make()` arguments.
+_EVENT_ARGS = ("start", "end", "text", "layer", "style", "name", "marginl", "marginr", "marginv",
+               "effect", "type", "marked")
+
+def parse_format_line(line):
+    """List of column names from ``Format:`` line."""
+    _, rest = line.split(":", 1)
+    return [c.strip() for c in rest.split(",")]
+
+def column_to_field(column):
+    """Map column name from a ``Format:`` line (eg. ``"PrimaryColour"``) to field name (``"primarycolor"``)."""
+    f = column.lower().replace("colour", "color")
+    return COLUMN_ALIASES.get(f, f)
+
+def parse_timestamp(v):
+    """Convert SubStation timestamp (eg. ``"0:01:02.50"``, may be negative) to ms."""
+    if len(v) == 10 and v[1] == ":" and v[4] == ":" and v[7] == ".":
+        # the usual H:MM:SS.cc
+        return int(v[0]) * 3600000 + int(v[2:4]) * 60000 + int(v[5:7]) * 1000 + int(v[8:10]) * 10
+    elif v.startswith("-"):
+        return -timestamp_to_ms(TIMESTAMP.match(v[1:]).groups())
+    else:
+        return timestamp_to_ms(TIMESTAMP.match(v).groups())
+
+_COLOR_CACHE = {}
+
+def _field_decoder(f, format_):
+    # Return function converting raw string of field f to its value
+    if f in {"start", "end"}:
+        return parse_timestamp
+    elif "color" in f:
+        to_color = ass_rgba_to_color if format_ == "ass" else ssa_rgb_to_color
+        color_cache = _COLOR_CACHE.setdefault(format_, {})
+
+        def decode_color(v):
+            try:
+                return color_cache[v]
+            except KeyError:
+                if len(color_cache) >= 4096:
+                    color_cache.clear()
+                c = color_cache[v] = intern_value(to_color(v))
+                return c
+        return decode_color
+    elif f in {"bold", "underline", "italic", "strikeout"}:
+        return lambda v: v == "-1"
+    elif f in {"borderstyle", "encoding", "marginl", "marginr", "marginv", "layer", "alphalevel"}:
+        return int
+    elif f in {"fontsize", "scalex", "scaley", "spacing", "angle", "outline", "shadow"}:
+        return float
+    elif f == "marked":
+        return lambda v: v.endswith("1")
+    elif f == "alignment":
+        if format_ == "ass":
+            return int
+        else:
+            return lambda v: ssa_to_ass_alignment(int(v))
+    elif f == "text":
+        return lambda v: v
+    else:
+        return intern_value
+
+_DECODER_CACHE = {}
+
+def compile_event_decoder(columns, format_, make=SSAEvent._make):
+    """
+    Return function ``(type, fields) -> SSAEvent`` for event lines with given columns.
+
+    ``fields`` is the part of the line after ``Dialogue:``. It is split once, with
+    the last column (normally Text) taking the rest of the line. Unknown columns
+    are kept in :attr:`SSAEvent.extra`. Decoders are cached.
+
+    The result is built by ``make`` from the arguments of :meth:`SSAEvent._make()`.
+    """
+    key = "event", tuple(columns), format_, make
+    if key in _DECODER_CACHE:
+        return _DECODER_CACHE[key]
+
+    plan = []
+    for column in columns:
+        f = column_to_field(column)
+        if f in _EVENT_ARGS and f != "type":
+            plan.append((_EVENT_ARGS.index(f), _field_decoder(f, format_)))
+        else:
+            plan.append((None, column))
+
+    maxsplit = len(plan) - 1
+    type_index = _EVENT_ARGS.index("type")
+    defaults = [0, 10000, "", 0, "Default", "", 0, 0, 0, "", "Dialogue", False]
+
+    if all(i is not None for i, _ in plan):
+        def decode(ev_type, rest):
+            args = defaults[:]
+            args[type_index] = intern_value(ev_type)
+            for (i, convert), v in zip(plan, rest.split(",", maxsplit)):
+                args[i] = convert(v)
+            return make(*args)
+    else:
+        def decode(ev_type, rest):
+            args = defaults[:]
+            args[type_index] = intern_value(ev_type)
+            extra = {}
+            for (i, convert), v in zip(plan, rest.split(",", maxsplit)):
+                if i is None:
+                    extra[convert] = v
+                else:
+                    args[i] = convert(v)
+            return make(*args, extra=extra)
+
+    _DECODER_CACHE[key] = decode
+    return decode
+
+def compile_style_decoder(columns, format_):
+    """
+    Return function ``fields -> (name, SSAStyle)`` for style lines with given columns.
+
+    See :func:`compile_event_decoder()`.
+    """
+    key = "style", tuple(columns), format_
+    if key in _DECODER_CACHE:
+        return _DECODER_CACHE[key]
+
+    plan = []
+    for column in columns:
+        f = column_to_field(column)
+        if f == "name":
+            plan.append((-1, intern_value))
+        elif f in SSAStyle.FIELDS:
+            plan.append((SSAStyle._FIELD_ORDER.index(f), _field_decoder(f, format_)))
+        else:
+            plan.append((None, column))
+
+    def decode(rest):
+        values = SSAStyle.DEFAULT_STYLE._values()
+        name = ""
+        extra = None
+        for (i, convert), v in zip(plan, rest.split(",")):
+            if i is None:
+                if extra is None: extra = {}
+                extra[convert] = v
+            elif i == -1:
+                name = convert(v)
+            else:
+                values[i] = convert(v)
+        return name, SSAStyle._make(*values, extra=extra)
+
+    _DECODER_CACHE[key] = decode
+    return decode
+
+
+#: Pattern that matches an override block, capturing it (so that ``split()`` keeps it).
+OVERRIDE_BLOCK = re.compile(r"({[^}]*})")
+#: Pattern that matches override tags understood by :func:`parse_tags()`.
+OVERRIDE_TAG = re.compile(r"\\[ibus][10]|\\r[a-zA-Z_0-9 ]*")
+
 def parse_tags(text, style=SSAStyle.DEFAULT_STYLE, styles={}):
     """
     Split text into fragments with computed SSAStyles.
@@ -102,36 +389,246 @@ def parse_tags(text, style=SSAStyle.DEFAULT_STYLE, styles={}):
     - i, b, u, s
     - r (with or without style name)
     
+    Each override sequence is parsed once, updating the style computed so far;
+    consecutive fragments share the style object when nothing changed.
+    Treat the returned styles as read-only.
+    
     """
     
-    fragments = SSAEvent.OVERRIDE_SEQUENCE.split(text)
-    if len(fragments) == 1:
+    if "{" not in text:
         return [(text, style)]
     
-    def apply_overrides(all_overrides):
-        s = style.copy()
-        for tag in re.findall(r"\\[ibus][10]|\\r[a-zA-Z_0-9 ]*", all_overrides):
-            if tag == r"\r":
-                s = style.copy() # reset to original line style
-            elif tag.startswith(r"\r"):
-                name = tag[2:]
-                if name in styles:
-                    s = styles[name].copy() # reset to named style
-            else:
-                if "i" in tag: s.italic = "1" in tag
-                elif "b" in tag: s.bold = "1" in tag
-                elif "u" in tag: s.underline = "1" in tag
-                elif "s" in tag: s.strikeout = "1" in tag
-        return s
+    parts = OVERRIDE_BLOCK.split(text)
+    if len(parts) == 1:
+        return [(text, style)]
     
-    overrides = SSAEvent.OVERRIDE_SEQUENCE.findall(text)
-    overrides_prefix_sum = ["".join(overrides[:i]) for i in range(len(overrides) + 1)]
-    computed_styles = map(apply_overrides, overrides_prefix_sum)
-    return list(zip(fragments, computed_styles))
+    s = style.copy()
+    computed = [(parts[0], s)]
+    for i in range(1, len(parts), 2):
+        tags = OVERRIDE_TAG.findall(parts[i])
+        if tags:
+            s = s.copy()
+            for tag in tags:
+                if tag == r"\r":
+                    s = style.copy() # reset to original line style
+                elif tag.startswith(r"\r"):
+                    name = tag[2:]
+                    if name in styles:
+                        s = styles[name].copy() # reset to named style
+                else:
+                    if "i" in tag: s.italic = "1" in tag
+                    elif "b" in tag: s.bold = "1" in tag
+                    elif "u" in tag: s.underline = "1" in tag
+                    elif "s" in tag: s.strikeout = "1" in tag
+        computed.append((parts[i+1], s))
+    return computed
 
 
 NOTICE = "Script generated by pysubs2\nhttps://pypi.python.org/pypi/pysubs2"
 
+#: Parts of :class:`SSAFile` which can be loaded separately, see ``sections`` in :meth:`SSAFile.load()`.
+SECTIONS = ("info", "aegisub_project", "styles", "attachments", "events")
+
+#: Sections with embedded files, kept as raw text in :attr:`SSAFile.attachments`
+#: (:func:`iter_buffer_lines()` skips them, their lines need no parsing).
+SKIPPED_SECTIONS = ("[Fonts]", "[Graphics]")
+#: Largest number of bytes decoded at once by :func:`iter_buffer_lines()`.
+DECODE_CHUNK_SIZE = 1 << 20
+
+# line with "[" close to its beginning, which may be a section heading (lines are found
+# by their preceding newline, which is much faster to search for than ^ in multiline mode)
+_HEADING_CANDIDATE = re.compile(b"\\n[ \\t\\r\\f\\v\\x1c-\\x1f]*[^\\n\\[]{0,16}\\[")
+
+def _heading_candidates(buf):
+    # Yield start offsets of lines which may be section headings
+    if _HEADING_CANDIDATE.match(b"\n" + buf[:32]):
+        yield 0
+    for match in _HEADING_CANDIDATE.finditer(buf):
+        yield match.start() + 1
+
+def _line_at(buf, line_start, encoding):
+    # Line of buf starting at given offset, decoded and stripped
+    line_end = buf.find(b"\n", line_start)
+    if line_end == -1:
+        line_end = len(buf)
+    return buf[line_start:line_end].decode(encoding, "replace").strip()
+
+def _section_spans(buf, encoding, skipped=None):
+    # Yield byte ranges of buf without the skipped sections, section by section (lazily,
+    # so that a reader which stops early does not scan the rest of buf).
+    # Skipped sections are appended to list skipped as (heading, start, end) of their contents.
+    start = 0
+    skipping = False
+    for line_start in _heading_candidates(buf):
+        line = _line_at(buf, line_start, encoding)
+        if not SECTION_HEADING.match(line):
+            continue
+        if skipping and line.upper() == line:
+            # uuencoded data may look like a heading, but it has no lowercase letters
+            # (nor does it matter: the parser ignores lines in such sections)
+            continue
+
+        if not skipping:
+            yield start, line_start
+        elif skipped is not None:
+            skipped.append((heading, start, line_start))
+        heading = line
+        start = buf.find(b"\n", line_start) + 1 or len(buf)
+        skipping = line.endswith(SKIPPED_SECTIONS)
+        if not skipping:
+            # heading line on its own, a reader which stops there does not wait for the next heading
+            yield line_start, start
+
+    if not skipping:
+        yield start, len(buf)
+    elif skipped is not None:
+        skipped.append((heading, start, len(buf)))
+
+def _decoded_chunks(buf, spans, encoding):
+    # Yield lists of lines, one per decoded chunk. Chunks grow up to DECODE_CHUNK_SIZE,
+    # so that reading just the header decodes little more than the header.
+    size = DECODE_CHUNK_SIZE >> 4
+    for start, end in spans:
+        while start < end:
+            stop = end
+            if end - start > size:
+                # cut after a newline, so that no character or line ending is split
+                stop = buf.rfind(b"\n", start, start + size) + 1 or buf.find(b"\n", start) + 1 or end
+                stop = min(stop, end)
+            text = buf[start:stop].decode(encoding)
+            # same newline handling as text mode
+            yield text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+            start = stop
+            size = min(2 * size, DECODE_CHUNK_SIZE)
+
+def iter_buffer_lines(buf, encoding, skipped=None):
+    """
+    Iterate over lines of SubStation file in bytes, without :data:`SKIPPED_SECTIONS`.
+
+    The bytes are decoded in large chunks. Sections with embedded files are found
+    by their headings and left out; when ``skipped`` is given, ``(heading, start, end)``
+    with the byte range of their contents is appended to it.
+    """
+    return chain.from_iterable(_decoded_chunks(buf, _section_spans(buf, encoding, skipped), encoding))
+
+def decode_attachment(data, encoding):
+    """Raw text of section with embedded files from its bytes, see :attr:`SSAFile.attachments`."""
+    return data.decode(encoding).replace("\r\n", "\n").replace("\r", "\n").rstrip()
+
+#: Smallest ``[Events]`` section (in bytes) which :meth:`SubstationFormat.from_buffer()` parses in parallel.
+PARALLEL_PARSE_THRESHOLD = 4 << 20
+#: Smallest piece of ``[Events]`` section (in bytes) given to a worker process.
+PARALLEL_CHUNK_SIZE = 1 << 20
+
+_EVENT_LINE = re.compile(b"^[ \\t]*(?:Dialogue|Comment):", re.MULTILINE)
+_STATE_LINE = re.compile(b"\\n[ \\t]*(?:Format|Style):")
+
+# comma-terminated H:MM:SS.cc or HH:MM:SS.cc timestamps without sign and leading zero hours,
+# these compare by length and then like strings
+_PLAIN_TIMESTAMPS = re.compile(b"(?:[1-9]?\\d:[0-5]\\d:[0-5]\\d\\.\\d\\d,)*\\Z")
+
+def _events_section(buf, encoding):
+    # Offsets of [Events] section heading, of its first Dialogue/Comment line and of its end
+    # (the next section), or None when there is no such section or no events in it
+    headings = _heading_candidates(buf)
+    for start in headings:
+        line = _line_at(buf, start, encoding)
+        if SECTION_HEADING.match(line) and "Events" in line:
+            break
+    else:
+        return None
+
+    end = len(buf)
+    for line_start in headings:
+        if SECTION_HEADING.match(_line_at(buf, line_start, encoding)):
+            end = line_start
+            break
+
+    match = _EVENT_LINE.search(buf, start, end)
+    if match is None:
+        return None
+    return start, match.start(), end
+
+def _events_body(buf, encoding):
+    # Byte range of event lines in the [Events] section, or None when there is no such section
+    # or it cannot be split (Format: and Style: lines among the events change how the following
+    # lines are parsed)
+    section = _events_section(buf, encoding)
+    if section is None or _STATE_LINE.search(buf, section[1], section[2]):
+        return None
+    return section[1], section[2]
+
+def scan_events(buf, encoding, format_):
+    """
+    Count events of SubStation file in bytes and find their time span, without parsing them.
+
+    Only the Start and End columns are picked from lines in the ``[Events]`` section,
+    by a regular expression.
+
+    Returns:
+        tuple ``(number of events, earliest start, latest end)`` (times are None
+        when there are no events), or None when the file cannot be scanned this way
+        (eg. it has Format: lines among the events), then it has to be parsed.
+    """
+    section = _events_section(buf, encoding)
+    if section is None:
+        return (0, None, None) if _EVENT_LINE.search(buf) is None else None
+    heading, start, end = section
+    if _STATE_LINE.search(buf, start, end) or _EVENT_LINE.search(buf, 0, heading):
+        return None
+
+    columns = parse_format_line(EVENT_FORMAT_LINE[format_])
+    for line in buf[heading:start].decode(encoding).splitlines():
+        if line.strip().startswith("Format:"):
+            columns = parse_format_line(line.strip())
+    fields = [column_to_field(c) for c in columns]
+    if "start" not in fields or "end" not in fields or fields.index("start") > fields.index("end"):
+        return None
+    i, j = fields.index("start"), fields.index("end")
+    pattern = re.compile(b"\\n[ \\t]*(?:Dialogue|Comment):[ \\t]*" +
+                         b"[^,\\n]*," * i + b"([^,\\n]*)," + b"[^,\\n]*," * (j - i - 1) + b"([^,\\n]*),")
+    times = pattern.findall(buf, start - 1, end)
+    if not times:
+        return 0, None, None
+
+    starts, ends = zip(*times)
+    if _PLAIN_TIMESTAMPS.match(b",".join(starts + ends) + b","):
+        # one-digit hours come before two-digit ones
+        earliest = min([v for v in starts if len(v) == 10] or starts)
+        latest = max([v for v in ends if len(v) == 11] or ends)
+        return len(times), parse_timestamp(earliest.decode("ascii")), parse_timestamp(latest.decode("ascii"))
+    else:
+        return (len(times),
+                min(parse_timestamp(v.decode("ascii")) for v in starts),
+                max(parse_timestamp(v.decode("ascii")) for v in ends))
+
+def _event_row(*args, **kwargs):
+    # make function for compile_event_decoder(), see _parse_event_chunk()
+    return args + (kwargs.get("extra"),)
+
+def _parse_event_chunk(task):
+    # Parse event lines in a worker process. Tuples of SSAEvent._make() arguments are returned,
+    # they are much cheaper to send back than SSAEvent objects.
+    data, encoding, columns, format_ = task
+    decode = compile_event_decoder(columns, format_, make=_event_row)
+    rows = []
+    for line in data.decode(encoding).replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        line = line.strip()
+        if line.startswith("Dialogue:") or line.startswith("Comment:"):
+            ev_type, rest = line.split(":", 1)
+            rows.append(decode(ev_type, rest.strip()))
+    return rows
+
+def _split_lines(buf, start, end, size):
+    # Line-aligned pieces of buf[start:end], about size bytes each
+    pieces = []
+    while start < end:
+        stop = buf.find(b"\n", min(start + size, end - 1), end) + 1 or end
+        pieces.append((start, stop))
+        start = stop
+    return pieces
+
+
 class SubstationFormat(FormatBase):
     @classmethod
     def guess_format(cls, text):
@@ -141,51 +638,122 @@ class SubstationFormat(FormatBase):
             return "ssa"
 
     @classmethod
-    def from_file(cls, subs, fp, format_, **kwargs):
-
-        def string_to_field(f, v):
-            if f in {"start", "end"}:
-                if v.startswith("-"):
-                    # handle negative timestamps
-                    v = v[1:]
-                    return -timestamp_to_ms(TIMESTAMP.match(v).groups())
-                else:
-                    return timestamp_to_ms(TIMESTAMP.match(v).groups())
-            elif "color" in f:
-                if format_ == "ass":
-                    return ass_rgba_to_color(v)
-                else:
-                    return ssa_rgb_to_color(v)
-            elif f in {"bold", "underline", "italic", "strikeout"}:
-                return v == "-1"
-            elif f in {"borderstyle", "encoding", "marginl", "marginr", "marginv", "layer", "alphalevel"}:
-                return int(v)
-            elif f in {"fontsize", "scalex", "scaley", "spacing", "angle", "outline", "shadow"}:
-                return float(v)
-            elif f == "marked":
-                return v.endswith("1")
-            elif f == "alignment":
-                i = int(v)
-                if format_ == "ass":
-                    return i
-                else:
-                    return ssa_to_ass_alignment(i)
-            else:
-                return v
+    def match_signature(cls, line, lineno):
+        if "V4+ Styles" in line:
+            return "ass"
+        elif "V4 Styles" in line:
+            return "ssa"
+
+    @classmethod
+    def from_file(cls, subs, fp, format_, sections=SECTIONS, **kwargs):
+        """
+        See :meth:`FormatBase.from_file()`.
+
+        Only given ``sections`` (see :data:`SECTIONS`) are read, the others are left empty.
+        Without ``"events"``, reading stops at the ``[Events]`` section.
+        """
+        subs.info.clear()
+        subs.aegisub_project.clear()
+        subs.styles.clear()
+        del subs.attachments[:]
+        cls._parse_lines(subs, fp, format_, sections=sections)
+
+    @classmethod
+    def from_buffer(cls, subs, buf, format_, encoding, processes=1, sections=SECTIONS, **kwargs):
+        """
+        Read SubStation file from bytes (eg. a memory-mapped file), see :func:`iter_buffer_lines()`.
+
+        With ``processes`` > 1 (or None for the number of CPUs), an ``[Events]`` section
+        of at least :data:`PARALLEL_PARSE_THRESHOLD` bytes is split into line-aligned
+        chunks, which are parsed in a :class:`multiprocessing.Pool`. The result is
+        the same as with :meth:`SubstationFormat.from_file()`.
+
+        Sections with embedded files are not split into lines, their contents
+        are decoded at once into :attr:`SSAFile.attachments`.
+        """
+        skipped = []
+        body = None
+        if "events" in sections and (processes is None or processes > 1):
+            body = _events_body(buf, encoding)
+        if body is None or body[1] - body[0] < PARALLEL_PARSE_THRESHOLD:
+            cls.from_file(subs, iter_buffer_lines(buf, encoding, skipped), format_, sections=sections, **kwargs)
+        else:
+            cls._from_buffer_parallel(subs, buf, format_, encoding, body, processes, skipped, sections)
+
+        if "attachments" in sections:
+            subs.attachments.extend((heading, decode_attachment(buf[start:end], encoding))
+                                    for heading, start, end in skipped)
+
+    @classmethod
+    def _from_buffer_parallel(cls, subs, buf, format_, encoding, body, processes, skipped, sections):
+        # Parse byte range body (event lines) in worker processes, the rest here
+        import multiprocessing
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+
+        start, end = body
+        spans = list(_section_spans(buf, encoding, skipped))
+        head = [(a, min(b, start)) for a, b in spans if a < start]
+        tail = [(max(a, end), b) for a, b in spans if b > end]
 
         subs.info.clear()
         subs.aegisub_project.clear()
         subs.styles.clear()
+        del subs.attachments[:]
+        _, event_columns = cls._parse_lines(subs, chain.from_iterable(_decoded_chunks(buf, head, encoding)), format_,
+                                            sections=sections)
+
+        size = max(PARALLEL_CHUNK_SIZE, (end - start) // (4 * processes))
+        tasks = ((buf[a:b], encoding, event_columns, format_) for a, b in _split_lines(buf, start, end, size))
+        pool = multiprocessing.Pool(processes)
+        try:
+            for rows in pool.imap(_parse_event_chunk, tasks):
+                subs.events.extend(starmap(SSAEvent._make, rows))
+            pool.close()
+        finally:
+            pool.terminate()
+
+        cls._parse_lines(subs, chain.from_iterable(_decoded_chunks(buf, tail, encoding)), format_,
+                         event_columns=event_columns, sections=sections)
+
+    @classmethod
+    def _parse_lines(cls, subs, lines, format_, style_columns=None, event_columns=None, sections=SECTIONS):
+        # Parse lines into subs, starting with given Format: columns (default ones when None).
+        # Returns the columns in effect at the end, so that parsing can continue later.
+        keep_info = "info" in sections
+        keep_aegisub = "aegisub_project" in sections
+        keep_styles = "styles" in sections
+        keep_events = "events" in sections
+        keep_attachments = "attachments" in sections
+        if style_columns is None: style_columns = parse_format_line(STYLE_FORMAT_LINE[format_])
+        if event_columns is None: event_columns = parse_format_line(EVENT_FORMAT_LINE[format_])
+        decode_style = compile_style_decoder(style_columns, format_)
+        decode_event = compile_event_decoder(event_columns, format_)
 
         inside_info_section = False
         inside_aegisub_section = False
+        inside_styles_section = False
+        inside_events_section = False
+        attachment = None # lines of current section with embedded files
+        attachments = []
 
-        for line in fp:
+        for line in lines:
             line = line.strip()
 
-            if SECTION_HEADING.match(line):
-                inside_info_section = "Info" in line
-                inside_aegisub_section = "Aegisub" in line
+            # (uuencoded data may look like a heading, but it has no lowercase letters)
+            if SECTION_HEADING.match(line) and (attachment is None or line.upper() != line):
+                inside_info_section = "Info" in line and keep_info
+                inside_aegisub_section = "Aegisub" in line and keep_aegisub
+                inside_styles_section = "Styles" in line
+                inside_events_section = "Events" in line
+                attachment = None
+                if inside_events_section and not keep_events:
+                    break
+                elif keep_attachments and line.endswith(SKIPPED_SECTIONS):
+                    attachment = []
+                    attachments.append((line, attachment))
+            elif attachment is not None:
+                attachment.append(line)
             elif inside_info_section or inside_aegisub_section:
                 if line.startswith(";"): continue # skip comments
                 try:
@@ -196,73 +764,81 @@ class SubstationFormat(FormatBase):
                         subs.aegisub_project[k] = v.strip()
                 except ValueError:
                     pass
+            elif line.startswith("Dialogue:") or line.startswith("Comment:"):
+                if not keep_events: continue
+                ev_type, rest = line.split(":", 1)
+                subs.events.append(decode_event(ev_type, rest.strip()))
             elif line.startswith("Style:"):
+                if not keep_styles: continue
                 _, rest = line.split(":", 1)
-                buf = rest.strip().split(",")
-                name, raw_fields = buf[0], buf[1:] # splat workaround for Python 2.7
-                field_dict = {f: string_to_field(f, v) for f, v in zip(STYLE_FIELDS[format_], raw_fields)}
-                sty = SSAStyle(**field_dict)
+                name, sty = decode_style(rest.strip())
                 subs.styles[name] = sty
-            elif line.startswith("Dialogue:") or line.startswith("Comment:"):
-                ev_type, rest = line.split(":", 1)
-                raw_fields = rest.strip().split(",", len(EVENT_FIELDS[format_])-1)
-                field_dict = {f: string_to_field(f, v) for f, v in zip(EVENT_FIELDS[format_], raw_fields)}
-                field_dict["type"] = ev_type
-                ev = SSAEvent(**field_dict)
-                subs.events.append(ev)
+            elif line.startswith("Format:"):
+                if inside_styles_section:
+                    style_columns = parse_format_line(line)
+                    decode_style = compile_style_decoder(style_columns, format_)
+                elif inside_events_section:
+                    event_columns = parse_format_line(line)
+                    decode_event = compile_event_decoder(event_columns, format_)
 
+        subs.attachments.extend((heading, "\n".join(data).rstrip()) for heading, data in attachments)
+        return style_columns, event_columns
 
     @classmethod
-    def to_file(cls, subs, fp, format_, header_notice=NOTICE, **kwargs):
+    def to_file(cls, subs, fp, format_, **kwargs):
+        if "extra_event_fields" not in kwargs:
+            kwargs["extra_event_fields"] = extra_columns(subs.events)
+        super(SubstationFormat, cls).to_file(subs, fp, format_, **kwargs)
+
+    @classmethod
+    def write_events(cls, fp, events, format_, info=None, styles=None, aegisub_project=None,
+                     header_notice=NOTICE, extra_event_fields=(), attachments=(), **kwargs):
+        """
+        See :meth:`FormatBase.write_events()`.
+
+        Columns from :attr:`SSAEvent.extra` are written only when listed in ``extra_event_fields``
+        (they are placed before Text). :meth:`SubstationFormat.to_file()` lists all
+        such columns found in the file. Extra style columns are always written.
+        """
+        if info is None: info = {}
+        if styles is None: styles = {"Default": SSAStyle.DEFAULT_STYLE}
+
         print("[Script Info]", file=fp)
         for line in header_notice.splitlines(False):
-            print(";", line, file=fp)
+            fp.write("; " + line + "\n")
 
-        subs.info["ScriptType"] = "v4.00+" if format_ == "ass" else "v4.00"
-        for k, v in subs.info.items():
-            print(k, v, sep=": ", file=fp)
+        # ScriptType is written in place of the existing entry (or last), info is left untouched
+        script_type = "v4.00+" if format_ == "ass" else "v4.00"
+        for k, v in info.items():
+            print(k, script_type if k == "ScriptType" else v, sep=": ", file=fp)
+        if "ScriptType" not in info:
+            print("ScriptType", script_type, sep=": ", file=fp)
 
-        if subs.aegisub_project:
+        if aegisub_project:
             print("\n[Aegisub Project Garbage]", file=fp)
-            for k, v in subs.aegisub_project.items():
+            for k, v in aegisub_project.items():
                 print(k, v, sep=": ", file=fp)
 
-        def field_to_string(f, v, line):
-            if f in {"start", "end"}:
-                return ms_to_timestamp(v)
-            elif f == "marked":
-                return "Marked=%d" % v
-            elif f == "alignment" and format_ == "ssa":
-                return text_type(ass_to_ssa_alignment(v))
-            elif isinstance(v, bool):
-                return "-1" if v else "0"
-            elif isinstance(v, (text_type, Number)):
-                return text_type(v)
-            elif not PY3 and isinstance(v, binary_string_type):
-                # A convenience feature, see issue #12 - accept non-unicode strings
-                # when they are ASCII; this is useful in Python 2, especially for non-text
-                # fields like style names, where requiring Unicode type seems too stringent
-                if all(ord(c) < 128 for c in v):
-                    return text_type(v)
-                else:
-                    raise TypeError("Encountered binary string with non-ASCII codepoint in SubStation field {!r} for line {!r} - please use unicode string instead of str".format(f, line))
-            elif isinstance(v, Color):
-                if format_ == "ass":
-                    return color_to_ass_rgba(v)
-                else:
-                    return color_to_ssa_rgb(v)
-            else:
-                raise TypeError("Unexpected type when writing a SubStation field {!r} for line {!r}".format(f, line))
-
         print("\n[V4+ Styles]" if format_ == "ass" else "\n[V4 Styles]", file=fp)
-        print(STYLE_FORMAT_LINE[format_], file=fp)
-        for name, sty in subs.styles.items():
-            fields = [field_to_string(f, getattr(sty, f), sty) for f in STYLE_FIELDS[format_]]
-            print("Style: %s" % name, *fields, sep=",", file=fp)
+        style_extra = extra_columns(sty.extra for sty in styles.values())
+        print(STYLE_FORMAT_LINE[format_] + "".join(", " + c for c in style_extra), file=fp)
+        format_style = compile_row_formatter(STYLE_FIELDS[format_], format_, extra_columns=style_extra)
+        fp.write("".join(["Style: %s,%s\n" % (name, format_style(sty)) for name, sty in styles.items()]))
+
+        for heading, data in attachments:
+            print("", heading, file=fp, sep="\n")
+            if data:
+                print(data, file=fp)
 
         print("\n[Events]", file=fp)
-        print(EVENT_FORMAT_LINE[format_], file=fp)
-        for ev in subs.events:
-            fields = [field_to_string(f, getattr(ev, f), ev) for f in EVENT_FIELDS[format_]]
-            print(ev.type, end=": ", file=fp)
-            print(*fields, sep=",", file=fp)
+        event_fields = EVENT_FIELDS[format_]
+        if extra_event_fields:
+            # Text has to stay the last column
+            print(EVENT_FORMAT_LINE[format_][:-len(", Text")] + "".join(", " + c for c in extra_event_fields) + ", Text",
+                  file=fp)
+            format_event = compile_row_formatter(event_fields[:-1], format_, extra_columns=extra_event_fields,
+                                                 last_fields=event_fields[-1:])
+        else:
+            print(EVENT_FORMAT_LINE[format_], file=fp)
+            format_event = compile_row_formatter(event_fields, format_)
+        write_chunked(fp, ("%s: %s\n" % (ev.type, format_event(ev)) for ev in events))
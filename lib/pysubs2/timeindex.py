@@ -0,0 +1,127 @@
+from __future__ import unicode_literals
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+from .eventtable import EventView
+
+_by_start = attrgetter("start")
+
+
+def _same(a, b):
+    # EventTable hands out a new view on each access, those are identified by their row
+    if a is b:
+        return True
+    return (isinstance(a, EventView) and isinstance(b, EventView)
+            and a._table is b._table and a._row == b._row)
+
+
+class _Bucket(object):
+    # events with durations below 2**bits milliseconds, sorted by start
+    __slots__ = ("span", "starts", "ends", "events")
+
+    def __init__(self, bits):
+        self.span = 1 << bits
+        self.starts = []
+        self.ends = []
+        self.events = []
+
+
+class TimeIndex(object):
+    """
+    Index of events by time, for "which subtitles are visible at t" queries.
+
+    Events are grouped by duration into buckets of powers of two milliseconds
+    (under 1 s, under 2 s, ...), each kept sorted by start time in parallel lists.
+    An event shorter than ``2**b`` ms which is active at ``t`` started after ``t - 2**b``,
+    so a query bisects each bucket for that range and only looks at events in it,
+    of which most are active. This is O(b log n + k) for k results, where b is
+    the number of buckets in use (about 25 for durations up to hours), regardless
+    of how events overlap; one long event does not slow down queries elsewhere.
+
+    Times are half-open intervals, ie. an event is active at ``t`` when
+    ``start <= t < end``.
+
+    The index is built by :meth:`SSAFile.events_at()` and friends and updated by
+    :class:`SSAFile` methods which add or remove events. It does not notice
+    events being retimed in place; see :meth:`SSAFile.rebuild_time_index()`.
+
+    """
+
+    def __init__(self, events=()):
+        self.buckets = {} # bits -> _Bucket
+        self.size = 0
+        for ev in sorted(events, key=attrgetter("start", "end")):
+            bucket = self._bucket(ev.end - ev.start)
+            bucket.starts.append(ev.start)
+            bucket.ends.append(ev.end)
+            bucket.events.append(ev)
+            self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def _bucket(self, duration):
+        bits = max(duration, 1).bit_length()
+        bucket = self.buckets.get(bits)
+        if bucket is None:
+            bucket = self.buckets[bits] = _Bucket(bits)
+        return bucket
+
+    def add(self, ev):
+        """Add event to the index."""
+        bucket = self._bucket(ev.end - ev.start)
+        i = bisect_right(bucket.starts, ev.start)
+        bucket.starts.insert(i, ev.start)
+        bucket.ends.insert(i, ev.end)
+        bucket.events.insert(i, ev)
+        self.size += 1
+
+    def remove(self, ev):
+        """
+        Remove event from the index.
+
+        Raises:
+            ValueError: The event is not in the index.
+        """
+        bucket, i = self._find(ev)
+        del bucket.starts[i]
+        del bucket.ends[i]
+        del bucket.events[i]
+        self.size -= 1
+
+    def _find(self, ev):
+        bucket = self.buckets.get(max(ev.end - ev.start, 1).bit_length())
+        if bucket is not None:
+            lo = bisect_left(bucket.starts, ev.start)
+            hi = bisect_right(bucket.starts, ev.start)
+            for i in range(lo, hi):
+                if _same(bucket.events[i], ev):
+                    return bucket, i
+
+        # the event was retimed after being indexed
+        for bucket in self.buckets.values():
+            for i, other in enumerate(bucket.events):
+                if _same(other, ev):
+                    return bucket, i
+
+        raise ValueError("Event is not in the index")
+
+    def _query(self, start, end, bisect_end):
+        # events which end after start and start before end (bisect_end decides about start == end)
+        found = []
+        for bits in sorted(self.buckets):
+            bucket = self.buckets[bits]
+            hi = bisect_end(bucket.starts, end)
+            lo = bisect_right(bucket.starts, start - bucket.span, 0, hi)
+            ends, events = bucket.ends, bucket.events
+            found.extend(events[i] for i in range(lo, hi) if ends[i] > start)
+        if len(self.buckets) > 1:
+            found.sort(key=_by_start)
+        return found
+
+    def events_at(self, ms):
+        """List of events active at given time, sorted by start."""
+        return self._query(ms, ms, bisect_right)
+
+    def events_between(self, start, end):
+        """List of events overlapping time window ``[start, end)``, sorted by start."""
+        return self._query(start, end, bisect_left)
@@ -4,13 +4,19 @@ import re
 from .formatbase import FormatBase
 from .ssaevent import SSAEvent
 from .ssastyle import SSAStyle
-from .substation import parse_tags
-from .time import ms_to_times, make_time, tmptimestamp_to_ms
+from .substation import parse_tags, write_chunked
+from .time import ms_to_times, make_time
 
 #: Pattern that matches TMP timestamp
 TMPTIMESTAMP = re.compile(r"(\d{1,2}):(\d{2}):(\d{2})")
 #: Pattern that matches TMP line
 TMP_LINE = re.compile(r"(\d{1,2}:\d{2}:\d{2}):(.+)")
+#: Pattern that matches TMP line, with timestamp split into hours, minutes and seconds
+TMP_LINE_FIELDS = re.compile(r"(\d{1,2}):(\d{2}):(\d{2}):(.+)")
+#: Pattern that matches underline HTML tag
+TMP_UNDERLINE_TAG = re.compile(r"< *u *>")
+#: Pattern that matches any HTML tag
+TMP_HTML_TAG = re.compile(r"< */? *[a-zA-Z][^>]*>")
 
 #: Largest timestamp allowed in Tmp, ie. 99:59:59.
 MAX_REPRESENTABLE_TIME = make_time(h=100) - 1
@@ -35,37 +41,43 @@ class TmpFormat(FormatBase):
             if TMP_LINE.match(line) and len(TMP_LINE.findall(line)) == 1:
                 return "tmp"
 
+    @classmethod
+    def match_signature(cls, line, lineno):
+        if "[Script Info]" in line or "[V4+ Styles]" in line:
+            return False
+        elif TMP_LINE.match(line) and len(TMP_LINE.findall(line)) == 1:
+            return "tmp"
+
     @classmethod
     def from_file(cls, subs, fp, format_, **kwargs):
-        timestamps = [] # (start)
-        lines = [] # contains lists of lines following each timestamp
+        def prepare_text(lines):
+            lines = lines.replace("|", r"\N")  # convert newlines
+            lines = TMP_UNDERLINE_TAG.sub("{\\\\u1}", lines) # not r" for Python 2.7 compat, triggers unicodeescape
+            lines = TMP_HTML_TAG.sub("", lines) # strip other HTML tags
+            return lines
+
+        match = TMP_LINE_FIELDS.match
+        make = SSAEvent._make
+        append = subs.events.append
 
         for line in fp:
-            match = TMP_LINE.match(line)
-            if not match:
+            m = match(line)
+            if not m:
                 continue
 
-            start, text = match.groups()
-            start = tmptimestamp_to_ms(TMPTIMESTAMP.match(start).groups())
+            h, mm, ss, text = m.groups()
+            start = int(h) * 3600000 + int(mm) * 60000 + int(ss) * 1000
             #calculate endtime from starttime + 500 miliseconds + 67 miliseconds per each character (15 chars per second)
             end = start + 500 + (len(line) * 67)
-            timestamps.append((start, end))
-            lines.append(text)
-
-        def prepare_text(lines):
-            lines = lines.replace("|", r"\N")  # convert newlines
-            lines = re.sub(r"< *u *>", "{\\\\u1}", lines) # not r" for Python 2.7 compat, triggers unicodeescape
-            lines = re.sub(r"< */? *[a-zA-Z][^>]*>", "", lines) # strip other HTML tags
-            return lines
-
-        subs.events = [SSAEvent(start=start, end=end, text=prepare_text(lines))
-                       for (start, end), lines in zip(timestamps, lines)]
+            append(make(start, end, prepare_text(text)))
 
     @classmethod
-    def to_file(cls, subs, fp, format_, **kwargs):
+    def write_events(cls, fp, events, format_, styles=None, **kwargs):
+        if styles is None: styles = {}
+
         def prepare_text(text, style):
             body = []
-            for fragment, sty in parse_tags(text, style, subs.styles):
+            for fragment, sty in parse_tags(text, style, styles):
                 fragment = fragment.replace(r"\h", " ")
                 fragment = fragment.replace(r"\n", "\n")
                 fragment = fragment.replace(r"\N", "\n")
@@ -76,13 +88,14 @@ class TmpFormat(FormatBase):
 
             return re.sub("\n+", "\n", "".join(body).strip())
 
-        visible_lines = (line for line in subs if not line.is_comment)
+        def format_lines():
+            visible_lines = (line for line in events if not line.is_comment)
+
+            for line in visible_lines:
+                start = ms_to_timestamp(line.start)
+                #end = ms_to_timestamp(line.end)
+                text = prepare_text(line.text, styles.get(line.style, SSAStyle.DEFAULT_STYLE))
 
-        for i, line in enumerate(visible_lines, 1):
-            start = ms_to_timestamp(line.start)
-            #end = ms_to_timestamp(line.end)
-            text = prepare_text(line.text, subs.styles.get(line.style, SSAStyle.DEFAULT_STYLE))
+                yield start + ":" + text + "\n"
 
-            #print("%d" % i, file=fp) # Python 2.7 compat
-            print(start + ":" + text, end="\n", file=fp)
-            #print(text, end="\n\n", file=fp)
+        write_chunked(fp, format_lines())
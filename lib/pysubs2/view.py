@@ -0,0 +1,63 @@
+from __future__ import unicode_literals
+from bisect import bisect_left
+from collections import Sequence
+
+
+class EventRange(Sequence):
+    """
+    Read-only view of ``events[start:stop]``, without copying (see :class:`SSAFileView`).
+
+    Indices are relative to ``start``; slicing gives another range over the same events.
+    Bounds are fixed when the range is created, so it is only meaningful until
+    events are added to or removed from the underlying sequence.
+
+    """
+
+    def __init__(self, events, start=None, stop=None):
+        start, stop, _ = slice(start, stop).indices(len(events))
+        self.events = events
+        self.start = start
+        self.stop = max(start, stop)
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return EventRange(self.events, self.start + start, self.start + max(start, stop))
+
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("event index out of range")
+        return self.events[self.start + item]
+
+    def __iter__(self):
+        events = self.events
+        for i in range(self.start, self.stop):
+            yield events[i]
+
+    def __repr__(self):
+        return "<EventRange [%d:%d] of %d events>" % (self.start, self.stop, len(self.events))
+
+
+class _Starts(object):
+    # start times of events as a sequence, for bisect
+    def __init__(self, events):
+        self.events = events
+
+    def __getitem__(self, i):
+        return self.events[i].start
+
+    def __len__(self):
+        return len(self.events)
+
+
+def start_range(events, start, end):
+    """Return ``(lo, hi)`` such that ``events[lo:hi]`` start in ``[start, end)``, for events sorted by start."""
+    starts = _Starts(events)
+    lo = bisect_left(starts, start)
+    return lo, max(lo, bisect_left(starts, end, lo))
@@ -0,0 +1,47 @@
+from __future__ import unicode_literals
+import io
+import os.path
+
+import pytest
+
+from lib.pysubs2 import SSAFile
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+FONT = "fontname: a_0.ttf\n[!3(2-!,]X\n,0%0&``!0``"
+
+
+def write_sample(path, newline="\n"):
+    with io.open(os.path.join(DATA, "sample.ass"), encoding="utf-8") as fp:
+        text = fp.read()
+    # a line of uuencoded data which looks like a section heading
+    text = text.replace("\n[Events]", "\n[Fonts]\n" + FONT + "\n\n[Graphics]\nfilename: logo.png\nM!\n\n[Events]")
+    with io.open(path, "wb") as fp:
+        fp.write(text.replace("\n", newline).encode("utf-8"))
+    return text
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_attachments_are_kept(tmpdir, newline):
+    path = str(tmpdir.join("fonts.ass"))
+    text = write_sample(path, newline)
+    expected = [("[Fonts]", FONT), ("[Graphics]", "filename: logo.png\nM!")]
+    plain = SSAFile.load(os.path.join(DATA, "sample.ass"))
+    written = SSAFile.from_string(plain.to_string("ass"))
+
+    for subs in (SSAFile.load(path), SSAFile.from_string(text)):
+        assert subs.attachments == expected
+        assert subs.equals(plain)
+
+        out = SSAFile.from_string(subs.to_string("ass"))
+        assert out.attachments == expected
+        assert out.equals(written)
+
+
+def test_attachments_not_loaded(tmpdir):
+    path = str(tmpdir.join("fonts.ass"))
+    write_sample(path)
+    subs = SSAFile.load(path, sections=("styles", "events"))
+    assert subs.attachments == []
+    assert len(subs) == 7
+    assert "[Fonts]" not in subs.to_string("ass")
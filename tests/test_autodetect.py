@@ -0,0 +1,59 @@
+from __future__ import unicode_literals
+import io
+import os.path
+
+import pytest
+
+from lib.pysubs2 import FormatAutodetectionError, SSAEvent, SSAFile
+from lib.pysubs2.formats import PEEK_SIZE, autodetect_format
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+class Pipe(object):
+    # text stream which cannot seek, like stdin
+    def __init__(self, text):
+        self.fp = io.StringIO(text)
+
+    def read(self, size=-1):
+        return self.fp.read(size)
+
+    def __iter__(self):
+        return iter(self.fp)
+
+    def seekable(self):
+        return False
+
+
+def read(name):
+    with io.open(os.path.join(DATA, name), encoding="utf-8") as fp:
+        return fp.read()
+
+
+@pytest.mark.parametrize("name, format_", [("sample.ass", "ass"), ("sample.srt", "srt"), ("sample.sub", "microdvd"),
+                                           ("sample.mpl", "mpl2"), ("sample.txt", "tmp")])
+def test_detects_samples(name, format_):
+    assert autodetect_format(read(name)) == format_
+    assert SSAFile.load(os.path.join(DATA, name)).format == format_
+
+
+def test_undecidable_or_unknown():
+    with pytest.raises(FormatAutodetectionError):
+        autodetect_format("just some text\nand more\n")
+    with pytest.raises(FormatAutodetectionError):
+        autodetect_format("")
+
+
+def test_non_seekable_stream():
+    subs = SSAFile()
+    for i in range(1000):
+        subs.append(SSAEvent(start=i * 1000, end=i * 1000 + 500, text="line number %d" % i))
+    text = subs.to_string("srt")
+    assert len(text) > PEEK_SIZE
+
+    loaded = SSAFile.from_file(Pipe(text))
+    assert loaded.format == "srt"
+    assert [(ev.start, ev.end, ev.text) for ev in loaded] == [(ev.start, ev.end, ev.text) for ev in subs]
+
+    loaded = SSAFile.from_file(Pipe(subs.to_string("ass")))
+    assert loaded.equals(subs)
@@ -0,0 +1,86 @@
+from __future__ import unicode_literals
+import io
+import os
+import shutil
+
+from lib.pysubs2 import SSAFile, ParseCache
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+class CountingCache(ParseCache):
+    hits = misses = 0
+
+    def get(self, key, subs):
+        hit = ParseCache.get(self, key, subs)
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return hit
+
+
+def copy_sample(tmpdir, name):
+    path = str(tmpdir.join(name))
+    shutil.copy(os.path.join(DATA, name), path)
+    return path
+
+
+def test_second_load_is_a_hit(tmpdir):
+    cache = CountingCache(str(tmpdir.join("cache")))
+    for name in ("sample.ass", "sample.srt", "sample.sub"):
+        path = copy_sample(tmpdir, name)
+        first = SSAFile.load(path, cache=cache, fps=25 if name == "sample.sub" else None)
+        second = SSAFile.load(path, cache=cache, fps=25 if name == "sample.sub" else None)
+        assert second.format == first.format
+        assert second.fps == first.fps
+        assert second.equals(first)
+        assert second.to_string("ass") == first.to_string("ass")
+    assert (cache.hits, cache.misses) == (3, 3)
+
+
+def test_changed_file_misses(tmpdir):
+    cache = CountingCache(str(tmpdir.join("cache")))
+    path = copy_sample(tmpdir, "sample.srt")
+    assert len(SSAFile.load(path, cache=cache)) == 3
+
+    # different size
+    with io.open(path, "a", encoding="utf-8") as fp:
+        fp.write("\n\n4\n00:00:09,000 --> 00:00:10,000\nAdded\n")
+    assert len(SSAFile.load(path, cache=cache)) == 4
+    assert cache.hits == 0
+
+    # same size, different mtime
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 10))
+    assert len(SSAFile.load(path, cache=cache)) == 4
+    assert cache.hits == 0
+    assert len(SSAFile.load(path, cache=cache)) == 4
+    assert cache.hits == 1
+
+
+def test_options_are_part_of_key(tmpdir):
+    cache = CountingCache(str(tmpdir.join("cache")))
+    path = copy_sample(tmpdir, "sample.srt")
+    SSAFile.load(path, cache=cache)
+    SSAFile.load(path, cache=cache, keep_unknown_html_tags=True)
+    assert cache.hits == 0
+    assert "<font" in SSAFile.load(path, cache=cache, keep_unknown_html_tags=True)[2].text
+    assert cache.hits == 1
+
+
+def test_broken_entry_is_removed(tmpdir):
+    cache = ParseCache(str(tmpdir.join("cache")))
+    path = copy_sample(tmpdir, "sample.ass")
+    expected = SSAFile.load(path, cache=cache)
+    entry = cache.entry_path(cache.key(path, "utf-8", None, None, {}))
+    with io.open(entry, "r+b") as fp:
+        fp.truncate(os.path.getsize(entry) // 2)
+    assert SSAFile.load(path, cache=cache).equals(expected)
+
+
+def test_eviction(tmpdir):
+    cache = ParseCache(str(tmpdir.join("cache")), max_size=1)
+    path = copy_sample(tmpdir, "sample.ass")
+    SSAFile.load(path, cache=cache)
+    assert os.listdir(cache.directory) == []
@@ -0,0 +1,50 @@
+from __future__ import unicode_literals
+import os.path
+
+import pytest
+
+from lib.pysubs2 import Color, SSAEvent, SSAFile, SSAStyle
+from lib.pysubs2.common import intern_value
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+def test_slots():
+    for obj in (SSAEvent(), SSAStyle(), Color(1, 2, 3)):
+        assert not hasattr(obj, "__dict__")
+        with pytest.raises(AttributeError):
+            obj.unknown_field = 1
+
+
+def test_validating_constructor():
+    with pytest.raises(ValueError):
+        SSAEvent(unknown_field=1)
+    with pytest.raises(ValueError):
+        SSAStyle(unknown_field=1)
+
+
+def test_make_matches_constructor():
+    ev = SSAEvent._make(1, 2, "text", 1, "Sign", "Bob", 1, 2, 3, "fx", "Comment", True)
+    assert ev == SSAEvent(start=1, end=2, text="text", layer=1, style="Sign", name="Bob", marginl=1, marginr=2,
+                          marginv=3, effect="fx", type="Comment", marked=True)
+    assert SSAEvent._make() == SSAEvent()
+
+
+def test_copy_is_independent():
+    ev = SSAEvent(start=1, end=2, text="a")
+    ev.extra = {"Actor2": "x"}
+    copy = ev.copy()
+    assert copy == ev and copy is not ev
+    copy.extra["Actor2"] = "y"
+    assert ev.extra == {"Actor2": "x"}
+
+    style = SSAStyle(fontsize=30)
+    assert style.copy() == style and style.copy() is not style
+
+
+def test_parsed_values_are_interned():
+    subs = SSAFile.load(os.path.join(DATA, "sample.ass"))
+    default = [ev.style for ev in subs if ev.style == "Default"]
+    assert all(style is default[0] for style in default)
+    assert subs.styles["Sign"].outlinecolor is subs.styles["Top"].outlinecolor
+    assert intern_value(Color(1, 2, 3)) is intern_value(Color(1, 2, 3))
@@ -0,0 +1,72 @@
+# coding=utf-8
+from __future__ import unicode_literals
+import os.path
+
+import pytest
+
+from lib.pysubs2 import SSAEvent, SSAFile
+from lib.pysubs2.diff import diff_events, matching_blocks
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+def test_event_fingerprint():
+    ev = SSAEvent(start=1000, end=2000, text="Hello č")
+    assert ev.fingerprint == 1714891853238554034  # same in any process and Python version
+    assert ev.copy().fingerprint == ev.fingerprint
+
+    ev.end = 2500
+    assert ev.fingerprint != 1714891853238554034
+    ev.end = 2000
+    assert ev.fingerprint == 1714891853238554034
+    ev.extra = {"Actor2": "x"}
+    assert ev.fingerprint != 1714891853238554034
+
+
+def test_file_fingerprint():
+    subs = SSAFile.load(os.path.join(DATA, "sample.ass"))
+    value = subs.fingerprint()
+    assert SSAFile.load(os.path.join(DATA, "sample.ass"), columnar=True).fingerprint() == value
+
+    subs.styles["Default"].bold = not subs.styles["Default"].bold
+    assert subs.fingerprint() != value
+    subs.styles["Default"].bold = not subs.styles["Default"].bold
+    assert subs.fingerprint() == value
+    subs.info["Title"] = "Changed"
+    assert subs.fingerprint() != value
+
+
+def test_diff():
+    old = SSAFile.load(os.path.join(DATA, "sample.ass"))
+    new = SSAFile.load(os.path.join(DATA, "sample.ass"))
+    assert old.diff(new) == ([], [], [])
+
+    del new[1]
+    new[2].text = "Changed"
+    new.append(SSAEvent(start=20000, end=21000, text="New"))
+    deleted, inserted, modified = old.diff(new)
+    assert deleted == [1]
+    assert inserted == [len(new) - 1]
+    assert modified == [(3, 2)]
+
+    with pytest.raises(TypeError):
+        old.diff(old.events)
+
+
+def test_diff_large():
+    old = [SSAEvent(start=i, end=i + 1, text="Line %d" % i) for i in range(5000)]
+    new = old[:100] + old[200:4000] + [SSAEvent(text="x")] + old[4000:]
+    new[10] = SSAEvent(text="y")
+    deleted, inserted, modified = diff_events(old, new)
+    assert deleted == list(range(100, 200))
+    assert inserted == [3900]
+    assert modified == [(10, 10)]
+
+
+def test_matching_blocks_duplicates():
+    a = ["x", "a", "x", "b", "x"]
+    b = ["x", "b", "x", "a", "x"]
+    matched = sum(n for _, _, n in matching_blocks(a, b))
+    assert matched == 3  # longest common subsequence
+    for i, j, n in matching_blocks(a, b):
+        assert a[i:i+n] == b[j:j+n]
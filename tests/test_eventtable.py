@@ -0,0 +1,62 @@
+from __future__ import unicode_literals
+import os.path
+
+from lib.pysubs2 import EventTable, EventView, SSAEvent, SSAFile
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+def test_columnar_load_matches_list_load():
+    for name in ("sample.ass", "sample.srt"):
+        path = os.path.join(DATA, name)
+        subs = SSAFile.load(path)
+        columnar = SSAFile.load(path, columnar=True)
+        assert isinstance(columnar.events, EventTable)
+        assert columnar.equals(subs)
+        assert columnar.to_string("ass") == subs.to_string("ass")
+
+
+def test_views_write_into_table():
+    table = EventTable([SSAEvent(start=0, end=1000, text="a", style="Sign")])
+    ev = table[0]
+    assert isinstance(ev, EventView)
+    ev.text = "b"
+    ev.start = 500
+    ev.style = "Top"
+    assert (table[0].text, table[0].start, table[0].style) == ("b", 500, "Top")
+
+
+def test_events_are_copied_in():
+    ev = SSAEvent(start=0, end=1000, text="a")
+    table = EventTable()
+    table.append(ev)
+    ev.text = "changed"
+    assert table[0].text == "a"
+
+
+def test_list_interface():
+    table = EventTable(SSAEvent(start=i, end=i + 1, text=str(i)) for i in range(5))
+    del table[1]
+    table.insert(0, SSAEvent(start=10, end=11, text="x"))
+    table[2] = SSAEvent(start=20, end=21, text="y")
+    assert [ev.text for ev in table] == ["x", "0", "y", "3", "4"]
+    assert [ev.text for ev in table[1:3]] == ["0", "y"]
+    table.sort()
+    assert [ev.text for ev in table] == ["0", "3", "4", "x", "y"]
+
+
+def test_compact_drops_unreferenced_rows():
+    table = EventTable(SSAEvent(start=i, end=i + 1, text=str(i)) for i in range(5))
+    del table[:3]
+    assert table.rows == 5
+    table.compact()
+    assert table.rows == 2
+    assert [ev.text for ev in table] == ["3", "4"]
+
+
+def test_extra_fields_are_kept():
+    ev = SSAEvent(start=0, end=1)
+    ev.extra = {"Actor2": "x"}
+    table = EventTable([ev, SSAEvent(start=1, end=2)])
+    assert table[0].extra == {"Actor2": "x"}
+    assert table[1].extra is None
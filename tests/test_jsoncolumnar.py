@@ -0,0 +1,48 @@
+from __future__ import unicode_literals
+import json
+import os.path
+
+import pytest
+
+from lib.pysubs2 import SSAFile
+from lib.pysubs2.jsoncolumnar import JSON_COLUMNAR_VERSION
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+def load_sample(columnar=False):
+    subs = SSAFile.load(os.path.join(DATA, "sample.ass"), columnar=columnar)
+    subs[0].extra = {"Actor2": "x"}
+    subs.styles["Sign"].extra = {"Custom": "y"}
+    subs.attachments.append(("[Fonts]", "fontname: a.ttf\nABCD\n"))
+    return subs
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_round_trip(columnar):
+    subs = load_sample()
+    text = load_sample(columnar).to_string("json-columnar")
+    assert text == subs.to_string("json-columnar")  # same document from either backend
+
+    loaded = SSAFile.from_string(text, columnar=columnar)
+    assert loaded.format == "json-columnar"
+    assert loaded.equals(subs)
+    assert loaded.aegisub_project == subs.aegisub_project
+    assert loaded.attachments == subs.attachments
+    assert loaded[0].extra == {"Actor2": "x"}
+    assert loaded.styles["Sign"].extra == {"Custom": "y"}
+    assert loaded.to_string("ass") == subs.to_string("ass")
+
+
+def test_document_is_columnar():
+    data = json.loads(load_sample().to_string("json-columnar"))
+    assert data["version"] == JSON_COLUMNAR_VERSION
+    assert data["events"]["start"][:2] == [1000, 4000]
+    assert isinstance(data["events"]["style"][0], int)
+
+
+def test_newer_version_is_rejected():
+    data = json.loads(load_sample().to_string("json-columnar"))
+    data["version"] = JSON_COLUMNAR_VERSION + 1
+    with pytest.raises(ValueError):
+        SSAFile.from_string(json.dumps(data), "json-columnar")
@@ -0,0 +1,46 @@
+from __future__ import unicode_literals
+import io
+
+from lib.pysubs2 import SSAEvent, SSAFile, merge_events
+from lib.pysubs2.formats import write_events
+
+
+def make_events(*times):
+    return [SSAEvent(start=start, end=end, text="%d" % start) for start, end in times]
+
+
+def test_merge_order():
+    first = make_events((0, 1000), (2000, 3000), (5000, 6000))
+    second = make_events((0, 500), (1000, 2000), (5000, 5500))
+    merged = list(merge_events(iter(first), iter(second)))
+    assert [ev.start for ev in merged] == [0, 0, 1000, 2000, 5000, 5000]
+    assert merged[0] is first[0]  # first wins ties
+    assert merged[4] is first[2]
+    assert list(merge_events([], second)) == second
+
+
+def test_snap():
+    first = make_events((1000, 3000), (4000, 6000))
+    second = make_events((1100, 2950), (3500, 5000), (6100, 7000))
+    merged = list(merge_events(first, second, snap=200))
+    assert [(ev.start, ev.end) for ev in second] == [(1000, 3000), (3500, 5000), (6100, 7000)]
+    assert merged == [first[0], second[0], second[1], first[1], second[2]]
+
+
+def test_snap_keeps_order():
+    # snapping the start of an event to the first stream must not move it before
+    # an event of the second stream which was already yielded
+    first = make_events((0, 5000), (1000, 2000))
+    second = make_events((900, 1500), (950, 3000))
+    merged = list(merge_events(first, second, snap=200))
+    starts = [ev.start for ev in merged]
+    assert starts == sorted(starts)
+
+
+def test_write_merged():
+    top = make_events((0, 1000), (2000, 3000))
+    bottom = make_events((500, 1500))
+    fp = io.StringIO()
+    write_events(fp, merge_events(top, bottom), "srt")
+    subs = SSAFile.from_string(fp.getvalue())
+    assert [ev.text for ev in subs] == ["0", "500", "2000"]
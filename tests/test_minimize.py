@@ -0,0 +1,51 @@
+from __future__ import unicode_literals
+import os.path
+
+import pytest
+
+from lib.pysubs2 import SSAEvent, SSAFile, SSAStyle
+from lib.pysubs2.minimize import minimize_text
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+@pytest.mark.parametrize("text, expected, removed", [
+    ("Plain", "Plain", 0),
+    ("{comment}Hello", "Hello", 1),
+    ("{\\i0}Hello", "Hello", 1),
+    ("{\\i1}Hello {\\i1}world{\\i0}", "{\\i1}Hello world", 2),
+    ("{\\fs20}a{\\fs20\\bord2}b{}c", "{\\fs20}a{\\bord2}bc", 2),
+    ("{\\pos(10,20)}{\\b1}", "{\\pos(10,20)}", 1),
+    ("{\\t(\\fs30)}a{\\fs20}b", "{\\t(\\fs30)}a{\\fs20}b", 0),
+    ("{\\i1}a{\\r}{\\i0}b", "{\\i1}a{\\r}b", 1),
+    ("{\\i1}a{\\rSign\\i1}b", "{\\i1}a{\\rSign}b", 1),
+])
+def test_minimize_text(text, expected, removed):
+    styles = {"Sign": SSAStyle(italic=True)}
+    assert minimize_text(text, SSAStyle(), styles) == (expected, removed)
+
+
+def test_minimize_text_without_style():
+    assert minimize_text("{\\i0}Hello") == ("{\\i0}Hello", 0)
+
+
+def test_minimize():
+    subs = SSAFile.load(os.path.join(DATA, "sample.ass"))
+    subs.styles["Unused"] = SSAStyle()
+    subs.styles["Reset"] = SSAStyle()
+    subs.append(SSAEvent(start=0, end=1000, text="{\\i0}{unused}Hello", style="Default"))
+    subs.append(SSAEvent(start=0, end=1000, text="{\\rReset}Reset"))
+    comments = sum(ev.is_comment for ev in subs)
+    n = len(subs)
+
+    stats = subs.minimize()
+    assert stats.events == comments
+    assert len(subs) == n - comments
+    assert not any(ev.is_comment for ev in subs)
+    assert "Unused" not in subs.styles
+    assert list(subs.styles) == ["Default", "Sign", "Top", "Reset"]  # Reset is used by \r
+    assert stats.styles == 1
+    assert subs[-4].text == "all italic"  # style Top is italic
+    assert subs[-2].text == "Hello"
+    assert subs.aegisub_project == {}
+    assert subs.minimize() == (0, 0, 0, 0)
@@ -0,0 +1,51 @@
+from __future__ import unicode_literals
+import io
+import os.path
+
+from lib.pysubs2 import SSAEvent, SSAFile, ParseCache
+from lib.pysubs2.formats import PEEK_SIZE
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+def test_mmap_load_matches_text_load():
+    path = os.path.join(DATA, "sample.ass")
+    with io.open(path, encoding="utf-8") as fp:
+        expected = SSAFile.from_file(fp)
+    subs = SSAFile.load(path)
+    assert subs.format == "ass"
+    assert subs.equals(expected)
+    assert subs.aegisub_project == expected.aegisub_project
+
+
+def test_single_line_file_longer_than_peek(tmpdir):
+    subs = SSAFile()
+    for i in range(300):
+        subs.append(SSAEvent(start=i * 1000, end=i * 1000 + 500, text="line %d" % i))
+    path = str(tmpdir.join("long.json"))
+    subs.save(path)
+    with io.open(path, "rb") as fp:
+        data = fp.read()
+    assert b"\n" not in data[:PEEK_SIZE] and len(data) > PEEK_SIZE
+
+    loaded = SSAFile.load(path)
+    assert loaded.format == "json"
+    assert len(loaded) == 300
+    assert SSAFile.probe(path).events == 300
+
+
+def test_cr_only_file(tmpdir):
+    with io.open(os.path.join(DATA, "sample.srt"), "rb") as fp:
+        data = fp.read().replace(b"\r\n", b"\n").replace(b"\n", b"\r")
+    path = str(tmpdir.join("cr.srt"))
+    with io.open(path, "wb") as fp:
+        fp.write(data)
+    assert len(SSAFile.load(path)) == 3
+
+
+def test_autodetected_load_is_cached(tmpdir):
+    cache = ParseCache(str(tmpdir.join("cache")))
+    for name in ("sample.ass", "sample.srt"):
+        path = os.path.join(DATA, name)
+        SSAFile.load(path, cache=cache)
+        assert os.path.exists(cache.entry_path(cache.key(path, "utf-8", None, None, {})))
@@ -0,0 +1,47 @@
+from __future__ import unicode_literals
+import io
+import os.path
+
+from lib.pysubs2 import SSAFile
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+class LineStream(object):
+    # text stream which can only be iterated, so readers must not read it whole
+    def __init__(self, text):
+        self.lines = io.StringIO(text).readlines()
+
+    def __iter__(self):
+        return iter(self.lines)
+
+
+def test_mpl2():
+    subs = SSAFile.load(os.path.join(DATA, "sample.mpl"))
+    assert subs.format == "mpl2"
+    assert [(ev.start, ev.end) for ev in subs] == [(1000, 3500), (4000, 6000), (7000, 8000)]
+    assert [ev.text for ev in subs] == ["Hello\\N{\\i1}world{\\i0}", "Second line", "{\\i1}All italic{\\i0}"]
+
+
+def test_tmp():
+    subs = SSAFile.load(os.path.join(DATA, "sample.txt"))
+    assert subs.format == "tmp"
+    assert [ev.start for ev in subs] == [1000, 5000, 60000]
+    assert subs[0].text == "Hello {\\u1}world\\Nline two"
+    assert subs[1].text == "Second line"
+    assert all(ev.end > ev.start for ev in subs)
+
+
+def test_readers_stream_lines(tmpdir):
+    for name, format_ in (("sample.mpl", "mpl2"), ("sample.txt", "tmp")):
+        expected = SSAFile.load(os.path.join(DATA, name))
+        with io.open(os.path.join(DATA, name), encoding="utf-8") as fp:
+            text = fp.read()
+        subs = SSAFile.from_file(LineStream(text), format_)
+        assert subs.equals(expected)
+
+        # Windows line endings
+        path = str(tmpdir.join("crlf-" + name))
+        with io.open(path, "wb") as fp:
+            fp.write(text.replace("\n", "\r\n").encode("utf-8"))
+        assert [ev.text for ev in SSAFile.load(path)] == [ev.text for ev in expected]
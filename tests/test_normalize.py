@@ -0,0 +1,55 @@
+from __future__ import unicode_literals
+
+import pytest
+
+from lib.pysubs2 import SSAEvent, SSAFile
+
+
+def make_subs(*events):
+    subs = SSAFile()
+    for start, end, text in events:
+        subs.append(SSAEvent(start=start, end=end, text=text))
+    return subs
+
+
+def times_texts(subs):
+    return [(ev.start, ev.end, ev.text) for ev in subs]
+
+
+def test_drop_and_merge():
+    subs = make_subs((3000, 4000, "A"), (0, 1000, "A"), (1000, 2000, "A"), (2500, 2500, "B"), (2100, 2200, "A"))
+    subs.append(SSAEvent(start=5000, end=5000, text="note", type="Comment"))
+
+    stats = subs.normalize()
+    assert stats == (1, 1, 0, 0)
+    assert times_texts(subs) == [(0, 2000, "A"), (2100, 2200, "A"), (3000, 4000, "A"), (5000, 5000, "note")]
+
+    assert subs.normalize(merge_gap=1000).merged == 2
+    assert times_texts(subs) == [(0, 4000, "A"), (5000, 5000, "note")]
+
+
+def test_overlaps():
+    events = [(0, 2000, "A"), (1000, 3000, "B"), (1000, 1500, "C")]
+    subs = make_subs(*events)
+    assert subs.normalize() == (0, 0, 0, 0)
+    assert times_texts(subs) == sorted(events)
+
+    subs = make_subs(*events)
+    assert subs.normalize(overlaps="clip").clipped == 2
+    assert times_texts(subs) == [(0, 1000, "A"), (1000, 3000, "C\\NB")]  # joined in order of start, end
+
+    subs = make_subs(*events)
+    assert subs.normalize(overlaps="stack").stacked == 3
+    assert times_texts(subs) == [(0, 1000, "A"), (1000, 1500, "A\\NC\\NB"), (1500, 2000, "A\\NB"), (2000, 3000, "B")]
+
+
+def test_groups_are_separate():
+    subs = make_subs((0, 2000, "A"), (1000, 3000, "A"))
+    subs[1].layer = 1
+    assert subs.normalize(overlaps="clip") == (0, 0, 0, 0)
+    assert len(subs) == 2
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        make_subs().normalize(overlaps="drop")
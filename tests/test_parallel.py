@@ -0,0 +1,49 @@
+from __future__ import unicode_literals
+import io
+
+from lib.pysubs2 import SSAEvent, SSAFile, substation
+
+
+def write_sample(path, n=3000):
+    subs = SSAFile()
+    for i in range(n):
+        ev = SSAEvent(start=i * 1000, end=i * 1000 + 900, text="Line %d, with {\\i1}commas{\\i0}" % i)
+        if i % 7 == 0:
+            ev.is_comment = True
+        subs.append(ev)
+    subs.attachments.append(("[Fonts]", "fontname: a.ttf\nABCDEF\n"))
+    text = subs.to_string("ass")
+    # a section after the events, which the parallel parser handles in the main process
+    text += "\n[Aegisub Project Garbage]\nVideo File: a.mkv\n"
+    with io.open(path, "w", encoding="utf-8") as fp:
+        fp.write(text)
+
+
+def test_parallel_parse_matches_serial(tmpdir, monkeypatch):
+    path = str(tmpdir.join("big.ass"))
+    write_sample(path)
+    monkeypatch.setattr(substation, "PARALLEL_PARSE_THRESHOLD", 1000)
+    monkeypatch.setattr(substation, "PARALLEL_CHUNK_SIZE", 4000)
+    calls = []
+    parse_parallel = substation.SubstationFormat._from_buffer_parallel
+
+    def spy(cls, *args):
+        calls.append(args)
+        return parse_parallel(*args)
+    monkeypatch.setattr(substation.SubstationFormat, "_from_buffer_parallel", classmethod(spy))
+
+    serial = SSAFile.load(path)
+    for columnar in (False, True):
+        parallel = SSAFile.load(path, processes=2, columnar=columnar)
+        assert len(parallel) == 3000
+        assert parallel.equals(serial)
+        assert parallel.attachments == serial.attachments
+        assert parallel.aegisub_project == serial.aegisub_project == {"Video File": "a.mkv"}
+        assert parallel.to_string("ass") == serial.to_string("ass")
+    assert len(calls) == 2
+
+
+def test_small_files_are_parsed_serially(tmpdir):
+    path = str(tmpdir.join("small.ass"))
+    write_sample(path, 10)
+    assert len(SSAFile.load(path, processes=4)) == 10
@@ -0,0 +1,56 @@
+from __future__ import unicode_literals
+
+from lib.pysubs2 import SSAStyle
+from lib.pysubs2.substation import parse_tags
+
+
+def flags(style):
+    return style.italic, style.bold, style.underline, style.strikeout
+
+
+def test_plain_text():
+    style = SSAStyle()
+    assert parse_tags("no tags", style) == [("no tags", style)]
+
+
+def test_tags_accumulate():
+    fragments = parse_tags("a{\\i1}b{\\b1}c{\\i0}d{\\u1\\s1}e")
+    assert [text for text, _ in fragments] == ["a", "b", "c", "d", "e"]
+    assert [flags(style) for _, style in fragments] == [
+        (False, False, False, False),
+        (True, False, False, False),
+        (True, True, False, False),
+        (False, True, False, False),
+        (False, True, True, True),
+    ]
+
+
+def test_reset():
+    line_style = SSAStyle(italic=True)
+    styles = {"Bold": SSAStyle(bold=True)}
+    fragments = parse_tags("{\\i0}a{\\rBold}b{\\r}c{\\rMissing}d", line_style, styles)
+    assert [flags(style) for _, style in fragments] == [
+        (True, False, False, False),
+        (False, False, False, False),
+        (False, True, False, False),
+        (True, False, False, False),
+        (True, False, False, False),
+    ]
+
+
+def test_unknown_blocks_share_style():
+    fragments = parse_tags("a{\\pos(1,2)}b{comment}c")
+    assert fragments[0][1] is fragments[1][1] is fragments[2][1]
+
+
+def test_input_style_not_modified():
+    style = SSAStyle()
+    parse_tags("{\\i1\\b1}x", style)
+    assert flags(style) == (False, False, False, False)
+
+
+def test_many_blocks():
+    text = "{\\i1}x{\\i0}y" * 5000
+    fragments = parse_tags(text)
+    assert len(fragments) == 10001
+    assert flags(fragments[-1][1])[0] is False
@@ -0,0 +1,61 @@
+from __future__ import unicode_literals
+import io
+import os.path
+
+import pytest
+
+from lib.pysubs2 import SSAFile
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_sections(columnar):
+    path = os.path.join(DATA, "sample.ass")
+    full = SSAFile.load(path)
+    subs = SSAFile.load(path, sections=("info", "styles"), columnar=columnar)
+    assert len(subs) == 0
+    assert subs.styles == full.styles
+    assert subs.info == full.info
+    assert subs.aegisub_project == {}
+
+    subs = SSAFile.load(path, sections=("events",), columnar=columnar)
+    assert [(ev.start, ev.end, ev.text) for ev in subs] == [(ev.start, ev.end, ev.text) for ev in full]
+    assert subs.info == {}
+
+
+def test_sections_other_formats():
+    subs = SSAFile.load(os.path.join(DATA, "sample.srt"), sections=("styles",))
+    assert len(subs) == 0
+    assert "Default" in subs.styles
+
+
+def test_unknown_section():
+    with pytest.raises(ValueError):
+        SSAFile.load(os.path.join(DATA, "sample.ass"), sections=("fonts",))
+
+
+def test_probe_substation():
+    result = SSAFile.probe(os.path.join(DATA, "sample.ass"))
+    assert result == ("ass", "utf-8", 7, -1000, 10000)
+    assert SSAFile.probe(os.path.join(DATA, "sample.ass"), count_events=False) == ("ass", "utf-8", None, None, None)
+
+
+def test_probe_other_formats():
+    assert SSAFile.probe(os.path.join(DATA, "sample.srt")) == ("srt", "utf-8", 3, 1000, 8000)
+    assert SSAFile.probe(os.path.join(DATA, "sample.sub")).format == "microdvd"
+
+
+def test_probe_mixed_hour_widths(tmpdir):
+    path = str(tmpdir.join("long.ass"))
+    with io.open(os.path.join(DATA, "sample.ass"), encoding="utf-8") as fp:
+        text = fp.read()
+    # timestamps are compared as bytes, so "10:00:06.00" must still be the latest end
+    text = text.replace("0:00:04.00,0:00:06.00", "0:00:04.00,10:00:06.00")
+    with io.open(path, "w", encoding="utf-8") as fp:
+        fp.write(text)
+    subs = SSAFile.load(path)
+    result = SSAFile.probe(path)
+    assert result.events == len(subs)
+    assert (result.start, result.end) == (min(ev.start for ev in subs), max(ev.end for ev in subs))
+    assert result.end == 36006000
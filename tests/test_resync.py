@@ -0,0 +1,46 @@
+from __future__ import unicode_literals
+import random
+
+from lib.pysubs2 import SSAEvent, SSAFile
+
+
+def make_reference(n=1500, seed=1):
+    random.seed(seed)
+    subs, t = SSAFile(), 5000
+    for _ in range(n):
+        duration = random.randint(800, 5000)
+        subs.append(SSAEvent(start=t, end=t + duration))
+        t += duration + random.choice([100, 200, 500, 1500, 4000])
+    return subs
+
+
+def check_resync(cut):
+    # subtitles 3 s late, made for a cut of the video with a scene inserted (cut > 0)
+    # or removed (cut < 0) at 50:00; the original times are kept in the texts
+    reference = make_reference()
+    cut_at = 50 * 60000
+
+    def shift(t):
+        return t + 3000 + (cut if t >= cut_at else 0)
+
+    subs = SSAFile()
+    for ev in reference:
+        if cut < 0 and cut_at + cut <= ev.start < cut_at:
+            continue  # lines of the removed scene
+        subs.append(SSAEvent(start=shift(ev.start), end=shift(ev.end), text=str(ev.start)))
+
+    subs.resync(reference)
+    off = [ev for ev in subs if abs(ev.start - int(ev.text)) > 300]
+    assert len(off) <= 5
+
+
+def test_resync_inserted_scene():
+    check_resync(20000)
+
+
+def test_resync_removed_scene():
+    check_resync(-20000)
+
+
+def test_resync_offset_only():
+    check_resync(0)
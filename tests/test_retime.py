@@ -0,0 +1,61 @@
+from __future__ import unicode_literals
+import random
+
+import pytest
+
+from lib.pysubs2 import SSAEvent, SSAFile, retime
+from lib.pysubs2.retime import AffineTimeMap, PiecewiseLinearTimeMap
+
+
+def make_subs(columnar=False, n=200):
+    random.seed(1)
+    subs = SSAFile(columnar=columnar)
+    for _ in range(n):
+        start = random.randint(-5000, 3600000)
+        subs.append(SSAEvent(start=start, end=start + random.randint(0, 5000)))
+    return subs
+
+
+def test_affine_map():
+    m = AffineTimeMap(scale=2, offset=-100)
+    assert m(1000) == 1900
+    assert m.map_times([0, 1, 2]) == [-100, -98, -96]
+
+
+def test_piecewise_linear_map():
+    m = PiecewiseLinearTimeMap([(1000, 2000), (3000, 3000)])
+    assert [m(t) for t in (0, 1000, 2000, 3000, 5000)] == [1500, 2000, 2500, 3000, 4000]
+    assert PiecewiseLinearTimeMap([(1000, 1500)])(0) == 500
+
+    with pytest.raises(ValueError):
+        PiecewiseLinearTimeMap([])
+    with pytest.raises(ValueError):
+        PiecewiseLinearTimeMap([(1000, 0), (1000, 5)])
+
+
+def test_shift_and_framerate_use_maps():
+    subs = SSAFile()
+    subs.append(SSAEvent(start=1000, end=2000))
+    subs.shift(s=1)
+    assert (subs[0].start, subs[0].end) == (2000, 3000)
+    subs.transform_framerate(25, 50)
+    assert (subs[0].start, subs[0].end) == (1000, 1500)
+
+
+@pytest.mark.parametrize("time_map", [AffineTimeMap(offset=1500), AffineTimeMap(scale=25 / 23.976, offset=-7),
+                                      PiecewiseLinearTimeMap([(0, 100), (60000, 62000), (3000000, 3001000)])])
+def test_same_results_with_and_without_numpy(monkeypatch, time_map):
+    expected = [(time_map(ev.start), time_map(ev.end)) for ev in make_subs()]
+    for numpy in (retime.numpy, None):
+        monkeypatch.setattr(retime, "numpy", numpy)
+        for columnar in (False, True):
+            subs = make_subs(columnar)
+            subs.retime(time_map)
+            assert [(ev.start, ev.end) for ev in subs] == expected
+
+
+def test_retime_with_anchor_list():
+    subs = SSAFile()
+    subs.append(SSAEvent(start=60000, end=61000))
+    subs.retime([(0, 0), (60000, 62000)])
+    assert (subs[0].start, subs[0].end) == (62000, 63033)
@@ -0,0 +1,59 @@
+# coding=utf-8
+from __future__ import unicode_literals
+import io
+import os
+import stat
+
+import pytest
+
+from lib.pysubs2 import SSAEvent, SSAFile
+from lib.pysubs2.common import ENCODE_CHUNK_SIZE, EncodingWriter
+
+
+def make_subs(text="Hello"):
+    subs = SSAFile()
+    subs.append(SSAEvent(start=0, end=1000, text=text))
+    return subs
+
+
+def read_bytes(path):
+    with io.open(path, "rb") as fp:
+        return fp.read()
+
+
+def test_failed_save_leaves_target_unchanged(tmpdir):
+    path = str(tmpdir.join("out.srt"))
+    make_subs().save(path)
+    before = read_bytes(path)
+
+    with pytest.raises(UnicodeEncodeError):
+        make_subs("čš").save(path, encoding="ascii")
+    assert read_bytes(path) == before
+    assert os.listdir(str(tmpdir)) == ["out.srt"]
+
+
+def test_save_keeps_permissions(tmpdir):
+    path = str(tmpdir.join("out.srt"))
+    make_subs().save(path)
+    os.chmod(path, 0o600)
+    make_subs("Changed").save(path)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert b"Changed" in read_bytes(path)
+
+
+def test_save_encodings(tmpdir):
+    path = str(tmpdir.join("out.srt"))
+    make_subs("čš").save(path, encoding="cp1250")
+    assert "čš".encode("cp1250") in read_bytes(path)
+    make_subs("čš").save(path, encoding="utf-16")
+    assert SSAFile.load(path, encoding="utf-16")[0].text == "čš"
+
+
+def test_encoding_writer_chunks():
+    out = io.BytesIO()
+    writer = EncodingWriter(out, "utf-8", newline="\r\n")
+    for _ in range(3 * ENCODE_CHUNK_SIZE // 10):
+        writer.write("čabc\nefg\n")
+    assert out.tell() > 0  # encoded before the end
+    writer.close()
+    assert out.getvalue() == "čabc\r\nefg\r\n".encode("utf-8") * (3 * ENCODE_CHUNK_SIZE // 10)
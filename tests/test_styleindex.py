@@ -0,0 +1,53 @@
+from __future__ import unicode_literals
+import os.path
+
+from lib.pysubs2 import SSAEvent, SSAFile, SSAStyle
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+
+def test_events_using_style():
+    subs = SSAFile.load(os.path.join(DATA, "sample.ass"))
+    assert [ev.text for ev in subs.events_using_style("Sign")] == [
+        "{\\pos(100,100)}A sign", "{\\rSign}styled {\\r}reset {\\b1}bold{\\b0}"]
+    subs.append(SSAEvent(start=0, end=1, style="Sign"))
+    assert len(subs.events_using_style("Sign")) == 3
+    del subs[-1]
+    assert len(subs.events_using_style("Sign")) == 2
+
+
+def test_rename_style_renames_references():
+    subs = SSAFile.load(os.path.join(DATA, "sample.ass"))
+    subs.rename_style("Sign", "Board")
+    assert "Sign" not in subs.styles and "Board" in subs.styles
+    assert not subs.events_using_style("Sign")
+    assert subs[4].text == "{\\rBoard}styled {\\r}reset {\\b1}bold{\\b0}"
+    assert subs[3].style == "Board"
+
+
+def test_rename_style_after_in_place_edit():
+    subs = SSAFile()
+    subs.styles["Alt"] = SSAStyle()
+    subs.styles["C"] = SSAStyle()
+    ev = SSAEvent(start=0, end=1000, style="Alt")
+    subs.append(ev)
+    subs.rename_style("Alt", "B")
+    assert subs[0].style == "B"
+
+    subs[0].style = "C"
+    subs[0].text = "{\\rC}x"
+    subs.rename_style("C", "D")
+    assert subs[0].style == "D"
+    assert subs[0].text == "{\\rD}x"
+    assert subs.events_using_style("D") == [subs[0]]
+
+
+def test_import_styles_rename_conflicts():
+    subs = SSAFile()
+    other = SSAFile()
+    other.styles["Default"] = SSAStyle(fontsize=99)
+    other.append(SSAEvent(start=0, end=1000, style="Default"))
+    renamed = subs.import_styles(other, rename_conflicts=True)
+    assert renamed == {"Default": "Default_2"}
+    assert subs.styles["Default_2"].fontsize == 99
+    assert other[0].style == "Default_2"
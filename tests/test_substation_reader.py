@@ -0,0 +1,54 @@
+from __future__ import unicode_literals
+
+from lib.pysubs2 import Color, SSAFile
+from lib.pysubs2.substation import compile_event_decoder, compile_style_decoder, parse_timestamp
+
+EVENT_COLUMNS = ["Layer", "Start", "End", "Style", "Name", "MarginL", "MarginR", "MarginV", "Effect", "Text"]
+
+REORDERED = """[Script Info]
+ScriptType: v4.00+
+
+[V4+ Styles]
+Format: Name, Fontsize, PrimaryColour, Bold, Alignment, Custom
+Style: Big,72,&H000000FF,-1,8,x
+
+[Events]
+Format: Start, End, Text, Style, Actor2
+Dialogue: 0:00:01.00,0:00:02.00,Hello,Big,Bob
+"""
+
+
+def test_parse_timestamp():
+    assert parse_timestamp("0:01:02.50") == 62500
+    assert parse_timestamp("-0:00:01.00") == -1000
+    assert parse_timestamp("10:00:00.00") == 36000000
+    assert parse_timestamp("1:02:03.456") == 3723456
+
+
+def test_event_decoder():
+    decode = compile_event_decoder(EVENT_COLUMNS, "ass")
+    ev = decode("Comment", "1,0:00:01.00,0:00:02.00,Sign,Bob,1,2,3,fx,Text, with, commas")
+    assert (ev.layer, ev.start, ev.end, ev.style, ev.name) == (1, 1000, 2000, "Sign", "Bob")
+    assert (ev.marginl, ev.marginr, ev.marginv, ev.effect) == (1, 2, 3, "fx")
+    assert ev.text == "Text, with, commas"
+    assert ev.is_comment
+    assert compile_event_decoder(EVENT_COLUMNS, "ass") is decode
+
+
+def test_style_decoder():
+    decode = compile_style_decoder(["Name", "Fontname", "PrimaryColour", "Italic", "Alignment"], "ssa")
+    name, style = decode("Top,Verdana,255,-1,6")
+    assert name == "Top"
+    assert (style.fontname, style.primarycolor, style.italic) == ("Verdana", Color(255, 0, 0, 0), True)
+    assert style.alignment == 8  # SSA alignment 6 is top center
+
+
+def test_reordered_and_unknown_columns():
+    subs = SSAFile.from_string(REORDERED)
+    style = subs.styles["Big"]
+    assert (style.fontsize, style.primarycolor, style.bold, style.alignment) == (72, Color(255, 0, 0, 0), True, 8)
+    assert style.extra == {"Custom": "x"}
+    ev = subs[0]
+    assert (ev.start, ev.end, ev.style) == (1000, 2000, "Big")
+    assert ev.text == "Hello"
+    assert ev.extra == {"Actor2": "Bob"}
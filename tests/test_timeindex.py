@@ -0,0 +1,80 @@
+from __future__ import unicode_literals
+import random
+
+from lib.pysubs2 import SSAEvent, SSAFile
+from lib.pysubs2.timeindex import TimeIndex
+
+
+def make_subs(n=500, seed=1):
+    random.seed(seed)
+    subs = SSAFile()
+    for _ in range(n):
+        start = random.randint(0, 600000)
+        subs.append(SSAEvent(start=start, end=start + random.randint(0, 8000)))
+    subs.append(SSAEvent(start=0, end=600000, text="long sign"))
+    return subs
+
+
+def brute_force(subs, start, end):
+    return sorted((ev for ev in subs if ev.end > start and ev.start < end), key=lambda ev: (ev.start, ev.end))
+
+
+def key(events):
+    return sorted((ev.start, ev.end, ev.text) for ev in events)
+
+
+def test_events_at_matches_brute_force():
+    subs = make_subs()
+    for ms in range(0, 610000, 7919):
+        found = subs.events_at(ms)
+        assert key(found) == key(ev for ev in subs if ev.start <= ms < ev.end)
+        assert [ev.start for ev in found] == sorted(ev.start for ev in found)
+
+
+def test_events_between_matches_brute_force():
+    subs = make_subs()
+    for start in range(0, 610000, 15331):
+        assert key(subs.events_between(start, start + 10000)) == key(brute_force(subs, start, start + 10000))
+
+
+def test_half_open_intervals():
+    subs = SSAFile()
+    subs.append(SSAEvent(start=1000, end=2000))
+    assert subs.events_at(999) == []
+    assert len(subs.events_at(1000)) == 1
+    assert subs.events_at(2000) == []
+    assert subs.events_between(2000, 3000) == []
+    assert subs.events_between(0, 1000) == []
+
+
+def test_index_follows_list_changes():
+    subs = make_subs(50)
+    subs.events_at(0)
+    ev = subs[10]
+    del subs[10]
+    assert ev not in subs.events_at(ev.start)
+    subs.insert(0, SSAEvent(start=700000, end=701000, text="new"))
+    assert [e.text for e in subs.events_at(700500)] == ["new"]
+    subs.shift(s=1)
+    assert [e.text for e in subs.events_at(701500)] == ["new"]
+
+
+def test_events_assignment_drops_index():
+    subs = SSAFile()
+    subs.events = [SSAEvent(start=0, end=10)]
+    assert len(subs.events_at(5)) == 1
+    subs.events = [SSAEvent(start=100, end=110)]
+    assert subs.events_at(5) == []
+    assert len(subs.events_at(105)) == 1
+
+
+def test_add_remove():
+    index = TimeIndex()
+    events = [SSAEvent(start=i * 100, end=i * 100 + d) for i, d in enumerate((50, 5000, 300000, 0))]
+    for ev in events:
+        index.add(ev)
+    assert len(index) == 4
+    assert index.events_at(220) == [events[1], events[2]]
+    index.remove(events[2])
+    assert index.events_at(220) == [events[1]]
+    assert len(index) == 3
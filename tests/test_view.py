@@ -0,0 +1,64 @@
+from __future__ import unicode_literals
+
+import pytest
+
+from lib.pysubs2 import SSAEvent, SSAFile
+from lib.pysubs2.view import EventRange, start_range
+
+
+def make_subs(n=10):
+    subs = SSAFile()
+    for i in range(n):
+        subs.append(SSAEvent(start=i * 1000, end=i * 1000 + 1500, text="Line %d" % i))
+    return subs
+
+
+def texts(events):
+    return [ev.text for ev in events]
+
+
+def test_event_range():
+    events = make_subs().events
+    r = EventRange(events, 2, 6)
+    assert len(r) == 4
+    assert r[0] is events[2]
+    assert r[-1] is events[5]
+    assert texts(r[1:3]) == ["Line 3", "Line 4"]
+    assert isinstance(r[1:3], EventRange)
+    assert texts(r[::2]) == ["Line 2", "Line 4"]
+    assert len(EventRange(events, 8, 3)) == 0
+    assert len(EventRange(events, -3)) == 3
+    with pytest.raises(IndexError):
+        r[4]
+
+
+def test_start_range():
+    events = make_subs().events
+    assert start_range(events, 2000, 5000) == (2, 5)
+    assert start_range(events, 2500, 2600) == (3, 3)
+    assert start_range(events, 50000, 60000) == (10, 10)
+
+
+def test_view():
+    subs = make_subs()
+    view = subs.view(2, 5)
+    assert texts(view) == ["Line 2", "Line 3", "Line 4"]
+    assert view.styles is subs.styles
+    assert view[0] is subs[2]
+    assert texts(SSAFile.from_string(view.to_string("srt"))) == texts(view)
+
+
+def test_window():
+    subs = make_subs()
+    assert texts(subs.window(3000, 5000)) == ["Line 2", "Line 3", "Line 4"]
+    assert texts(subs.window(3000, 5000, overlapping=False)) == ["Line 3", "Line 4"]
+    assert len(subs.window(20000, 30000)) == 0
+
+
+def test_retiming_view_changes_parent():
+    subs = make_subs()
+    assert texts(subs.events_at(2200)) == ["Line 1", "Line 2"]
+    subs.view(2, 3).shift(s=10)
+    assert subs[2].start == 12000
+    assert texts(subs.events_at(2200)) == ["Line 1"]  # time index of parent is rebuilt
+    assert texts(subs.events_at(12200)) == ["Line 2"]
@@ -0,0 +1,53 @@
+from __future__ import unicode_literals
+import io
+import os.path
+
+import pytest
+
+from lib.pysubs2 import SSAFile
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+# expected output was written by the writers before they were optimized, it must not change
+SOURCES = ["sample.ass", "sample.srt", "sample.sub", "sample.mpl", "sample.txt"]
+FORMATS = [("ass", ".ass"), ("ssa", ".ssa"), ("srt", ".srt"), ("microdvd", ".sub"), ("mpl2", ".mpl"), ("tmp", ".txt")]
+
+
+def expected_output(source, ext):
+    name, source_ext = os.path.splitext(source)
+    with io.open(os.path.join(DATA, "expected", "%s-%s%s" % (name, source_ext[1:], ext)), encoding="utf-8",
+                 newline="") as fp:
+        return fp.read()
+
+
+@pytest.mark.parametrize("source", SOURCES)
+@pytest.mark.parametrize("format_, ext", FORMATS)
+def test_to_string(source, format_, ext):
+    subs = SSAFile.load(os.path.join(DATA, source))
+    assert subs.to_string(format_, fps=24) == expected_output(source, ext)
+
+
+@pytest.mark.parametrize("source", SOURCES)
+@pytest.mark.parametrize("format_, ext", FORMATS)
+def test_save(source, format_, ext, tmpdir):
+    subs = SSAFile.load(os.path.join(DATA, source))
+    path = str(tmpdir.join("out" + ext))
+    subs.save(path, format_=format_, fps=24)
+    with io.open(path, "rb") as fp:
+        assert fp.read() == expected_output(source, ext).replace("\n", os.linesep).encode("utf-8")
+
+
+@pytest.mark.parametrize("format_, ext", FORMATS)
+def test_to_file(format_, ext):
+    subs = SSAFile.load(os.path.join(DATA, "sample.ass"))
+    fp = io.StringIO()
+    subs.to_file(fp, format_, fps=24)
+    assert fp.getvalue() == expected_output("sample.ass", ext)
+
+
+def test_microdvd_round_trip():
+    subs = SSAFile.load(os.path.join(DATA, "sample.srt"))
+    again = SSAFile.from_string(subs.to_string("microdvd", fps=24))
+    assert again.fps == 24
+    assert [(ev.start, ev.end) for ev in again] == [(ev.start, ev.end) for ev in subs]
+    assert [ev.plaintext for ev in again] == [ev.plaintext for ev in subs]